@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark composing quizzes of different sizes and quota specs with
+compose_quiz, over banks of growing size: the cost should follow the quiz
+size, not the bank size. Also the Facts format's draw from a generated
+template pool, questions built only when drawn.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import EpicBank
+from question_templates import TemplatePool
+from quiz_selection import QUIZ_FORMATS, compose_quiz, draw_format
+
+BANK_SIZES = (1000, 10000, 100000)
+TOPICS = ("family", "war", "weapons", "kingdoms", "sages", "boons")
+DRAWS = 200
+
+
+def synthetic_bank(epic: str, size: int) -> EpicBank:
+    rng = random.Random(size)
+    questions = []
+    for i in range(size):
+        questions.append({
+            "question": {"english": f"{epic} question {i}", "telugu": f"{epic} ప్రశ్న {i}"},
+            "options": {"english": ["A", "B", "C", "D"], "telugu": ["అ", "ఆ", "ఇ", "ఈ"]},
+            "correct": i % 4,
+            "difficulty": ("easy", "medium", "hard")[rng.randrange(3)],
+            "tags": rng.sample(TOPICS, rng.randint(1, 2)),
+        })
+    return EpicBank(epic, questions, f"{epic}-bench")
+
+
+def main():
+    specs = {
+        "sprint (5)": (QUIZ_FORMATS["sprint"]["size"], QUIZ_FORMATS["sprint"]["quotas"]),
+        "standard (20)": (QUIZ_FORMATS["standard"]["size"], QUIZ_FORMATS["standard"]["quotas"]),
+        "exam (50)": (QUIZ_FORMATS["exam"]["size"], QUIZ_FORMATS["exam"]["quotas"]),
+        "exam + topics (50)": (50, dict(QUIZ_FORMATS["exam"]["quotas"], tag={"war": 2, "sages": 1, "boons": 1})),
+    }
+    for bank_size in BANK_SIZES:
+        start = time.perf_counter()
+        banks = {epic: synthetic_bank(epic, bank_size // 2) for epic in ("mahabharata", "ramayana")}
+        for bank in banks.values():
+            bank.cells
+        build_s = time.perf_counter() - start
+        print(f"\n🗂️  {bank_size} questions in two banks (built and bucketed in {build_s:.1f} s)")
+
+        # A returning player has seen 200 questions of each bank
+        seen = [bank.id_at(position) for bank in banks.values()
+                for position in range(0, len(bank), len(bank) // 200)]
+        for name, (size, quotas) in specs.items():
+            start = time.perf_counter()
+            for _ in range(DRAWS):
+                compose_quiz(banks, size, quotas, seen)
+            compose_us = (time.perf_counter() - start) / DRAWS * 1e6
+            print(f"🎲 Compose {name}: {compose_us:.0f} µs per quiz")
+
+    start = time.perf_counter()
+    pool = TemplatePool("mahabharata")
+    pool_ms = (time.perf_counter() - start) * 1000
+    print(f"\n🧩 Template pool of {len(pool)} generated questions (built in {pool_ms:.1f} ms)")
+    # A returning player has seen 100 generated questions
+    seen = [pool.id_at(position) for position in range(0, len(pool), len(pool) // 100)]
+    start = time.perf_counter()
+    for seed in range(DRAWS):
+        picks, _ = draw_format({"mahabharata": pool}, "facts", seen, seed)
+        [pool.get(position, ("english",)) for _, position in picks]
+    pool_us = (time.perf_counter() - start) / DRAWS * 1e6
+    print(f"🎲 Draw and generate a Facts quiz (20): {pool_us:.0f} µs per quiz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark profile hydration and per-session memory: compact vs legacy UserProfile
+"""
+
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from user_profile import UserProfile
+
+PROFILE_COUNT = 10000
+
+
+class LegacyUserProfile:
+    """The previous plain-class profile, kept here for comparison"""
+
+    def __init__(self, username: str):
+        self.username = username
+        self.created_date = "2024-01-01T00:00:00"
+        self.total_quizzes = 0
+        self.total_score = 0
+        self.achievements = []
+        self.streak_days = 0
+        self.last_quiz_date = None
+        self.xp_points = 0
+        self.level = 1
+        self.preferred_language = 'english'
+        self.quiz_history = []
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls(data['username'])
+        for key, value in data.items():
+            setattr(profile, key, value)
+        return profile
+
+
+def make_profiles(count):
+    """Stored profile dicts with realistic achievements and history"""
+    return [{
+        'username': f"player{i}",
+        'created_date': "2024-01-01T00:00:00",
+        'total_quizzes': 120,
+        'total_score': 1500,
+        'achievements': ['first_quiz', 'high_scorer', 'quiz_master', 'streak_3'],
+        'streak_days': 4,
+        'last_quiz_date': "2024-06-01T10:00:00",
+        'xp_points': 4200,
+        'level': 9,
+        'preferred_language': 'english',
+        'quiz_history': [{'quiz_type': 'ramayana', 'score': 15, 'total': 20}] * 120
+    } for i in range(count)]
+
+
+def bench(profile_cls, stored):
+    # Best of 5 runs to keep timer noise out
+    hydrate_seconds = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for data in stored:
+            profile_cls.from_dict(data)
+        hydrate_seconds = min(hydrate_seconds, time.perf_counter() - start)
+
+    # Memory owned by the profile objects themselves (the stored dicts already exist)
+    tracemalloc.start()
+    profiles = [profile_cls.from_dict(data) for data in stored]
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # What a session pays if its state is pickled (e.g. by a session store)
+    pickled_bytes = len(pickle.dumps(profiles[0]))
+    return hydrate_seconds, memory_bytes, pickled_bytes
+
+
+def main():
+    stored = make_profiles(PROFILE_COUNT)
+    print(f"👤 Hydrating {PROFILE_COUNT} profiles")
+    print("-" * 60)
+    for label, profile_cls in (("legacy", LegacyUserProfile), ("compact", UserProfile)):
+        hydrate_seconds, memory_bytes, pickled_bytes = bench(profile_cls, stored)
+        print(f"{label:>8}: hydrate {hydrate_seconds * 1000:7.1f} ms | "
+              f"{memory_bytes / PROFILE_COUNT:6.0f} B/profile in memory | "
+              f"{pickled_bytes:6d} B pickled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading one epic: building from fast_questions.py vs the compiled artifact
+"""
+
+import importlib
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import question_bank
+
+RUNS = 20
+
+
+def load_from_source():
+    # A cold start imports the module and builds both epics
+    sys.modules.pop("fast_questions", None)
+    fast_questions = importlib.import_module("fast_questions")
+    fast_questions.get_mahabharata_questions()
+    fast_questions.get_ramayana_questions()
+
+
+def load_from_artifact():
+    # A cold start reads the header and the one epic being played
+    question_bank.QuestionBankLoader().load("mahabharata")
+
+
+def best_of(func):
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    if not os.path.exists(question_bank.ARTIFACT_FILE):
+        question_bank.build_from_source()
+
+    source_ms = best_of(load_from_source)
+    artifact_ms = best_of(load_from_artifact)
+    print(f"📚 fast_questions.py (both epics): {source_ms:.2f} ms")
+    print(f"📦 question_bank.dat (one epic):    {artifact_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory of a large question bank: list of dicts vs QuestionStore,
+and what each lazily loaded language pack adds
+"""
+
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from question_bank import question_id
+from question_store import QuestionStore
+
+BANK_SIZE = 100000
+
+
+def make_bank_lines(count):
+    """JSONL lines of generated questions whose options reuse a small cast of names"""
+    rng = random.Random(7)
+    names = [("Arjuna", "అర్జునుడు"), ("Bhima", "భీముడు"), ("Karna", "కర్ణుడు"), ("Drona", "ద్రోణుడు"),
+             ("Rama", "రాముడు"), ("Sita", "సీత"), ("Hanuman", "హనుమాన్"), ("Ravana", "రావణుడు"),
+             ("Vali", "వాలి"), ("Sugriva", "సుగ్రీవుడు"), ("Kunti", "కుంతి"), ("Bhishma", "భీష్ముడు")]
+    lines = []
+    for i in range(count):
+        options = rng.sample(names, 4)
+        question = {
+            "question": {"english": f"Question {i}: who is described in verse {i}?",
+                         "telugu": f"ప్రశ్న {i}: శ్లోకం {i}లో ఎవరు వర్ణించబడ్డారు?"},
+            "options": {"english": [o[0] for o in options], "telugu": [o[1] for o in options]},
+            "correct": rng.randrange(4),
+            "difficulty": rng.choice(("easy", "medium", "hard")),
+            "explanation": {"english": "See the epic for details", "telugu": "వివరాల కోసం ఇతిహాసం చూడండి"},
+        }
+        question["id"] = question_id(question)
+        lines.append(json.dumps(question, ensure_ascii=False))
+    return lines
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    bank = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return bank, size, elapsed
+
+
+def main():
+    lines = make_bank_lines(BANK_SIZE)
+
+    def read():
+        return (json.loads(line) for line in lines)
+
+    dicts, dict_bytes, dict_seconds = measure(lambda: [json.loads(line) for line in lines])
+    store, store_bytes, store_seconds = measure(lambda: QuestionStore(read(), reread=read))
+
+    print(f"📚 {BANK_SIZE} questions")
+    print(f"🐢 List of dicts:        {dict_bytes / 1e6:6.1f} MB  (load {dict_seconds:.2f}s)")
+    print(f"🚀 QuestionStore core:   {store_bytes / 1e6:6.1f} MB  (load {store_seconds:.2f}s)")
+    for language in ("english", "telugu"):
+        _, pack_bytes, pack_seconds = measure(lambda: store.pack(language))
+        print(f"🌐 + {language} pack:{' ' * (12 - len(language))}{pack_bytes / 1e6:6.1f} MB  (load {pack_seconds:.2f}s)")
+    assert store.get(123) == {**dicts[123], "tags": []}
+
+    start = time.perf_counter()
+    for position in range(0, BANK_SIZE, 100):
+        store.get(position)
+    print(f"🔍 Materialize one question: {(time.perf_counter() - start) / (BANK_SIZE // 100) * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Load test of the quiz flow: play complete quizzes through Streamlit's
+AppTest and report script executions and server CPU per completed quiz
+
+Full runs execute the whole script (CSS, sidebar, header, navigation).
+AppTest reruns the whole script even for widgets inside a fragment, so
+the live-server figure is estimated from the measured CPU of a full run
+and of the question panel: there, each answer only re-executes the panel.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "enhanced_quiz_app.py")
+
+from streamlit.testing.v1 import AppTest
+
+QUIZZES = 3
+QUESTIONS = 20
+COUNTED = ("main", "show_question_panel")
+
+
+def start_app() -> AppTest:
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.text_input(key="register_username").input("LoadTest")
+    at.button(key="register_btn").click().run()
+    at.run()
+    return at
+
+
+def play_quiz(at: AppTest):
+    """Answer every question of a new Mahabharata quiz, then go back to the quiz menu"""
+    at.button(key="enhanced_maha").click().run()
+    for i in range(QUESTIONS):
+        radio = at.radio(key=f"enhanced_q_{i}")
+        radio.set_value(0)
+        at.button[[b.label for b in at.button].index("✅ Submit Answer")].click().run()
+    if at.exception:
+        raise RuntimeError(at.exception)
+    at.button[[b.label for b in at.button].index("🎯 Take Another Quiz")].click().run()
+
+
+def count_runs(at: AppTest) -> Tuple[Counter, Counter]:
+    """Calls of main() and the question panel while one quiz is played, and their CPU seconds"""
+    calls, cpu = Counter(), Counter()
+    started = {}
+
+    def profile(frame, event, arg):
+        if frame.f_code.co_name in COUNTED and frame.f_code.co_filename == APP:
+            if event == "call":
+                calls[frame.f_code.co_name] += 1
+                started[id(frame)] = time.process_time()
+            elif event == "return":
+                cpu[frame.f_code.co_name] += time.process_time() - started.pop(id(frame))
+
+    sys.setprofile(profile)
+    threading.setprofile(profile)
+    try:
+        play_quiz(at)
+    finally:
+        sys.setprofile(None)
+        threading.setprofile(None)
+    return calls, cpu
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    os.chdir(workdir)  # Scores and profiles go to a scratch database
+    try:
+        at = start_app()
+        calls, run_cpu = count_runs(at)
+
+        # Timed separately, without the profiling hook
+        cpu, wall = time.process_time(), time.perf_counter()
+        for _ in range(QUIZZES):
+            play_quiz(at)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"🧪 {QUESTIONS}-question quiz, played to the results page and back")
+    print(f"🔁 Script runs per quiz: {calls['main']}")
+    print(f"⏱️  Wall time per quiz: {wall / QUIZZES * 1000:.0f} ms")
+    print(f"🔥 Server CPU per quiz: {cpu / QUIZZES * 1000:.0f} ms")
+    if calls["show_question_panel"]:
+        # A full run costs what AppTest measured per run; a panel run at least the panel itself
+        full_ms = cpu / QUIZZES / calls["main"] * 1000
+        panel_ms = run_cpu["show_question_panel"] / calls["show_question_panel"] * 1000
+        live_ms = (calls["main"] - QUESTIONS) * full_ms + QUESTIONS * panel_ms
+        print(f"📐 CPU per full run: {full_ms:.0f} ms, in the question panel: {panel_ms:.0f} ms")
+        print(f"🧩 Live server: {calls['main'] - QUESTIONS} full + {QUESTIONS} panel runs, "
+              f"~{live_ms:.0f} ms CPU per quiz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Per-session memory of the quiz state: play a quiz through Streamlit's
+AppTest and measure what its session state holds privately at the start,
+half-way and on the results page
+
+Objects shared between sessions (question banks, user profiles) are
+counted shallowly; strings, numbers and containers in full.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "enhanced_quiz_app.py")
+
+from streamlit.testing.v1 import AppTest
+
+QUESTIONS = 20
+SESSIONS = 1000
+CONTAINERS = (dict, list, tuple, set, frozenset)
+
+
+def deep_size(obj, seen=None) -> int:
+    """Bytes of obj and of the containers and values it holds"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, CONTAINERS):
+        size += sum(deep_size(item, seen) for item in obj)
+    return size
+
+
+def session_bytes(at: AppTest) -> int:
+    return deep_size(dict(at.session_state.items()))
+
+
+def answer(at: AppTest):
+    at.radio(key=f"enhanced_q_{at.session_state['current_question']}").set_value(0)
+    at.button[[b.label for b in at.button].index("✅ Submit Answer")].click().run()
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    os.chdir(workdir)  # Scores and profiles go to a scratch database
+    try:
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.run()
+        at.text_input(key="register_username").input("MemoryTest")
+        at.button(key="register_btn").click().run()
+        at.run()
+        idle = session_bytes(at)
+
+        at.button(key="enhanced_maha").click().run()
+        started = session_bytes(at)
+        for _ in range(QUESTIONS // 2):
+            answer(at)
+        halfway = session_bytes(at)
+        for _ in range(QUESTIONS - QUESTIONS // 2):
+            answer(at)
+        finished = session_bytes(at)
+        if at.exception:
+            raise RuntimeError(at.exception)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"🧪 {QUESTIONS}-question quiz, session state of one player")
+    print(f"💤 Logged in, no quiz: {idle / 1024:.1f} KiB")
+    for label, size in (("🚀 Quiz started", started), ("⏳ Half-way", halfway), ("🏁 Results page", finished)):
+        print(f"{label}: {size / 1024:.1f} KiB ({(size - idle) / 1024:.1f} KiB for the quiz)")
+    print(f"👥 {SESSIONS} players on the results page: {finished * SESSIONS / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
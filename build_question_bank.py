@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script to compile fast_questions.py into question_bank.dat and question_banks/
+
+Run after editing fast_questions.py; the app ignores an artifact that was
+built from an older version of the source.
+
+The bank is also written to question_banks/: <epic>.jsonl holds the
+language-neutral core (id, correct, difficulty, tags) and
+<epic>.<language>.jsonl the text of one language. Files in question_banks/
+take precedence over the artifact and are reloaded by the running app when
+they change, so both are regenerated together; source.json records the
+source they came from, and the app warns when it no longer matches.
+With --artifact-only question_banks/ is left untouched.
+"""
+
+import os
+import sys
+
+from question_bank import (ARTIFACT_FILE, QUESTION_BANK_DIR, EpicBank, _source_builders,
+                           build_from_source, export_split_bank, write_source_stamp)
+
+def export_banks():
+    """Write each epic from fast_questions.py as a core file plus language packs"""
+    os.makedirs(QUESTION_BANK_DIR, exist_ok=True)
+    for epic, build in _source_builders().items():
+        bank = EpicBank(epic, build(), "export")
+        paths = export_split_bank(bank, QUESTION_BANK_DIR)
+        print(f"✅ {epic}: {len(bank)} unique questions → {', '.join(os.path.basename(p) for p in paths)}")
+    write_source_stamp(QUESTION_BANK_DIR)
+
+def main():
+    """Build the question bank artifact"""
+    print(f"📦 Compiling question bank into {ARTIFACT_FILE}...")
+
+    try:
+        header = build_from_source()
+    except Exception as e:
+        print(f"❌ Build failed: {e}")
+        return 1
+
+    for epic, section in header["epics"].items():
+        print(f"✅ {epic}: {section['count']} questions ({section['length']} bytes)")
+    print(f"🔖 Bank version: {header['version']}")
+
+    if "--artifact-only" not in sys.argv[1:]:
+        print(f"\n📤 Exporting question banks to {QUESTION_BANK_DIR}...")
+        export_banks()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script to check offline-mode grading against real quiz data
+
+Draws quizzes from the question banks and template pools the app uses,
+in every language, and grades answer sheets a broken or modified client
+could send (out-of-range, bool, non-integer, short and long answer lists)
+with grade_answer_sheet, comparing each result with a plain re-grading.
+
+Usage: python check_offline_grading.py
+"""
+
+import sys
+
+from offline_quiz import SKIPPED, grade_answer_sheet
+from quiz_selection import QUIZ_EPICS, QUIZ_FORMATS, draw_format, load_sources
+
+LANGUAGES = ("english", "telugu")
+SEED = 20240601
+
+def quiz_questions(quiz_type, quiz_format, language):
+    """Questions of a seeded quiz, materialized as the app does for the offline component"""
+    banks = load_sources(QUIZ_EPICS.get(quiz_type, (quiz_type,)), quiz_format)
+    picks, _ = draw_format(banks, quiz_format, (), SEED)
+    return [banks[epic].view(language)[position] for epic, position in picks]
+
+def expected_grades(questions, language, answers):
+    """Reference grading: an answer counts only as an in-range int (not bool) at its question's index"""
+    chosen = []
+    for index, question in enumerate(questions):
+        answer = answers[index] if isinstance(answers, list) and index < len(answers) else SKIPPED
+        valid = (isinstance(answer, int) and not isinstance(answer, bool)
+                 and 0 <= answer < len(question["options"][language]))
+        chosen.append(answer if valid else SKIPPED)
+    return chosen, [answer == question["correct"] for answer, question in zip(chosen, questions)]
+
+def answer_sheets(questions, language):
+    """Named answer lists, from a perfect sheet to malformed ones"""
+    count = len(questions)
+    correct = [q["correct"] for q in questions]
+    num_options = [len(q["options"][language]) for q in questions]
+    return {
+        "all correct": correct,
+        "all wrong": [(c + 1) % n for c, n in zip(correct, num_options)],
+        "out of range": [n if i % 3 == 0 else -2 if i % 3 == 1 else 10**30 for i, n in enumerate(num_options)],
+        "bools": [bool(i % 2) for i in range(count)],
+        "non-integers": [float(c) if i % 2 else str(c) for i, c in enumerate(correct)],
+        "short list": correct[:count // 2],
+        "empty list": [],
+        "long list": correct + [0] * 5,
+        "not a list": "0,1,2",
+        "missing": None,
+    }
+
+def main():
+    """Grade every answer sheet for every quiz format, epic and language"""
+    print("🧪 Checking offline grading against real quiz data...")
+    failures = 0
+    checks = 0
+    for quiz_format in QUIZ_FORMATS:
+        quiz_types = ["exam"] if "epic" in QUIZ_FORMATS[quiz_format]["quotas"] else ["mahabharata", "ramayana"]
+        for quiz_type in quiz_types:
+            for language in LANGUAGES:
+                questions = quiz_questions(quiz_type, quiz_format, language)
+                for name, answers in answer_sheets(questions, language).items():
+                    checks += 1
+                    sheet = {"attempt_id": "check", "answers": answers, "elapsed_ms": 0}
+                    try:
+                        chosen, is_correct = grade_answer_sheet(questions, language, sheet)
+                        result = (chosen.tolist(), is_correct.tolist())
+                    except Exception as e:
+                        result = repr(e)
+                    if result != expected_grades(questions, language, answers):
+                        failures += 1
+                        print(f"❌ {quiz_format} {quiz_type} ({language}), {name}: {result}")
+
+    if failures:
+        print(f"\n❌ {failures} of {checks} answer sheets graded wrongly")
+        return 1
+    print(f"✅ All {checks} answer sheets graded correctly")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+# Columnar, memory-mapped copy of the score records for analytics queries
+#
+# Each attempt is one fixed-width row of a NumPy structured array stored in
+# score_columns/scores-v2.bin. Names, quiz types and languages are dictionary
+# encoded (score_columns/dictionary.jsonl) and timestamps are seconds since
+# the epoch of their wall-clock time (decoded as datetime64), so a million
+# attempts take ~24 MB and are queried with vectorized NumPy operations
+# instead of a list of dicts turned into a DataFrame.
+#
+# The store is derived from the main storage backend: save_score appends to
+# it and it is rebuilt from storage when missing or after admin deletions.
+# The data file name carries a format version, so a store written in an
+# older layout is rebuilt rather than misread.
+
+import datetime
+import json
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+COLUMNS_DIR = "score_columns"
+
+SCORE_DTYPE = np.dtype([
+    ("name", "<u4"),
+    ("quiz_type", "<u2"),
+    ("language", "<u2"),
+    ("score", "<u2"),
+    ("total", "<u2"),
+    ("percentage", "<f4"),
+    ("timestamp", "<i8"),
+])
+
+ENCODED_COLUMNS = ("name", "quiz_type", "language")
+
+
+def _to_epoch(timestamp: Optional[str]) -> int:
+    try:
+        moment = datetime.datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return 0
+    if moment.tzinfo is None:
+        # Naive timestamps keep their wall-clock time, independent of the server's zone
+        moment = moment.replace(tzinfo=datetime.timezone.utc)
+    return int(moment.timestamp())
+
+
+def _from_epoch(seconds: np.ndarray) -> np.ndarray:
+    """Vectorized epoch seconds -> datetime64, NaT where the timestamp was missing"""
+    moments = seconds.astype("datetime64[s]")
+    moments[seconds == 0] = np.datetime64("NaT")
+    return moments
+
+
+class ColumnarScores:
+    """Append-only structured array of scores, read through numpy.memmap"""
+
+    def __init__(self, directory: str = COLUMNS_DIR):
+        self.directory = directory
+        self.data_path = os.path.join(directory, "scores-v2.bin")
+        self.dictionary_path = os.path.join(directory, "dictionary.jsonl")
+        self._lock = threading.RLock()
+        self._values: Dict[str, List[str]] = {column: [] for column in ENCODED_COLUMNS}
+        self._codes: Dict[str, Dict[str, int]] = {column: {} for column in ENCODED_COLUMNS}
+        self._dictionary_loaded = False
+        self._memmap = None
+        self._memmap_rows = -1
+
+    def exists(self) -> bool:
+        return os.path.exists(self.data_path) and os.path.exists(self.dictionary_path)
+
+    # Dictionary encoding
+    def _load_dictionary(self):
+        if self._dictionary_loaded:
+            return
+        if os.path.exists(self.dictionary_path):
+            with open(self.dictionary_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        column, value = json.loads(line)
+                        self._codes[column][value] = len(self._values[column])
+                        self._values[column].append(value)
+        self._dictionary_loaded = True
+
+    def _encode(self, column: str, value: Optional[str], new_entries: list) -> int:
+        value = value if value is not None else ""
+        code = self._codes[column].get(value)
+        if code is None:
+            code = len(self._values[column])
+            self._codes[column][value] = code
+            self._values[column].append(value)
+            new_entries.append(json.dumps([column, value], ensure_ascii=False) + "\n")
+        return code
+
+    def decode(self, column: str, codes: np.ndarray) -> np.ndarray:
+        """Vectorized code -> string lookup"""
+        return np.asarray(self._values[column], dtype=object)[codes]
+
+    # Writing
+    def _encode_rows(self, records: Iterable[Dict], new_entries: list) -> np.ndarray:
+        records = list(records)
+        rows = np.zeros(len(records), dtype=SCORE_DTYPE)
+        for i, record in enumerate(records):
+            rows[i] = (
+                self._encode("name", record.get("name"), new_entries),
+                self._encode("quiz_type", record.get("quiz_type"), new_entries),
+                self._encode("language", record.get("language"), new_entries),
+                record.get("score", 0),
+                record.get("total", 0),
+                record.get("percentage", 0),
+                _to_epoch(record.get("timestamp")),
+            )
+        return rows
+
+    def append(self, record: Dict):
+        """Append one score row"""
+        with self._lock:
+            if not self.exists():
+                return  # Built from storage on first read instead
+            self._load_dictionary()
+            new_entries = []
+            rows = self._encode_rows([record], new_entries)
+            if new_entries:
+                with open(self.dictionary_path, "a", encoding="utf-8") as f:
+                    f.writelines(new_entries)
+            with open(self.data_path, "ab") as f:
+                f.write(rows.tobytes())
+
+    def rebuild(self, records: Iterable[Dict], batch_size: int = 10000):
+        """Rewrite the store from a stream of score records"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            self._values = {column: [] for column in ENCODED_COLUMNS}
+            self._codes = {column: {} for column in ENCODED_COLUMNS}
+            self._dictionary_loaded = True
+            self._memmap = None
+            self._memmap_rows = -1
+
+            data_tmp = self.data_path + ".tmp"
+            dictionary_tmp = self.dictionary_path + ".tmp"
+            new_entries = []
+            with open(data_tmp, "wb") as data_file:
+                batch = []
+                for record in records:
+                    batch.append(record)
+                    if len(batch) >= batch_size:
+                        data_file.write(self._encode_rows(batch, new_entries).tobytes())
+                        batch = []
+                if batch:
+                    data_file.write(self._encode_rows(batch, new_entries).tobytes())
+            with open(dictionary_tmp, "w", encoding="utf-8") as f:
+                f.writelines(new_entries)
+            os.replace(dictionary_tmp, self.dictionary_path)
+            os.replace(data_tmp, self.data_path)
+
+    def invalidate(self):
+        """Drop the files; the next read rebuilds them from storage"""
+        with self._lock:
+            self._memmap = None
+            self._memmap_rows = -1
+            for path in (self.data_path, self.dictionary_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._values = {column: [] for column in ENCODED_COLUMNS}
+            self._codes = {column: {} for column in ENCODED_COLUMNS}
+            self._dictionary_loaded = False
+
+    def ensure_built(self, source: Callable[[], Iterable[Dict]]):
+        """Build the store from `source` if its files are missing"""
+        with self._lock:
+            if not self.exists():
+                self.rebuild(source())
+
+    # Reading
+    def rows(self) -> np.ndarray:
+        """All rows as a read-only memory-mapped structured array"""
+        with self._lock:
+            self._load_dictionary()
+            size = os.path.getsize(self.data_path) if os.path.exists(self.data_path) else 0
+            count = size // SCORE_DTYPE.itemsize
+            if count == 0:
+                return np.zeros(0, dtype=SCORE_DTYPE)
+            if count != self._memmap_rows:
+                # Re-map only when rows were appended since the last read
+                self._memmap = np.memmap(self.data_path, dtype=SCORE_DTYPE, mode="r", shape=(count,))
+                self._memmap_rows = count
+            return self._memmap
+
+    def to_columns(self, rows: np.ndarray) -> Dict[str, object]:
+        """Decode selected rows into display columns"""
+        return {
+            "name": self.decode("name", rows["name"]),
+            "quiz_type": self.decode("quiz_type", rows["quiz_type"]),
+            "score": rows["score"],
+            "total": rows["total"],
+            "percentage": np.round(rows["percentage"].astype(np.float64), 2),
+            "language": self.decode("language", rows["language"]),
+            "timestamp": _from_epoch(rows["timestamp"]),
+        }
+
+    def sorted_attempts(self, limit: Optional[int] = None, offset: int = 0) -> Dict[str, object]:
+        """Attempts ordered by percentage then timestamp, newest first; only the requested page is decoded"""
+        rows = self.rows()
+        order = np.lexsort((-rows["timestamp"], -rows["percentage"]))
+        order = order[offset:] if limit is None else order[offset:offset + limit]
+        return self.to_columns(rows[order])
+
+    def top_attempts(self, limit: int = 10) -> Dict[str, object]:
+        """The `limit` highest-percentage attempts"""
+        rows = self.rows()
+        if len(rows) > limit:
+            candidates = np.argpartition(-rows["percentage"], limit - 1)[:limit]
+        else:
+            candidates = np.arange(len(rows))
+        candidates = candidates[np.argsort(-rows["percentage"][candidates], kind="stable")]
+        return self.to_columns(rows[candidates])
+
+    def players(self) -> List[str]:
+        """Distinct player names that have at least one score"""
+        rows = self.rows()
+        return list(self.decode("name", np.unique(rows["name"])))
+
+
+_columnar_scores: Optional[ColumnarScores] = None
+_columnar_lock = threading.Lock()
+
+
+def get_columnar_scores() -> ColumnarScores:
+    """Process-wide columnar store shared by all sessions"""
+    global _columnar_scores
+    with _columnar_lock:
+        if _columnar_scores is None:
+            _columnar_scores = ColumnarScores()
+        return _columnar_scores
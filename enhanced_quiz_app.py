@@ -6,16 +6,24 @@ import streamlit as st
 import json
 import datetime
 import pandas as pd
-import os
-import random
-import hashlib
 import time
+import uuid
 from typing import Dict, List, Optional
 
 # Enhanced imports for new features
 import base64
 from pathlib import Path
 
+from storage import get_storage
+from user_profile import UserProfile
+from score_indexes import get_score_indexes
+from columnar_scores import get_columnar_scores
+from question_bank import get_question_bank_loader
+from offline_quiz import SKIPPED, grade_answer_sheet, offline_quiz, quiz_payload
+from theme_styles import stylesheet_tag
+from quiz_selection import (QUIZ_EPICS, QUIZ_FORMATS, draw_format, draw_version, exclusion_hash, history_key,
+                            load_sources, load_version, new_quiz_seed, replay_guaranteed, scale_quotas)
+
 # Initialize session state for user management
 def init_session_state():
     """Initialize session state variables"""
@@ -31,82 +39,54 @@ def init_session_state():
         st.session_state.sound_enabled = True
 
 
-# User Profile Management
-class UserProfile:
-    def __init__(self, username: str):
-        self.username = username
-        self.created_date = datetime.datetime.now().isoformat()
-        self.total_quizzes = 0
-        self.total_score = 0
-        self.achievements = []
-        self.streak_days = 0
-        self.last_quiz_date = None
-        self.xp_points = 0
-        self.level = 1
-        self.preferred_language = 'english'
-        self.quiz_history = []
-        
-    def to_dict(self):
-        return {
-            'username': self.username,
-            'created_date': self.created_date,
-            'total_quizzes': self.total_quizzes,
-            'total_score': self.total_score,
-            'achievements': self.achievements,
-            'streak_days': self.streak_days,
-            'last_quiz_date': self.last_quiz_date,
-            'xp_points': self.xp_points,
-            'level': self.level,
-            'preferred_language': self.preferred_language,
-            'quiz_history': self.quiz_history
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        profile = cls(data['username'])
-        for key, value in data.items():
-            setattr(profile, key, value)
-        return profile
-
 # User Management Functions
 @st.cache_data
 def load_users():
-    """Load user profiles from file"""
-    if os.path.exists("user_profiles.json"):
-        with open("user_profiles.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    return {}
-
-def save_users(users_data):
-    """Save user profiles to file"""
-    with open("user_profiles.json", "w", encoding="utf-8") as f:
-        json.dump(users_data, f, ensure_ascii=False, indent=2)
-    load_users.clear()
+    """Load all user profiles from storage"""
+    return get_storage().load_users()
 
 def create_user_profile(username: str) -> UserProfile:
     """Create a new user profile"""
-    users = load_users()
-    if username.lower() in [u.lower() for u in users.keys()]:
-        return None  # User already exists
-    
     profile = UserProfile(username)
-    users[username] = profile.to_dict()
-    save_users(users)
+    if not get_storage().create_user(username, profile.to_dict()):
+        return None  # User already exists
+    load_users.clear()
     return profile
 
 def get_user_profile(username: str) -> Optional[UserProfile]:
     """Get user profile by username"""
-    users = load_users()
-    for stored_username, profile_data in users.items():
-        if stored_username.lower() == username.lower():
-            return UserProfile.from_dict(profile_data)
-    return None
+    profile_data = get_storage().get_user(username)
+    if profile_data is None:
+        return None
+    return UserProfile.from_dict(profile_data)
 
 def update_user_profile(profile: UserProfile):
     """Update user profile"""
-    users = load_users()
-    users[profile.username] = profile.to_dict()
-    save_users(users)
+    get_storage().save_user(profile.username, profile.to_dict())
+    load_users.clear()
+
+def delete_user_profile(username: str) -> bool:
+    """Delete a user profile (admin)"""
+    deleted = get_storage().delete_user(username)
+    load_users.clear()
+    return deleted
+
+def get_all_users_data() -> List[Dict]:
+    """Summaries of all user profiles for the admin user table"""
+    user_data = []
+    for username, profile_data in load_users().items():
+        user_data.append({
+            "username": username,
+            "created_date": profile_data.get("created_date"),
+            "level": profile_data.get("level", 1),
+            "xp_points": profile_data.get("xp_points", 0),
+            "total_quizzes": profile_data.get("total_quizzes", 0),
+            "streak_days": profile_data.get("streak_days", 0),
+            "last_quiz_date": profile_data.get("last_quiz_date"),
+            "preferred_language": profile_data.get("preferred_language", "english"),
+            "achievements": len(profile_data.get("achievements", []))
+        })
+    return user_data
 
 # Achievement System
 class AchievementSystem:
@@ -132,12 +112,15 @@ class AchievementSystem:
         if profile.total_quizzes == 1 and 'first_quiz' not in profile.achievements:
             new_achievements.append('first_quiz')
         
+        # Score achievements need a full-length quiz (a sprint doesn't count)
+        full_quiz = quiz_result['total'] >= QUIZ_FORMATS["standard"]["size"]
+        
         # Perfect score
-        if quiz_result['percentage'] == 100 and 'perfect_score' not in profile.achievements:
+        if full_quiz and quiz_result['percentage'] == 100 and 'perfect_score' not in profile.achievements:
             new_achievements.append('perfect_score')
         
         # High scorer
-        if quiz_result['percentage'] >= 80 and 'high_scorer' not in profile.achievements:
+        if full_quiz and quiz_result['percentage'] >= 80 and 'high_scorer' not in profile.achievements:
             new_achievements.append('high_scorer')
         
         # Quiz master
@@ -212,365 +195,10 @@ def get_xp_progress_percentage(xp_points: int, current_level: int) -> float:
     return min(max(progress, 0), 100)
 
 def get_xp_for_quiz(score: int, total: int, difficulty_bonus: float = 1.0) -> int:
-    """Calculate XP earned for a quiz"""
-    base_xp = (score / total) * 100
+    """Calculate XP earned for a quiz: 100 for a perfect standard quiz, scaled by its question count"""
+    base_xp = (score / total) * 100 * total / QUIZ_FORMATS["standard"]["size"]
     return int(base_xp * difficulty_bonus)
 
-# Theme System
-def get_theme_css(theme_name: str, font_size: str, accessibility_mode: bool) -> str:
-    """Generate CSS for different themes"""
-    
-    # Font size mapping
-    font_sizes = {
-        'small': {'base': '14px', 'h1': '1.8rem', 'h2': '1.5rem', 'h3': '1.3rem'},
-        'medium': {'base': '16px', 'h1': '2.2rem', 'h2': '1.8rem', 'h3': '1.5rem'},
-        'large': {'base': '18px', 'h1': '2.5rem', 'h2': '2rem', 'h3': '1.7rem'},
-        'extra-large': {'base': '20px', 'h1': '2.8rem', 'h2': '2.3rem', 'h3': '2rem'}
-    }
-    
-    fs = font_sizes[font_size]
-    
-    # Theme configurations
-    themes = {
-        'default': {
-            'primary': '#667eea',
-            'secondary': '#764ba2',
-            'accent': '#f093fb',
-            'background': '#ffffff',
-            'surface': '#f8f9fa',
-            'text': '#2c3e50',
-            'text_secondary': '#7f8c8d'
-        },
-        'dark': {
-            'primary': '#4a90e2',
-            'secondary': '#5a67d8',
-            'accent': '#ed64a6',
-            'background': '#1a202c',
-            'surface': '#2d3748',
-            'text': '#f7fafc',
-            'text_secondary': '#a0aec0'
-        },
-        'temple': {
-            'primary': '#d4af37',
-            'secondary': '#b8860b',
-            'accent': '#ff6b35',
-            'background': '#fdf6e3',
-            'surface': '#f4e4bc',
-            'text': '#8b4513',
-            'text_secondary': '#a0522d'
-        },
-        'forest': {
-            'primary': '#2d5016',
-            'secondary': '#3e6b1f',
-            'accent': '#7cb342',
-            'background': '#f1f8e9',
-            'surface': '#e8f5e8',
-            'text': '#1b5e20',
-            'text_secondary': '#388e3c'
-        }
-    }
-    
-    theme = themes.get(theme_name, themes['default'])
-    
-    # High contrast mode for accessibility
-    if accessibility_mode:
-        theme['text'] = '#000000'
-        theme['background'] = '#ffffff'
-        theme['surface'] = '#f0f0f0'
-    
-    return f"""
-    <style>
-    /* Base styling */
-    .stApp {{
-        background-color: {theme['background']};
-        color: {theme['text']};
-        font-size: {fs['base']};
-    }}
-    
-    /* Headers */
-    h1 {{ font-size: {fs['h1']} !important; color: {theme['primary']} !important; }}
-    h2 {{ font-size: {fs['h2']} !important; color: {theme['secondary']} !important; }}
-    h3 {{ font-size: {fs['h3']} !important; color: {theme['text']} !important; }}
-    
-    /* Enhanced score card */
-    .score-card {{
-        background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        color: white;
-        text-align: center;
-        box-shadow: 0 15px 35px rgba(0,0,0,0.3);
-        margin: 1.5rem 0;
-        animation: slideInUp 0.6s ease-out;
-        transform: translateY(0);
-    }}
-    
-    .score-card h2 {{
-        margin: 0;
-        font-size: 2.8rem !important;
-        text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        animation: pulse 2s infinite;
-    }}
-    
-    .score-card h3 {{
-        margin: 0.5rem 0;
-        font-size: 2.2rem !important;
-        color: #FFD700;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-    }}
-    
-    /* Achievement card */
-    .achievement-card {{
-        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin: 1rem 0;
-        box-shadow: 0 10px 25px rgba(0,0,0,0.2);
-        animation: bounceIn 0.8s ease-out;
-    }}
-    
-    /* User profile card */
-    .profile-card {{
-        background: linear-gradient(135deg, {theme['surface']} 0%, {theme['background']} 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        border: 2px solid {theme['primary']};
-        margin: 1rem 0;
-        box-shadow: 0 8px 20px rgba(0,0,0,0.1);
-    }}
-    
-    /* XP Progress bar */
-    .xp-progress {{
-        background: linear-gradient(90deg, {theme['primary']} 0%, {theme['accent']} 100%);
-        height: 20px;
-        border-radius: 10px;
-        margin: 0.5rem 0;
-        animation: progressFill 1s ease-out;
-    }}
-    
-    /* Statistics container */
-    .stats-container {{
-        background: linear-gradient(135deg, {theme['surface']} 0%, {theme['background']} 100%);
-        padding: 2rem;
-        border-radius: 20px;
-        margin: 1.5rem 0;
-        box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-        border: 1px solid {theme['primary']};
-    }}
-    
-    .stats-item {{
-        display: inline-block;
-        margin: 1rem;
-        text-align: center;
-        transition: transform 0.3s ease;
-    }}
-    
-    .stats-item:hover {{
-        transform: scale(1.05);
-    }}
-    
-    .stats-number {{
-        font-size: 2.5rem;
-        font-weight: bold;
-        color: {theme['primary']};
-        display: block;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
-    }}
-    
-    .stats-label {{
-        font-size: 1rem;
-        color: {theme['text_secondary']};
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        margin-top: 0.5rem;
-    }}
-    
-    /* Performance cards */
-    .performance-excellent {{
-        background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin: 1rem 0;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        animation: slideInRight 0.6s ease-out;
-    }}
-    
-    .performance-good {{
-        background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin: 1rem 0;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        animation: slideInRight 0.6s ease-out;
-    }}
-    
-    .performance-improve {{
-        background: linear-gradient(135deg, {theme['accent']} 0%, #f5576c 100%);
-        padding: 1.5rem;
-        border-radius: 15px;
-        color: white;
-        text-align: center;
-        margin: 1rem 0;
-        box-shadow: 0 8px 25px rgba(0,0,0,0.2);
-        animation: slideInRight 0.6s ease-out;
-    }}
-    
-    /* Buttons */
-    .stButton > button {{
-        background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
-        color: white;
-        border: none;
-        border-radius: 10px;
-        padding: 0.75rem 1.5rem;
-        font-size: {fs['base']};
-        font-weight: 600;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.2);
-    }}
-    
-    .stButton > button:hover {{
-        transform: translateY(-2px);
-        box-shadow: 0 6px 20px rgba(0,0,0,0.3);
-    }}
-    
-    /* Radio buttons */
-    .stRadio > div {{
-        background: {theme['surface']};
-        padding: 1rem;
-        border-radius: 10px;
-        border: 2px solid transparent;
-        transition: all 0.3s ease;
-    }}
-    
-    .stRadio > div:hover {{
-        border-color: {theme['primary']};
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-    }}
-    
-    /* Progress bar */
-    .stProgress > div > div {{
-        background: linear-gradient(90deg, {theme['primary']} 0%, {theme['accent']} 100%);
-        height: 15px;
-        border-radius: 10px;
-    }}
-    
-    /* Sidebar */
-    .css-1d391kg {{
-        background: linear-gradient(180deg, {theme['surface']} 0%, {theme['background']} 100%);
-    }}
-    
-    /* Animations */
-    @keyframes slideInUp {{
-        from {{
-            opacity: 0;
-            transform: translateY(30px);
-        }}
-        to {{
-            opacity: 1;
-            transform: translateY(0);
-        }}
-    }}
-    
-    @keyframes slideInRight {{
-        from {{
-            opacity: 0;
-            transform: translateX(30px);
-        }}
-        to {{
-            opacity: 1;
-            transform: translateX(0);
-        }}
-    }}
-    
-    @keyframes bounceIn {{
-        0% {{
-            opacity: 0;
-            transform: scale(0.3);
-        }}
-        50% {{
-            opacity: 1;
-            transform: scale(1.05);
-        }}
-        70% {{
-            transform: scale(0.9);
-        }}
-        100% {{
-            opacity: 1;
-            transform: scale(1);
-        }}
-    }}
-    
-    @keyframes pulse {{
-        0% {{
-            transform: scale(1);
-        }}
-        50% {{
-            transform: scale(1.05);
-        }}
-        100% {{
-            transform: scale(1);
-        }}
-    }}
-    
-    @keyframes progressFill {{
-        from {{
-            width: 0%;
-        }}
-        to {{
-            width: 100%;
-        }}
-    }}
-    
-    /* Mobile responsiveness */
-    @media (max-width: 768px) {{
-        .score-card {{
-            padding: 1.5rem;
-            margin: 1rem 0;
-        }}
-        
-        .score-card h2 {{
-            font-size: 2.2rem !important;
-        }}
-        
-        .score-card h3 {{
-            font-size: 1.8rem !important;
-        }}
-        
-        .stats-container {{
-            padding: 1.5rem;
-        }}
-        
-        .stats-item {{
-            margin: 0.5rem;
-        }}
-        
-        .stats-number {{
-            font-size: 2rem;
-        }}
-    }}
-    
-    /* Accessibility enhancements */
-    .stButton > button:focus,
-    .stRadio > div:focus-within {{
-        outline: 3px solid {theme['accent']};
-        outline-offset: 2px;
-    }}
-    
-    /* High contrast mode */
-    {'.high-contrast *' if accessibility_mode else ''} {{
-        border: 1px solid #000000 !important;
-        background: #ffffff !important;
-        color: #000000 !important;
-    }}
-    </style>
-    """
-
 # Certificate Generation
 def generate_certificate(username: str, quiz_type: str, score: int, total: int, percentage: float) -> str:
     """Generate a certificate for the user"""
@@ -626,175 +254,163 @@ def generate_certificate(username: str, quiz_type: str, score: int, total: int,
     """
     return certificate_html
 
-# Load original functions (simplified versions)
-@st.cache_data
-def load_questions():
-    """Load and cache questions for better performance"""
-    from fast_questions import get_mahabharata_questions, get_ramayana_questions
-    return {
-        "mahabharata": get_mahabharata_questions(),
-        "ramayana": get_ramayana_questions()
-    }
+# Quiz titles; questions are loaded per epic from the question bank artifact
+QUIZ_TITLES = {
+    "mahabharata": {"english": "Mahabharata Quiz", "telugu": "మహాభారత క్విజ్"},
+    "ramayana": {"english": "Ramayana Quiz", "telugu": "రామాయణ క్విజ్"},
+    "exam": {"english": "Mixed Epic Exam", "telugu": "మిశ్రమ ఇతిహాస పరీక్ష"}
+}
+
+# Quiz lengths offered for the single-epic quizzes
+FORMAT_LABELS = {"standard": "Standard", "sprint": "Sprint", "facts": "Facts"}
+
+def load_questions(quiz_type):
+    """Current question bank of one epic, loaded on first use and reloaded when its file changes"""
+    return get_question_bank_loader().load(quiz_type)
+
+def load_banks(quiz_type, quiz_format="standard"):
+    """Question banks (or template pools, for a "templates" format) a quiz draws from, by epic"""
+    return load_sources(QUIZ_EPICS.get(quiz_type, (quiz_type,)), quiz_format)
+
+def quiz_banks():
+    """Banks the running quiz was drawn from, shared by all sessions
+
+    Found by the versions in quiz_draw, so a bank reloaded mid-quiz doesn't
+    change the quiz.
+    """
+    return [load_version(version) for version in st.session_state.quiz_draw["bank_version"].split("+")]
+
+def resolve_questions(qids, language):
+    """Questions of the running quiz by ID, materialized in one language from the shared banks
+
+    A quiz whose banks are gone (e.g. its pin expired and the bank was
+    reloaded) can't be shown any more, so it is restarted.
+    """
+    banks = quiz_banks()
+    questions = []
+    try:
+        for qid in qids:
+            bank = next(bank for bank in banks if bank is not None and bank.position(qid) is not None)
+            questions.append(bank.view(language)[bank.position(qid)])
+    except (StopIteration, KeyError):  # KeyError: an archived core has no language packs
+        st.error("This quiz's questions are no longer available. Restarting quiz...")
+        restart_quiz()
+        st.rerun()
+    return questions
+
+def quiz_label(row):
+    """Quiz type and format of a leaderboard row, e.g. "Ramayana (Sprint)" """
+    quiz_format = row.get('quiz_format') or 'standard'
+    if quiz_format not in FORMAT_LABELS:  # The exam is its own format
+        return row['quiz_type'].title()
+    return f"{row['quiz_type'].title()} ({FORMAT_LABELS[quiz_format]})"
+
+def describe_format(quiz_format):
+    """One-line summary of a quiz format's size and difficulty mix"""
+    spec = QUIZ_FORMATS[quiz_format]
+    counts = scale_quotas(spec["quotas"]["difficulty"], spec["size"])
+    mix = " + ".join(f"{count} {difficulty.title()}" for difficulty, count in counts.items())
+    epics = spec["quotas"].get("epic")
+    source = f", split across {' and '.join(epic.title() for epic in epics)}" if epics else ""
+    if spec.get("source") == "templates":
+        source += ", generated from relationship facts"
+    return f"{mix} questions ({spec['size']} total{source})"
 
-@st.cache_data
 def get_quiz_data():
-    """Get quiz data with caching"""
-    questions = load_questions()
-    return {
-        "mahabharata": {
-            "title": {"english": "Mahabharata Quiz", "telugu": "మహాభారత క్విజ్"},
-            "questions": questions["mahabharata"]
-        },
-        "ramayana": {
-            "title": {"english": "Ramayana Quiz", "telugu": "రామాయణ క్విజ్"},
-            "questions": questions["ramayana"]
-        }
-    }
+    """Get quiz titles per epic"""
+    return {quiz_type: {"title": title} for quiz_type, title in QUIZ_TITLES.items()}
 
 @st.cache_data
 def load_scores():
-    """Load existing scores from file with caching"""
-    if os.path.exists("quiz_scores.json"):
-        with open("quiz_scores.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
-
-def save_score(name, quiz_type, score, total, language, timestamp, questions_used):
-    """Save quiz score to file and clear cache"""
-    scores = load_scores()
-    scores.append({
+    """Load existing scores from storage with caching"""
+    return list(get_storage().iter_scores())
+
+def save_score(name, quiz_type, score, total, language, timestamp, questions_used, quiz_draw=None,
+               attempt_id=None):
+    """Save quiz score to storage and clear cache; False if the attempt was already saved
+
+    A seeded quiz is stored as its seed, bank version and exclusion hash
+    (quiz_draw) instead of the question IDs, as long as the user's history
+    is still the one the quiz was drawn against. The IDs are kept as well
+    when a later replay isn't guaranteed (e.g. an unarchived bank version).
+    """
+    record = {
         "name": name,
         "quiz_type": quiz_type,
         "score": score,
         "total": total,
         "percentage": round((score/total)*100, 2),
         "language": language,
-        "timestamp": timestamp,
-        "questions_used": questions_used
-    })
-    with open("quiz_scores.json", "w", encoding="utf-8") as f:
-        json.dump(scores, f, ensure_ascii=False, indent=2)
+        "timestamp": timestamp
+    }
+    if attempt_id is not None:
+        record["attempt_id"] = attempt_id
+    history = get_user_history(name, quiz_type, quiz_draw["quiz_format"] if quiz_draw else None)
+    if quiz_draw:
+        # Leaderboard rows are per format, so this is kept even without the seed
+        record["quiz_format"] = quiz_draw["quiz_format"]
+    if quiz_draw and quiz_draw["exclusion_hash"] == exclusion_hash(history):
+        record.update(quiz_draw)
+        if not replay_guaranteed(record, history, questions_used):
+            record["questions_used"] = questions_used
+    else:
+        # e.g. another session of the same user finished a quiz meanwhile
+        record["questions_used"] = questions_used
+    if not get_storage().add_score(record):
+        return False  # Duplicate commit of the same attempt
+    get_score_indexes().add_score(record)
+    get_columnar_scores().append(record)
     load_scores.clear()
+    return True
 
-def get_user_history(name, quiz_type):
-    """Get user's quiz history to avoid repeated questions"""
-    scores = load_scores()
-    user_scores = [s for s in scores if s["name"].lower() == name.lower() and s["quiz_type"] == quiz_type]
-    used_questions = []
-    
-    for score in user_scores:
-        if "questions_used" in score and isinstance(score["questions_used"], list):
-            used_questions.extend(score["questions_used"])
-    
-    # Remove duplicates and return
-    unique_used = list(set(used_questions))
-    
-    # Limit history to prevent running out of questions (keep last 100 questions)
-    if len(unique_used) > 100:
-        # Keep only the most recent questions by sorting scores by timestamp
-        user_scores.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-        recent_used = []
-        for score in user_scores[:5]:  # Last 5 quizzes
-            if "questions_used" in score and isinstance(score["questions_used"], list):
-                recent_used.extend(score["questions_used"])
-        unique_used = list(set(recent_used))
-    
-    return unique_used
-
-def get_random_questions(quiz_type, num_questions=20, exclude_questions=None):
-    """Get random questions with difficulty distribution - No caching to ensure randomness"""
-    if exclude_questions is None:
-        exclude_questions = []
-    
-    quiz_data = get_quiz_data()
-    all_questions = quiz_data[quiz_type]["questions"]
-    
-    # Create unique question IDs using both question text and index
-    available_questions = []
-    for i, q in enumerate(all_questions):
-        # Create more unique ID using question text + index + first option
-        question_text = q["question"]["english"]
-        first_option = q["options"]["english"][0] if q["options"]["english"] else ""
-        unique_content = f"{i}_{question_text}_{first_option}"
-        question_id = hashlib.md5(unique_content.encode()).hexdigest()[:12]
-        
-        # Only include if not in excluded questions
-        if question_id not in exclude_questions:
-            difficulty = q.get("difficulty", "medium")
-            available_questions.append((i, question_id, q, difficulty))
-    
-    # If we don't have enough unique questions, reset the exclusion list partially
-    if len(available_questions) < num_questions:
-        st.warning(f"Only {len(available_questions)} unique questions available. Including some previously seen questions.")
-        # Include all questions but prioritize unseen ones
-        all_with_ids = []
-        for i, q in enumerate(all_questions):
-            question_text = q["question"]["english"]
-            first_option = q["options"]["english"][0] if q["options"]["english"] else ""
-            unique_content = f"{i}_{question_text}_{first_option}"
-            question_id = hashlib.md5(unique_content.encode()).hexdigest()[:12]
-            difficulty = q.get("difficulty", "medium")
-            priority = 0 if question_id in exclude_questions else 1  # Prioritize unseen
-            all_with_ids.append((i, question_id, q, difficulty, priority))
-        
-        # Sort by priority (unseen first) then shuffle within priority groups
-        all_with_ids.sort(key=lambda x: x[4], reverse=True)
-        available_questions = [(i, qid, q, diff) for i, qid, q, diff, _ in all_with_ids]
-    
-    # Separate by difficulty
-    easy_questions = [q for q in available_questions if q[3] == "easy"]
-    medium_questions = [q for q in available_questions if q[3] == "medium"]
-    hard_questions = [q for q in available_questions if q[3] == "hard"]
-    
-    # If no difficulty specified, treat as medium
-    if not easy_questions and not medium_questions and not hard_questions:
-        medium_questions = available_questions
-    
-    selected_questions = []
-    
-    # Target distribution: 6 easy, 8 medium, 6 hard (adjustable based on availability)
-    easy_target = min(6, len(easy_questions))
-    medium_target = min(8, len(medium_questions))
-    hard_target = min(6, len(hard_questions))
-    
-    # Select questions by difficulty
-    if easy_questions and easy_target > 0:
-        selected_questions.extend(random.sample(easy_questions, easy_target))
-    
-    if medium_questions and medium_target > 0:
-        # Avoid duplicates from easy selection
-        available_medium = [q for q in medium_questions if q not in selected_questions]
-        if available_medium:
-            medium_target = min(medium_target, len(available_medium))
-            selected_questions.extend(random.sample(available_medium, medium_target))
-    
-    if hard_questions and hard_target > 0:
-        # Avoid duplicates from previous selections
-        available_hard = [q for q in hard_questions if q not in selected_questions]
-        if available_hard:
-            hard_target = min(hard_target, len(available_hard))
-            selected_questions.extend(random.sample(available_hard, hard_target))
-    
-    # Fill remaining slots with any available questions
-    while len(selected_questions) < num_questions and len(selected_questions) < len(available_questions):
-        remaining_questions = [q for q in available_questions if q not in selected_questions]
-        if remaining_questions:
-            additional_needed = min(num_questions - len(selected_questions), len(remaining_questions))
-            selected_questions.extend(random.sample(remaining_questions, additional_needed))
-        else:
-            break
-    
-    # Final shuffle and return
-    random.shuffle(selected_questions)
-    final_questions = selected_questions[:num_questions]
+def get_score_columns():
+    """Columnar score store for vectorized leaderboard and analytics queries"""
+    columns = get_columnar_scores()
+    columns.ensure_built(lambda: get_storage().iter_scores())
+    return columns
+
+def delete_user_from_leaderboard(username):
+    """Remove all of a user's scores from the leaderboard"""
+    try:
+        get_storage().delete_user_scores(username)
+        get_score_indexes().remove_user(username)
+        get_columnar_scores().invalidate()
+        load_scores.clear()
+        return True
+    except Exception:
+        return False
+
+def clear_all_scores():
+    """Remove every score from the leaderboard"""
+    get_storage().clear_scores()
+    get_score_indexes().clear()
+    get_columnar_scores().invalidate()
+    load_scores.clear()
+
+def get_user_history(name, quiz_type, quiz_format=None):
+    """Get user's quiz history to avoid repeated questions
+
+    Shared by quiz types with a common epic; generated Facts questions have their own.
+    """
+    # Limit history to prevent running out of questions: past 100 seen
+    # questions only the last 5 quizzes count
+    return get_score_indexes().get_seen_questions(name, history_key(quiz_type, quiz_format), max_questions=100,
+                                                  recent_attempts=5)
+
+def get_random_questions(quiz_type, quiz_format="standard", exclude_questions=None, banks=None, seed=None):
+    """IDs of random questions with the format's size and quotas - No caching to ensure randomness
+
+    With a seed, the same bank versions and excluded questions always give the same quiz.
+    """
+    if banks is None:
+        banks = load_banks(quiz_type, quiz_format)
     
-    # Debug info
-    difficulties = [q[3] for q in final_questions]
-    easy_count = difficulties.count("easy")
-    medium_count = difficulties.count("medium") 
-    hard_count = difficulties.count("hard")
+    # Quotas per difficulty (and epic), unseen questions first
+    picks, reused = draw_format(banks, quiz_format, exclude_questions or (), seed)
+    if reused:
+        st.warning(f"Only {len(picks) - reused} unique questions available. Including some previously seen questions.")
     
-    return final_questions
+    return [banks[epic].id_at(i) for epic, i in picks]
 
 # Continue in next part due to length...
 # User Authentication UI
@@ -863,11 +479,11 @@ def show_admin_overview():
     try:
         st.subheader("📊 System Overview")
         
-        # Get system stats
+        # Get system stats (maintained on write, no score scan)
         users = load_users()
-        scores = load_scores()
+        analytics = get_score_indexes().get_analytics_summary()
         
-        st.success(f"✅ Loaded {len(users)} users and {len(scores)} scores")
+        st.success(f"✅ Loaded {len(users)} users and {analytics['total_attempts']} scores")
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -875,22 +491,19 @@ def show_admin_overview():
             st.metric("Total Users", len(users))
         
         with col2:
-            st.metric("Total Quiz Attempts", len(scores))
+            st.metric("Total Quiz Attempts", analytics['total_attempts'])
         
         with col3:
-            active_users = len(set(s.get("name", "") for s in scores if s.get("timestamp", "").startswith("2024")))
-            st.metric("Active Users (2024)", active_users)
+            st.metric(f"Active Users ({analytics['active_days']} days)", analytics['active_users'])
         
         with col4:
-            avg_score = sum(s.get("percentage", 0) for s in scores) / len(scores) if scores else 0
-            st.metric("Average Score", f"{avg_score:.1f}%")
+            st.metric("Average Score", f"{analytics['average_percentage']:.1f}%")
         
         # Recent activity
         st.subheader("🕒 Recent Activity")
-        if scores:
-            recent_scores = sorted(scores, key=lambda x: x.get("timestamp", ""), reverse=True)[:5]
-            for score in recent_scores:
-                st.write(f"**{score.get('name', 'Unknown')}** - {score.get('quiz_type', 'Unknown').title()} Quiz - {score.get('percentage', 0)}%")
+        if analytics['recent']:
+            for score in analytics['recent']:
+                st.write(f"**{score.get('name') or 'Unknown'}** - {(score.get('quiz_type') or 'Unknown').title()} Quiz - {score.get('percentage', 0)}% - {score.get('timestamp') or 'Unknown time'}")
         else:
             st.info("No recent activity")
             
@@ -898,15 +511,6 @@ def show_admin_overview():
         st.error(f"Error in admin overview: {e}")
         import traceback
         st.code(traceback.format_exc())
-    
-    # Recent activity
-    st.subheader("🕒 Recent Activity")
-    if scores:
-        recent_scores = sorted(scores, key=lambda x: x.get("timestamp", ""), reverse=True)[:10]
-        for score in recent_scores:
-            st.write(f"**{score.get('name', 'Unknown')}** - {score.get('quiz_type', 'Unknown').title()} Quiz - {score.get('percentage', 0)}% - {score.get('timestamp', 'Unknown time')}")
-    else:
-        st.info("No recent activity")
 
 def show_user_management():
     """Show user management interface"""
@@ -948,20 +552,26 @@ def show_user_management():
             else:
                 st.error("Failed to delete user")
 
+# Attempts per page of the admin leaderboard listing
+LEADERBOARD_PAGE_SIZE = 50
+
 def show_leaderboard_management():
     """Show leaderboard management interface"""
     st.subheader("🏆 Leaderboard Management")
     
-    scores = load_scores()
-    if not scores:
+    columns = get_score_columns()
+    if not len(columns.rows()):
         st.info("No scores found")
         return
     
-    # Display current leaderboard
-    df = pd.DataFrame(scores)
-    df_sorted = df.sort_values(['percentage', 'timestamp'], ascending=[False, False])
+    # Display current leaderboard (sorted column-wise, only one page decoded)
+    attempts = len(columns.rows())
+    pages = -(-attempts // LEADERBOARD_PAGE_SIZE)
     
     st.markdown("#### Current Leaderboard")
+    page = st.number_input(f"Page (of {pages}, {LEADERBOARD_PAGE_SIZE} attempts each)", min_value=1,
+                           max_value=pages, value=1, key="leaderboard_page")
+    df_sorted = pd.DataFrame(columns.sorted_attempts(LEADERBOARD_PAGE_SIZE, (page - 1) * LEADERBOARD_PAGE_SIZE))
     st.dataframe(df_sorted[['name', 'quiz_type', 'score', 'total', 'percentage', 'timestamp']], use_container_width=True)
     
     # Leaderboard actions
@@ -971,7 +581,7 @@ def show_leaderboard_management():
     
     with col1:
         st.markdown("#### Remove User from Leaderboard")
-        users_in_leaderboard = list(set(s.get("name", "") for s in scores))
+        users_in_leaderboard = columns.players()
         selected_user = st.selectbox("Select User", users_in_leaderboard, key="remove_from_leaderboard")
         
         if st.button("Remove from Leaderboard", key="remove_leaderboard_btn", type="secondary"):
@@ -985,9 +595,7 @@ def show_leaderboard_management():
         st.markdown("#### Clear All Scores")
         if st.button("🗑️ Clear All Scores", key="clear_all_scores", type="secondary"):
             if st.button("⚠️ Confirm Clear All", key="confirm_clear_all"):
-                with open("quiz_scores.json", "w", encoding="utf-8") as f:
-                    json.dump([], f, indent=2)
-                load_scores.clear()
+                clear_all_scores()
                 st.success("All scores cleared!")
                 st.rerun()
 
@@ -995,49 +603,27 @@ def show_admin_analytics():
     """Show detailed analytics"""
     st.subheader("📈 Analytics Dashboard")
     
-    scores = load_scores()
-    users = load_users()
+    analytics = get_score_indexes().get_analytics_summary()
     
-    if not scores:
+    if not analytics['total_attempts']:
         st.info("No data available for analytics")
         return
     
     # Quiz type distribution
     st.markdown("#### Quiz Type Distribution")
-    quiz_types = {}
-    for score in scores:
-        quiz_type = score.get("quiz_type", "Unknown")
-        quiz_types[quiz_type] = quiz_types.get(quiz_type, 0) + 1
-    
     col1, col2 = st.columns(2)
     with col1:
-        st.bar_chart(quiz_types)
+        st.bar_chart(analytics['quiz_type_counts'])
     
     # Score distribution
     with col2:
         st.markdown("#### Score Distribution")
-        score_ranges = {"0-20%": 0, "21-40%": 0, "41-60%": 0, "61-80%": 0, "81-100%": 0}
-        for score in scores:
-            percentage = score.get("percentage", 0)
-            if percentage <= 20:
-                score_ranges["0-20%"] += 1
-            elif percentage <= 40:
-                score_ranges["21-40%"] += 1
-            elif percentage <= 60:
-                score_ranges["41-60%"] += 1
-            elif percentage <= 80:
-                score_ranges["61-80%"] += 1
-            else:
-                score_ranges["81-100%"] += 1
-        
-        st.bar_chart(score_ranges)
+        st.bar_chart(analytics['score_distribution'])
     
     # Top performers
     st.markdown("#### Top Performers")
-    df = pd.DataFrame(scores)
-    if not df.empty:
-        top_scores = df.nlargest(10, 'percentage')[['name', 'quiz_type', 'percentage', 'timestamp']]
-        st.dataframe(top_scores, use_container_width=True)
+    top_scores = pd.DataFrame(get_score_columns().top_attempts(10))
+    st.dataframe(top_scores[['name', 'quiz_type', 'percentage', 'timestamp']], use_container_width=True)
 
 def show_system_tools():
     """Show system management tools"""
@@ -1049,6 +635,7 @@ def show_system_tools():
         st.markdown("#### Data Management")
         
         if st.button("📥 Export All Data", key="export_data"):
+            get_storage().flush()
             users = load_users()
             scores = load_scores()
             
@@ -1067,11 +654,10 @@ def show_system_tools():
         
         if st.button("🔄 Reset All Data", key="reset_all_data", type="secondary"):
             if st.button("⚠️ Confirm Reset", key="confirm_reset_all"):
-                # Reset all data files
-                with open("quiz_scores.json", "w", encoding="utf-8") as f:
-                    json.dump([], f, indent=2)
-                with open("user_profiles.json", "w", encoding="utf-8") as f:
-                    json.dump({}, f, indent=2)
+                # Reset all stored data
+                get_storage().reset()
+                get_score_indexes().clear()
+                get_columnar_scores().invalidate()
                 load_scores.clear()
                 load_users.clear()
                 st.success("All data reset successfully!")
@@ -1081,17 +667,20 @@ def show_system_tools():
         st.markdown("#### System Information")
         
         users = load_users()
-        scores = load_scores()
+        total_scores = get_score_indexes().get_analytics_summary()['total_attempts']
         
         st.info(f"""
         **System Status:**
         - Total Users: {len(users)}
-        - Total Scores: {len(scores)}
+        - Total Scores: {total_scores}
         - Data Files: ✅ Accessible
         - Admin Access: ✅ Active
         """)
         
         if st.button("🧹 Clear Cache", key="clear_cache"):
+            get_storage().invalidate()
+            get_score_indexes().invalidate()
+            get_columnar_scores().invalidate()
             load_scores.clear()
             load_users.clear()
             st.success("Cache cleared!")
@@ -1145,9 +734,34 @@ def show_settings():
             'forest': '🌲 Forest Theme'
         }
         
-        st.info("🎨 Theme customization temporarily disabled for better consistency across platforms")
+        theme = st.selectbox(
+            "Theme",
+            options=list(theme_options),
+            format_func=theme_options.get,
+            index=list(theme_options).index(st.session_state.theme)
+        )
+        
+        if theme != st.session_state.theme:
+            st.session_state.theme = theme
+            st.rerun()
+        
+        font_size_options = {
+            'small': 'Small',
+            'medium': 'Medium',
+            'large': 'Large',
+            'extra-large': 'Extra Large'
+        }
+        
+        font_size = st.selectbox(
+            "📝 Font Size",
+            options=list(font_size_options),
+            format_func=font_size_options.get,
+            index=list(font_size_options).index(st.session_state.font_size)
+        )
         
-        st.info("📝 Font size customization temporarily disabled for better consistency")
+        if font_size != st.session_state.font_size:
+            st.session_state.font_size = font_size
+            st.rerun()
     
     with col2:
         st.markdown("### ♿ Accessibility Settings")
@@ -1200,49 +814,42 @@ def show_settings():
 # Enhanced Leaderboard (simplified version)
 def display_enhanced_leaderboard():
     """Display enhanced leaderboard with user profiles"""
-    scores = load_scores()
-    if not scores:
+    # Best attempt per player, epic and format, already sorted by the index
+    leaders = get_score_indexes().get_leaderboard(20)
+    if not leaders:
         st.info("No scores yet! Take a quiz to see the leaderboard.")
         return
     
-    df = pd.DataFrame(scores)
-    df_best = df.loc[df.groupby(['name', 'quiz_type'])['percentage'].idxmax()]
-    df_best = df_best.sort_values(['percentage', 'timestamp'], ascending=[False, False])
-    
     st.subheader("🏆 Epic Quiz Champions")
     
     # Top 3 podium
-    if len(df_best) >= 3:
+    if len(leaders) >= 3:
         st.markdown("### 🥇🥈🥉 Top 3 Champions")
         cols = st.columns(3)
         
-        for i, (_, row) in enumerate(df_best.head(3).iterrows()):
-            medals = ['🥇', '🥈', '🥉']
+        medals = ['🥇', '🥈', '🥉']
+        for i, row in enumerate(leaders[:3]):
             with cols[i]:
                 st.markdown(f"""
                 <div class="achievement-card">
                     <h2>{medals[i]}</h2>
                     <h3>{row['name']}</h3>
-                    <p>{row['quiz_type'].title()}</p>
+                    <p>{quiz_label(row)}</p>
                     <h4>{row['percentage']}%</h4>
                 </div>
                 """, unsafe_allow_html=True)
     
     # Full leaderboard
     st.markdown("### 📊 Full Leaderboard")
-    if len(df_best) > 0:
-        display_df = df_best.head(20)[['name', 'quiz_type', 'score', 'total', 'percentage', 'language', 'timestamp']]
-        display_df['Quiz'] = display_df['quiz_type'].str.title()
-        display_df['Score'] = display_df['score'].astype(str) + '/' + display_df['total'].astype(str) + ' (' + display_df['percentage'].astype(str) + '%)'
-        display_df['Date'] = pd.to_datetime(display_df['timestamp']).dt.strftime('%Y-%m-%d')
-        
-        final_df = display_df[['name', 'Quiz', 'Score', 'language', 'Date']].rename(columns={
-            'name': 'Player',
-            'language': 'Language',
-            'Date': 'Date'
-        })
-        
-        st.dataframe(final_df, use_container_width=True, hide_index=True)
+    final_rows = [{
+        'Player': row['name'],
+        'Quiz': quiz_label(row),
+        'Score': f"{row['score']}/{row['total']} ({row['percentage']}%)",
+        'Language': row['language'],
+        'Date': (row['timestamp'] or '')[:10]
+    } for row in leaders]
+    
+    st.dataframe(final_rows, use_container_width=True, hide_index=True)
 
 # Main Application
 def main():
@@ -1257,110 +864,11 @@ def main():
         initial_sidebar_state="expanded"
     )
     
-    # Apply consistent styling for both localhost and cloud
-    st.markdown("""
-    <style>
-    /* Base app styling */
-    .stApp {
-        font-family: 'Source Sans Pro', sans-serif;
-    }
-    
-    /* Keep toolbar visible but move content down 3cm */
-    .main .block-container {
-        padding-top: 3cm !important;
-        max-width: 1200px;
-    }
-    
-    /* Metric containers */
-    [data-testid="metric-container"] {
-        background-color: #f8f9fa;
-        border: 1px solid #dee2e6;
-        padding: 1rem;
-        border-radius: 8px;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-    }
-    
-    /* Button consistency */
-    .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 0.75rem 1.5rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        width: 100%;
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-    }
-    
-    /* Success/Info boxes */
-    .stSuccess, .stInfo, .stWarning, .stError {
-        border-radius: 8px;
-        padding: 1rem;
-    }
-    
-    /* Form styling */
-    .stForm {
-        border: 1px solid #dee2e6;
-        border-radius: 8px;
-        padding: 1.5rem;
-        background-color: #ffffff;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
-    }
-    
-    /* Radio button styling */
-    .stRadio > div {
-        background-color: #f8f9fa;
-        padding: 0.5rem;
-        border-radius: 6px;
-        margin: 0.25rem 0;
-        border: 1px solid #dee2e6;
-    }
-    
-    /* Sidebar consistency */
-    .css-1d391kg {
-        background-color: #f8f9fa;
-        border-right: 1px solid #dee2e6;
-    }
-    
-    /* Header styling */
-    h1, h2, h3 {
-        color: #2c3e50;
-        font-weight: 600;
-    }
-    
-    /* Progress bar */
-    .stProgress > div > div {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        border-radius: 10px;
-    }
-    
-    /* Keep Streamlit toolbar visible */
-    .stApp > header {
-        display: block !important;
-    }
-    
-    /* Ensure proper spacing from top toolbar */
-    .stApp > div:first-child {
-        margin-top: 0 !important;
-    }
-    
-    /* Compact tabs */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0;
-        margin-top: 0.5rem;
-    }
-    
-    /* Compact form elements */
-    .stTextInput > div > div > input {
-        padding: 0.5rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    # Precomputed stylesheet: a <link> to its cached static file when served
+    st.markdown(stylesheet_tag(st.session_state.theme, st.session_state.font_size,
+                               st.session_state.accessibility_mode,
+                               st.get_option("server.enableStaticServing")),
+                unsafe_allow_html=True)
     
     # Check if user is logged in
     if not st.session_state.user_profile:
@@ -1460,10 +968,10 @@ def show_quiz_interface():
     
     # Show quiz interface if quiz is already started
     if hasattr(st.session_state, 'quiz_started') and st.session_state.quiz_started:
-        # Check if quiz questions have the correct format
+        # Check if quiz questions have the correct format (question IDs)
         if hasattr(st.session_state, 'quiz_questions') and st.session_state.quiz_questions:
             sample_question = st.session_state.quiz_questions[0]
-            if len(sample_question) != 4:
+            if not isinstance(sample_question, str):
                 st.warning("Detected old quiz format. Restarting quiz with new format...")
                 restart_quiz()
                 st.rerun()
@@ -1497,39 +1005,64 @@ def show_quiz_interface():
     # Quiz selection
     st.subheader("📖 Choose Your Epic Adventure")
     st.info(f"Quiz will be displayed in: **{lang_display}**")
-    st.info("📊 **Difficulty Distribution**: 6 Easy + 8 Medium + 6 Hard questions (20 total)")
+    # The radio isn't rendered during a quiz, so its choice is kept under its own key
+    quiz_format = st.radio("⏱️ Quiz Length", list(FORMAT_LABELS), key="quiz_format_choice", horizontal=True,
+                           index=list(FORMAT_LABELS).index(st.session_state.get('selected_format', 'standard')),
+                           format_func=lambda name: f"{FORMAT_LABELS[name]} ({QUIZ_FORMATS[name]['size']} questions)")
+    st.session_state.selected_format = quiz_format
+    st.session_state.offline_mode = st.checkbox(
+        "📶 Offline mode: play the whole quiz in the browser and submit once (for slow or unstable connections)",
+        value=st.session_state.get('offline_mode', False), key="offline_mode_choice")
+    st.info(f"📊 **Difficulty Distribution**: {describe_format(quiz_format)}")
     
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("🏹 Mahabharata Quiz", key="enhanced_maha", use_container_width=True):
-            start_quiz("mahabharata")
+            start_quiz("mahabharata", quiz_format)
     
     with col2:
         if st.button("🏺 Ramayana Quiz", key="enhanced_rama", use_container_width=True):
-            start_quiz("ramayana")
+            start_quiz("ramayana", quiz_format)
+    
+    st.markdown("#### 📜 Mixed Epic Exam")
+    st.info(f"📊 **Exam**: {describe_format('exam')}")
+    if st.button("📜 Start Mixed Epic Exam", key="enhanced_exam", use_container_width=True):
+        start_quiz("exam", "exam")
 
-def start_quiz(quiz_type):
+def start_quiz(quiz_type, quiz_format="standard"):
     """Start a new quiz with enhanced features"""
     profile = st.session_state.user_profile
     
     # Get user's previous questions to avoid repetition
-    used_questions = get_user_history(profile.username, quiz_type)
-    selected_questions = get_random_questions(quiz_type, 20, used_questions)
+    used_questions = get_user_history(profile.username, quiz_type, quiz_format)
+    # The quiz keeps these bank versions (recorded in quiz_draw) until it
+    # ends, even if a bank file is reloaded meanwhile
+    banks = load_banks(quiz_type, quiz_format)
+    seed = new_quiz_seed()
+    selected_questions = get_random_questions(quiz_type, quiz_format, used_questions, banks, seed)
     
     st.session_state.selected_quiz = quiz_type
+    # Identifies this attempt when its score is committed, so it is committed once
+    st.session_state.attempt_id = uuid.uuid4().hex
+    # Held until restart_quiz, so the quiz can still be shown if a bank file is reloaded
+    get_question_bank_loader().pin(st.session_state.attempt_id, banks.values())
+    # Enough to replay this exact quiz; stored with the score instead of the question IDs
+    st.session_state.quiz_draw = {"quiz_seed": seed, "bank_version": "+".join(bank.version for bank in banks.values()),
+                                  "exclusion_hash": exclusion_hash(used_questions), "quiz_format": quiz_format,
+                                  "draw_version": draw_version(quiz_format)}
     st.session_state.quiz_started = True
     st.session_state.current_question = 0
     st.session_state.score = 0
+    # The session keeps only question IDs and chosen option indexes; text is
+    # looked up in the shared banks when it is rendered
     st.session_state.answers = []
     st.session_state.quiz_questions = selected_questions
-    st.session_state.questions_used = [qid for _, qid, _, _ in selected_questions]
     st.session_state.quiz_start_time = time.time()
     st.rerun()
 
 def show_quiz_questions():
     """Enhanced quiz questions interface"""
-    profile = st.session_state.user_profile
     questions = st.session_state.quiz_questions
     current_q = st.session_state.current_question
     lang = st.session_state.selected_language
@@ -1537,14 +1070,13 @@ def show_quiz_questions():
     # Debug: Check question format
     if questions and len(questions) > 0:
         sample_question = questions[0]
-        if len(sample_question) != 4:
-            st.error(f"Question format error: Expected 4 elements, got {len(sample_question)}. Restarting quiz...")
+        if not isinstance(sample_question, str):
+            st.error(f"Question format error: Expected a question ID, got {type(sample_question).__name__}. Restarting quiz...")
             restart_quiz()
             st.rerun()
     
     # Quiz header
-    quiz_data = get_quiz_data()
-    quiz_title = quiz_data[st.session_state.selected_quiz]["title"]["english"]
+    quiz_title = QUIZ_TITLES[st.session_state.selected_quiz]["english"]
     
     st.markdown(f"""
     <div style="text-align: center; margin: 1rem 0;">
@@ -1558,99 +1090,145 @@ def show_quiz_questions():
         show_quiz_results()
         return
     
+    if st.session_state.get('offline_mode'):
+        show_offline_quiz()
+        return
+    
+    show_question_panel()
+
+def show_offline_quiz():
+    """Whole quiz in one browser component; the answer sheet arrives in a single rerun"""
+    attempt_id = st.session_state.attempt_id
+    lang = st.session_state.selected_language
+    placeholder = st.empty()
+    with placeholder:
+        sheet = offline_quiz(quiz_payload(resolve_questions(st.session_state.quiz_questions, lang), lang), attempt_id,
+                             key=f"offline_quiz_{attempt_id}")
+    if sheet and sheet.get("attempt_id") == attempt_id:
+        placeholder.empty()
+        apply_answer_sheet(sheet)
+        show_quiz_results()
+
+def apply_answer_sheet(sheet):
+    """Re-grade a submitted answer sheet against the session's answer key"""
+    questions = resolve_questions(st.session_state.quiz_questions, st.session_state.selected_language)
+    chosen, is_correct = grade_answer_sheet(questions, st.session_state.selected_language, sheet)
+    st.session_state.answers = chosen.tolist()
+    st.session_state.score = int(is_correct.sum())
+    st.session_state.current_question = len(questions)
+
+# Streamlit >= 1.37 re-executes just a fragment when its own widgets change;
+# older versions rerun the whole script, which works the same, only slower
+quiz_fragment = getattr(st, "fragment", None) or (lambda func: func)
+
+@quiz_fragment
+def show_question_panel():
+    """Progress, current question and answer form
+
+    Runs as a fragment: answering only re-executes this panel. The form
+    buttons act through callbacks, which run before the rerun, so there is
+    no extra rerun (or sleep) per answer.
+    """
+    if not st.session_state.get('quiz_started') or \
+            st.session_state.current_question >= len(st.session_state.quiz_questions):
+        # Finished or restarted: the rest of the page changes too
+        st.rerun()
+    
+    questions = st.session_state.quiz_questions
+    current_q = st.session_state.current_question
+    lang = st.session_state.selected_language
+    
+    # Feedback on the previous answer, shown once
+    feedback = st.session_state.pop('answer_feedback', None)
+    if feedback is not None:
+        kind, message = feedback
+        getattr(st, kind)(message)
+    
     # Progress bar with animation
     progress = min((current_q + 1) / len(questions), 1.0) if len(questions) > 0 else 0.0
     st.progress(progress)
     st.markdown(f"**Question {current_q + 1} of {len(questions)}** • **Progress: {progress*100:.0f}%**")
     
     # Display current question
-    if current_q < len(questions):
-        _, _, question, _ = questions[current_q]
-        
-        # Question display with enhanced styling
-        difficulty = question.get('difficulty', 'medium')
-        difficulty_colors = {'easy': '🟢', 'medium': '🟡', 'hard': '🔴'}
-        difficulty_emoji = difficulty_colors.get(difficulty, '🟡')
+    question = resolve_questions([questions[current_q]], lang)[0]
+    
+    # Question display with enhanced styling
+    difficulty = question.get('difficulty', 'medium')
+    difficulty_colors = {'easy': '🟢', 'medium': '🟡', 'hard': '🔴'}
+    difficulty_emoji = difficulty_colors.get(difficulty, '🟡')
+    
+    st.markdown("---")
+    st.markdown(f"### 📝 {question['question'][lang]}")
+    st.markdown(f"**Difficulty**: {difficulty_emoji} {difficulty.title()}")
+    
+    # XP preview
+    xp_preview = get_xp_for_quiz(1, 1, 1.0 + (0.5 if difficulty == 'hard' else 0.2 if difficulty == 'medium' else 0))
+    st.markdown(f"**Potential XP**: +{xp_preview} points")
+    st.markdown("---")
+    
+    # Options with enhanced styling
+    options = question["options"][lang]
+    
+    with st.form(key=f"enhanced_question_form_{current_q}"):
+        # The widget's value is the option index
+        st.radio(
+            "Choose your answer:",
+            range(len(options)),
+            format_func=options.__getitem__,
+            key=f"enhanced_q_{current_q}",
+            index=None
+        )
         
-        st.markdown("---")
-        st.markdown(f"### 📝 {question['question'][lang]}")
-        st.markdown(f"**Difficulty**: {difficulty_emoji} {difficulty.title()}")
+        col1, col2, col3 = st.columns([1, 1, 1])
         
-        # XP preview
-        xp_preview = get_xp_for_quiz(1, 1, 1.0 + (0.5 if difficulty == 'hard' else 0.2 if difficulty == 'medium' else 0))
-        st.markdown(f"**Potential XP**: +{xp_preview} points")
-        st.markdown("---")
+        with col1:
+            st.form_submit_button("✅ Submit Answer", use_container_width=True,
+                                  on_click=submit_answer, args=(question["correct"],))
         
-        # Options with enhanced styling
-        options = question["options"][lang]
+        with col2:
+            st.form_submit_button("⏭️ Skip Question", use_container_width=True,
+                                  on_click=skip_question)
         
-        with st.form(key=f"enhanced_question_form_{current_q}"):
-            selected_option = st.radio(
-                "Choose your answer:",
-                options,
-                key=f"enhanced_q_{current_q}",
-                index=None
-            )
-            
-            col1, col2, col3 = st.columns([1, 1, 1])
-            
-            with col1:
-                submit_answer = st.form_submit_button("✅ Submit Answer", use_container_width=True)
-            
-            with col2:
-                if st.form_submit_button("⏭️ Skip Question", use_container_width=True):
-                    record_answer(question, options, "Skipped", False, lang)
-                    st.session_state.current_question += 1
-                    st.rerun()
-            
-            with col3:
-                if st.form_submit_button("🔄 Restart Quiz", use_container_width=True):
-                    restart_quiz()
-                    st.rerun()
-            
-            if submit_answer and selected_option is not None:
-                selected_index = options.index(selected_option)
-                is_correct = selected_index == question["correct"]
-                
-                record_answer(question, options, selected_option, is_correct, lang)
-                
-                if is_correct:
-                    st.session_state.score += 1
-                    if st.session_state.sound_enabled:
-                        st.success("🎉 Correct! Well done!")
-                else:
-                    if st.session_state.sound_enabled:
-                        st.error("❌ Incorrect. Keep learning!")
-                
-                st.session_state.current_question += 1
-                # Check if quiz is complete after incrementing
-                if st.session_state.current_question >= len(questions):
-                    time.sleep(1)
-                    st.rerun()  # This will trigger show_quiz_results()
-                else:
-                    time.sleep(1)
-                    st.rerun()
-            elif submit_answer and selected_option is None:
-                st.warning("Please select an answer before submitting!")
-
-def record_answer(question, options, selected, is_correct, lang):
-    """Record quiz answer"""
-    st.session_state.answers.append({
-        "question": question["question"][lang],
-        "selected": selected,
-        "correct": options[question["correct"]],
-        "is_correct": is_correct,
-        "explanation": question["explanation"][lang]
-    })
+        with col3:
+            st.form_submit_button("🔄 Restart Quiz", use_container_width=True, on_click=restart_quiz)
+
+def submit_answer(correct):
+    """Grade the selected option of the current question and move on"""
+    selected_option = st.session_state.get(f"enhanced_q_{st.session_state.current_question}")
+    if selected_option is None:
+        st.session_state.answer_feedback = ("warning", "Please select an answer before submitting!")
+        return
+    
+    is_correct = selected_option == correct
+    record_answer(selected_option)
+    if is_correct:
+        st.session_state.score += 1
+        if st.session_state.sound_enabled:
+            st.session_state.answer_feedback = ("success", "🎉 Correct! Well done!")
+    else:
+        if st.session_state.sound_enabled:
+            st.session_state.answer_feedback = ("error", "❌ Incorrect. Keep learning!")
+    st.session_state.current_question += 1
+
+def skip_question():
+    record_answer(SKIPPED)
+    st.session_state.current_question += 1
+
+def record_answer(choice):
+    """Record the chosen option index (SKIPPED for a skipped question)"""
+    st.session_state.answers.append(choice)
 
 def restart_quiz():
     """Restart the current quiz"""
-    for key in ['quiz_started', 'selected_quiz', 'current_question', 'score', 'answers', 'quiz_questions', 'questions_used', 'quiz_start_time']:
+    if 'attempt_id' in st.session_state:
+        get_question_bank_loader().unpin(st.session_state.attempt_id)
+    for key in ['quiz_started', 'selected_quiz', 'quiz_draw', 'attempt_id', 'quiz_outcome', 'answer_feedback', 'current_question', 'score', 'answers', 'quiz_questions', 'quiz_start_time']:
         if key in st.session_state:
             del st.session_state[key]
 
 def reset_session_state():
     """Reset all session state for debugging"""
+    restart_quiz()
     keys_to_keep = ['user_profile']  # Keep user logged in
     keys_to_remove = [key for key in st.session_state.keys() if key not in keys_to_keep]
     for key in keys_to_remove:
@@ -1659,80 +1237,114 @@ def reset_session_state():
 
 def clear_user_quiz_history(username):
     """Clear a user's quiz history to allow fresh questions"""
-    scores = load_scores()
-    # Remove questions_used from all user's scores
-    for score in scores:
-        if score.get("name", "").lower() == username.lower():
-            if "questions_used" in score:
-                del score["questions_used"]
-    
-    # Save updated scores
-    with open("quiz_scores.json", "w", encoding="utf-8") as f:
-        json.dump(scores, f, ensure_ascii=False, indent=2)
+    get_storage().clear_user_history(username)
+    get_score_indexes().clear_history(username)
     load_scores.clear()  # Clear cache
 
-def show_quiz_results():
-    """Enhanced quiz results with achievements and certificates"""
+def finalize_quiz():
+    """Commit the finished attempt once and return its outcome
+
+    The score is written first, keyed by the attempt ID from start_quiz;
+    profile counters, XP, streak and achievements are only updated when
+    that write is new. The outcome is kept in the session, so reruns of the
+    results page (any widget click) render it without writing anything.
+    """
+    outcome = st.session_state.get('quiz_outcome')
+    attempt_id = st.session_state.setdefault('attempt_id', uuid.uuid4().hex)
+    if outcome is not None and outcome['attempt_id'] == attempt_id:
+        return outcome
+    
     profile = st.session_state.user_profile
-    questions = st.session_state.quiz_questions
     score = st.session_state.score
-    total = len(questions)
+    total = len(st.session_state.quiz_questions)
     percentage = round((score/total)*100, 2)
-    
-    # Calculate quiz time
     quiz_time = int(time.time() - st.session_state.quiz_start_time)
     
-    # Celebration effects
-    if percentage >= 80:
-        st.balloons()
-    elif percentage >= 60:
-        st.snow()
-    
-    # Update user profile
-    profile.total_quizzes += 1
-    profile.total_score += score
-    
-    # Calculate XP earned
-    difficulty_bonus = 1.0
-    xp_earned = get_xp_for_quiz(score, total, difficulty_bonus)
-    profile.xp_points += xp_earned
-    
-    # Update level
-    old_level = profile.level
-    profile.level = calculate_level(profile.xp_points)
-    level_up = profile.level > old_level
-    
-    # Update streak
-    today = datetime.datetime.now().date()
-    if profile.last_quiz_date:
-        last_date = datetime.datetime.fromisoformat(profile.last_quiz_date).date()
-        if (today - last_date).days == 1:
-            profile.streak_days += 1
-        elif (today - last_date).days > 1:
+    # Save score to leaderboard; storage rejects a second commit of the attempt
+    timestamp = datetime.datetime.now().isoformat()
+    committed = save_score(profile.username, st.session_state.selected_quiz, score, total, 
+                           st.session_state.selected_language, timestamp, st.session_state.quiz_questions,
+                           st.session_state.get('quiz_draw'), attempt_id)
+    
+    xp_earned = 0
+    level_up = False
+    new_achievements = []
+    if committed:
+        # Update user profile
+        profile.total_quizzes += 1
+        profile.total_score += score
+        
+        # Calculate XP earned
+        difficulty_bonus = 1.0
+        xp_earned = get_xp_for_quiz(score, total, difficulty_bonus)
+        profile.xp_points += xp_earned
+        
+        # Update level
+        old_level = profile.level
+        profile.level = calculate_level(profile.xp_points)
+        level_up = profile.level > old_level
+        
+        # Update streak
+        today = datetime.datetime.now().date()
+        if profile.last_quiz_date:
+            last_date = datetime.datetime.fromisoformat(profile.last_quiz_date).date()
+            if (today - last_date).days == 1:
+                profile.streak_days += 1
+            elif (today - last_date).days > 1:
+                profile.streak_days = 1
+        else:
             profile.streak_days = 1
-    else:
-        profile.streak_days = 1
-    
-    profile.last_quiz_date = datetime.datetime.now().isoformat()
+        
+        profile.last_quiz_date = datetime.datetime.now().isoformat()
+        
+        # Check for achievements
+        quiz_result = {
+            'score': score,
+            'total': total,
+            'percentage': percentage,
+            'quiz_type': st.session_state.selected_quiz,
+            'language': st.session_state.selected_language
+        }
+        
+        new_achievements = AchievementSystem.check_achievements(profile, quiz_result)
+        
+        # Save updated profile
+        update_user_profile(profile)
     
-    # Check for achievements
-    quiz_result = {
+    outcome = {
+        'attempt_id': attempt_id,
         'score': score,
         'total': total,
         'percentage': percentage,
-        'quiz_type': st.session_state.selected_quiz,
-        'language': st.session_state.selected_language
+        'quiz_time': quiz_time,
+        'xp_earned': xp_earned,
+        'level': profile.level,
+        'level_up': level_up,
+        'streak_days': profile.streak_days,
+        'new_achievements': new_achievements,
+        'first_render': True
     }
-    
-    new_achievements = AchievementSystem.check_achievements(profile, quiz_result)
-    
-    # Save updated profile
-    update_user_profile(profile)
-    
-    # Save score to leaderboard
-    timestamp = datetime.datetime.now().isoformat()
-    save_score(profile.username, st.session_state.selected_quiz, score, total, 
-              st.session_state.selected_language, timestamp, st.session_state.questions_used)
+    st.session_state.quiz_outcome = outcome
+    return outcome
+
+def show_quiz_results():
+    """Enhanced quiz results with achievements and certificates"""
+    profile = st.session_state.user_profile
+    outcome = finalize_quiz()
+    score = outcome['score']
+    total = outcome['total']
+    percentage = outcome['percentage']
+    quiz_time = outcome['quiz_time']
+    xp_earned = outcome['xp_earned']
+    level_up = outcome['level_up']
+    new_achievements = outcome['new_achievements']
+    
+    # Celebration effects, once per attempt
+    if outcome.pop('first_render', False):
+        if percentage >= 80:
+            st.balloons()
+        elif percentage >= 60:
+            st.snow()
     
     # Enhanced results display
     st.markdown(f'''
@@ -1743,7 +1355,7 @@ def show_quiz_results():
         <p style="font-size: 1rem; margin-top: 1rem;">
             ⏱️ Time: {quiz_time//60}m {quiz_time%60}s • 
             ⭐ XP Earned: +{xp_earned} • 
-            🔥 Streak: {profile.streak_days} days
+            🔥 Streak: {outcome['streak_days']} days
         </p>
     </div>
     ''', unsafe_allow_html=True)
@@ -1753,7 +1365,7 @@ def show_quiz_results():
         st.markdown(f'''
         <div class="achievement-card">
             <h2>🎊 LEVEL UP! 🎊</h2>
-            <h3>You reached Level {profile.level}!</h3>
+            <h3>You reached Level {outcome['level']}!</h3>
             <p>Keep up the excellent work!</p>
         </div>
         ''', unsafe_allow_html=True)
@@ -1844,12 +1456,15 @@ def show_quiz_results():
     ''', unsafe_allow_html=True)
     
     # Question-by-question breakdown
-    for i, answer in enumerate(st.session_state.answers):
-        with st.expander(f"Question {i+1}: {'✅' if answer['is_correct'] else '❌'}"):
-            st.write(f"**Question:** {answer['question']}")
-            st.write(f"**Your Answer:** {answer['selected']}")
-            st.write(f"**Correct Answer:** {answer['correct']}")
-            st.write(f"**Explanation:** {answer['explanation']}")
+    lang = st.session_state.selected_language
+    questions = resolve_questions(st.session_state.quiz_questions, lang)
+    for i, (question, choice) in enumerate(zip(questions, st.session_state.answers)):
+        options = question["options"][lang]
+        with st.expander(f"Question {i+1}: {'✅' if choice == question['correct'] else '❌'}"):
+            st.write(f"**Question:** {question['question'][lang]}")
+            st.write(f"**Your Answer:** {'Skipped' if choice == SKIPPED else options[choice]}")
+            st.write(f"**Correct Answer:** {options[question['correct']]}")
+            st.write(f"**Explanation:** {question['explanation'][lang]}")
     
     # Action buttons
     col1, col2 = st.columns(2)
@@ -1,5 +1,7 @@
 # Fast loading questions database - optimized for performance
 
+import itertools
+
 # Pre-built question sets for instant loading
 def get_mahabharata_questions_from_list():
     """Get 100 Mahabharata questions from the provided list"""
@@ -146,20 +148,10 @@ def get_mahabharata_questions_from_list():
     return questions
 
 def get_fast_questions(epic, count=100):
-    """Generate questions quickly with minimal processing"""
-    questions = []
-    
-    # Base templates for quick generation
-    if epic == "mahabharata":
-        base = MAHABHARATA_EASY
-        templates = [
-            ("Who was Bhishma?", "భీష్ముడు ఎవరు?", ["Devavrata", "Shantanu", "Ganga", "Satyavati"], 0),
-            ("Who killed Karna?", "కర్ణుడిని ఎవరు చంపారు?", ["Arjuna", "Bhima", "Krishna", "Sahadeva"], 0),
-            ("What was Arjuna's bow?", "అర్జునుని విల్లు?", ["Gandiva", "Pinaka", "Sharanga", "Kodanda"], 0)
-        ]
-    else:  # ramayana - Use the provided questions
-        return get_ramayana_questions_from_list()
-        
+    """Generate template questions lazily (see question_templates.py); count=None yields the whole pool"""
+    from question_templates import TemplatePool
+    return itertools.islice(TemplatePool(epic).iter_questions(), count)
+
 def get_ramayana_questions_from_list():
     """Get 100 Ramayana questions from the provided list"""
     questions = []
@@ -303,31 +295,6 @@ def get_ramayana_questions_from_list():
         })
     
     return questions
-    
-    # Add base questions
-    for q in base:
-        questions.append({
-            "question": {"english": q["q"]["en"], "telugu": q["q"]["te"]},
-            "options": {"english": q["o"]["en"], "telugu": q["o"]["te"]},
-            "correct": q["c"], "difficulty": q["d"],
-            "explanation": {"english": "Correct answer explanation", "telugu": "సరైన సమాధాన వివరణ"}
-        })
-    
-    # Generate remaining questions quickly
-    difficulties = ["easy"] * 33 + ["medium"] * 34 + ["hard"] * 33
-    
-    for i in range(len(base), count):
-        template = templates[i % len(templates)]
-        diff = difficulties[i] if i < len(difficulties) else "medium"
-        
-        questions.append({
-            "question": {"english": f"{template[0]} ({diff[0].upper()}{i})", "telugu": f"{template[1]} ({diff[0].upper()}{i})"},
-            "options": {"english": template[2], "telugu": template[2]},  # Simplified for speed
-            "correct": template[3], "difficulty": diff,
-            "explanation": {"english": f"Answer {i}", "telugu": f"సమాధానం {i}"}
-        })
-    
-    return questions
 
 def get_mahabharata_questions():
     return get_mahabharata_questions_from_list()
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Script to import user profiles and quiz scores from the JSON files into SQLite
+"""
+
+import os
+import sys
+
+from storage import DATABASE_FILE, SQLiteStorage, import_json_into_sqlite
+
+def main():
+    """Import JSON data into the SQLite database"""
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.environ.get("EPIC_QUIZ_DB", DATABASE_FILE)
+    print(f"📦 Importing JSON data into {db_path}...")
+
+    try:
+        storage = SQLiteStorage(db_path)
+        counts = import_json_into_sqlite(storage)
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+
+    print(f"✅ Imported {counts['users']} users and {counts['scores']} scores")
+    print("💡 Existing users are skipped; scores are only imported into an empty database")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
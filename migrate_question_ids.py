@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Script to rewrite stored questions_used history from the old index-based
+question IDs to the stable content-hash IDs (one-shot; safe to re-run)
+"""
+
+import sys
+
+from question_bank import _source_builders, legacy_question_id, question_id
+from storage import get_storage
+
+def build_id_mapping():
+    """Old ID -> content ID, using the question order the old IDs were made from"""
+    mapping = {}
+    for build in _source_builders().values():
+        for i, question in enumerate(build()):
+            mapping[legacy_question_id(i, question)] = question_id(question)
+    return mapping
+
+def main():
+    """Remap questions_used in every stored score"""
+    print("🔄 Migrating question IDs in quiz history...")
+
+    try:
+        mapping = build_id_mapping()
+        storage = get_storage()
+        changed = storage.remap_questions_used(mapping)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+    print(f"✅ Updated {changed} score records ({len(mapping)} known question IDs)")
+    if changed == 0:
+        print("💡 Nothing to migrate - history already uses content IDs")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+# Offline quiz mode
+#
+# The whole quiz is sent to the browser in one payload and played by a small
+# static component (offline_quiz_component/index.html): navigation, timer
+# and instant feedback need no server round-trip, so a quiz costs about two
+# script runs (start and submit) on a flaky connection. The answer sheet
+# comes back once and is re-graded here against the session's answer key,
+# which drops malformed answers. The payload carries the correct options
+# for the instant feedback, so this mode is not tamper-proof: a modified
+# client can read the key and submit a perfect sheet.
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import streamlit.components.v1 as components
+
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "offline_quiz_component")
+
+# Answer sheet value of a skipped (or invalid) answer
+SKIPPED = -1
+
+_component = components.declare_component("offline_quiz", path=COMPONENT_DIR)
+
+
+def quiz_payload(questions: List[Dict], language: str) -> Dict:
+    """Compact payload of the quiz's questions in one language
+
+    Each question is [text, options, correct, explanation, difficulty].
+    """
+    return {
+        "questions": [[q["question"][language], q["options"][language], q["correct"],
+                       q["explanation"][language], q["difficulty"]]
+                      for q in questions],
+        "telugu": language == "telugu",
+    }
+
+
+def offline_quiz(payload: Dict, attempt_id: str, key: Optional[str] = None) -> Optional[Dict]:
+    """Render the quiz; returns the answer sheet once the player submits it
+
+    The sheet is {"attempt_id", "answers": [option index or SKIPPED, ...],
+    "elapsed_ms"}.
+    """
+    return _component(payload=payload, attempt_id=attempt_id, key=key, default=None)
+
+
+def grade_answer_sheet(questions: List[Dict], language: str, sheet: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Chosen option per question (SKIPPED when missing or invalid) and which were correct"""
+    count = len(questions)
+    correct = np.fromiter((q["correct"] for q in questions), dtype=np.int64, count=count)
+    num_options = np.fromiter((len(q["options"][language]) for q in questions),
+                              dtype=np.int64, count=count)
+
+    chosen = np.full(count, SKIPPED, dtype=np.int64)
+    answers = sheet.get("answers")
+    if isinstance(answers, list):
+        # Huge ints are dropped here too: they are out of range and don't fit int64
+        values = [answer if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < 2**31
+                  else SKIPPED for answer in answers[:count]]
+        chosen[:len(values)] = values
+    chosen[(chosen < 0) | (chosen >= num_options)] = SKIPPED
+    return chosen, chosen == correct
@@ -0,0 +1,515 @@
+# Precompiled question bank
+#
+# build_question_bank.py compiles the question lists from fast_questions.py
+# into question_bank.dat: one JSON header line followed by one compact JSON
+# section per epic. The header records each section's byte offset and
+# length, so the app reads the header at startup and loads an epic's
+# questions only the first time that epic is played.
+#
+# Per-epic JSONL (or YAML) files in question_banks/ take precedence over the
+# artifact. build_question_bank.py regenerates both from fast_questions.py
+# and stamps question_banks/source.json with the source hash; the loader
+# warns when the bank files were exported from a different source.
+#
+# Bank files are streamed line by line, checked for changes by mtime and
+# swapped in without a restart; each load gets its own version, and sessions
+# keep the EpicBank they started with until their quiz ends. A bank file
+# holds either full bilingual questions, or just the language-neutral core
+# (id, correct, difficulty, tags) with the text in per-language packs named
+# <epic>.<language>.jsonl. Text is only read for languages that are shown.
+#
+# Every question carries a content-hash "id" (computed at build time), so
+# reordering or inserting questions doesn't change the IDs stored in users'
+# questions_used history.
+#
+# The core of every loaded version is archived in question_banks/versions/,
+# so seeded quizzes stored as (seed, bank version) can be replayed after
+# the bank has changed. A running quiz pins the versions it was drawn from
+# (QuestionBankLoader.pin), so their text stays loaded after a reload.
+
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from question_store import QuestionStore, QuestionView
+
+try:
+    import yaml  # Optional: only needed for .yaml/.yml bank files
+except ImportError:
+    yaml = None
+
+ARTIFACT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_bank.dat")
+SOURCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fast_questions.py")
+ARTIFACT_FORMAT = 1
+
+QUESTION_BANK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "question_banks")
+BANK_FILE_EXTENSIONS = (".jsonl", ".yaml", ".yml")
+BANK_ARCHIVE_DIR = os.path.join(QUESTION_BANK_DIR, "versions")
+# Hash of the fast_questions.py the bank files were exported from
+SOURCE_STAMP_FILE = "source.json"
+# Seconds before an abandoned quiz's pin is dropped
+PIN_TTL = 6 * 3600
+
+
+def _source_builders() -> Dict[str, Callable[[], List[Dict]]]:
+    """Epic name -> function building its questions from fast_questions.py"""
+    from fast_questions import get_mahabharata_questions, get_ramayana_questions
+    return {
+        "mahabharata": get_mahabharata_questions,
+        "ramayana": get_ramayana_questions
+    }
+
+
+def question_id(question: Dict) -> str:
+    """Stable ID derived from the English question and options"""
+    content = json.dumps([question["question"]["english"], question["options"]["english"]],
+                         ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+def legacy_question_id(index: int, question: Dict) -> str:
+    """The old index-based ID, kept only for migrating stored history"""
+    options = question["options"]["english"]
+    first_option = options[0] if options else ""
+    unique_content = f"{index}_{question['question']['english']}_{first_option}"
+    return hashlib.md5(unique_content.encode()).hexdigest()[:12]
+
+
+def with_ids(questions: List[Dict]) -> List[Dict]:
+    """Attach content IDs to questions that don't have one yet"""
+    for question in questions:
+        if "id" not in question:
+            question["id"] = question_id(question)
+    return questions
+
+
+def iter_with_ids(questions: Iterable[Dict]) -> Iterable[Dict]:
+    for question in questions:
+        if "id" not in question:
+            question["id"] = question_id(question)
+        yield question
+
+
+class EpicBank:
+    """One epic's questions in a compact QuestionStore
+
+    bank.questions[i] materializes question i with every language;
+    bank.view(language)[i] only with one. Entries with identical content
+    share an ID and are kept once.
+
+    `questions` may be re-iterable, or `reread` can be given to read the
+    text again when a language pack is first needed.
+    """
+
+    def __init__(self, epic: str, questions: Iterable[Dict], version: str,
+                 pack_sources: Optional[Dict[str, Callable[[], Iterable[Dict]]]] = None,
+                 reread: Optional[Callable[[], Iterable[Dict]]] = None):
+        self.epic = epic
+        self.version = version
+        if pack_sources is None and reread is None:
+            questions = with_ids(list(questions))
+            reread = lambda: questions
+        elif reread is not None:
+            reread = (lambda read=reread: iter_with_ids(read()))
+        self.questions = QuestionStore(iter_with_ids(questions), pack_sources, reread)
+        self._cells = None
+
+    def view(self, language: str) -> QuestionView:
+        """Questions materialized in one language, loading its pack on first use"""
+        return self.questions.view(language)
+
+    @property
+    def cells(self) -> Dict[Tuple[str, Tuple[str, ...]], List[int]]:
+        """Positions by (difficulty, tags) for compose_quiz, built on first use"""
+        if self._cells is None:
+            self._cells = self.questions.positions_by_cell()
+        return self._cells
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def id_at(self, position: int) -> str:
+        return self.questions.id_at(position)
+
+    def position(self, qid: str) -> Optional[int]:
+        return self.questions.position(qid)
+
+    def positions(self, qids: Iterable[str]) -> Set[int]:
+        """Positions of the given IDs that are in this bank"""
+        return set(self.questions.positions(qids).tolist())
+
+    def core_entries(self) -> List[Dict]:
+        """The language-neutral core of every question, as stored in <epic>.jsonl"""
+        store = self.questions
+        core = []
+        for position in range(len(store)):
+            entry = {"id": store.id_at(position), "correct": int(store.correct[position]),
+                     "difficulty": store.difficulty_at(position)}
+            tags = store.tags_at(position)
+            if tags:
+                entry["tags"] = tags
+            core.append(entry)
+        return core
+
+
+def source_hash(path: str = SOURCE_FILE) -> Optional[str]:
+    """Hash of the question source the artifact must match"""
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def compile_bank(banks: Dict[str, List[Dict]], path: str = ARTIFACT_FILE,
+                 source_version: Optional[str] = None) -> Dict:
+    """Write `banks` (epic -> questions) as an offset-indexed artifact"""
+    sections = {}
+    payloads = []
+    for epic, questions in banks.items():
+        payload = json.dumps(questions, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        sections[epic] = {"length": len(payload), "count": len(questions),
+                          "sha256": hashlib.sha256(payload).hexdigest()[:16]}
+        payloads.append(payload)
+
+    # Offsets are relative to the end of the header line
+    offset = 0
+    for section, payload in zip(sections.values(), payloads):
+        section["offset"] = offset
+        offset += len(payload)
+
+    bank_version = hashlib.sha256(b"".join(payloads)).hexdigest()[:12]
+    header = {"format": ARTIFACT_FORMAT, "version": bank_version,
+              "source": source_version, "epics": sections}
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp_path, path)
+    return header
+
+
+def build_from_source(path: str = ARTIFACT_FILE) -> Dict:
+    """Compile fast_questions.py into the artifact"""
+    banks = {epic: with_ids(build()) for epic, build in _source_builders().items()}
+    return compile_bank(banks, path, source_hash())
+
+
+def bank_file(epic: str, directory: str = QUESTION_BANK_DIR) -> Optional[str]:
+    """The epic's file in the bank directory, if there is one"""
+    for extension in BANK_FILE_EXTENSIONS:
+        path = os.path.join(directory, epic + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def pack_files(epic: str, directory: str = QUESTION_BANK_DIR) -> Dict[str, str]:
+    """Language -> path of the epic's language packs (<epic>.<language>.jsonl)"""
+    packs = {}
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            stem, extension = os.path.splitext(name)
+            prefix, _, language = stem.partition(".")
+            if extension in BANK_FILE_EXTENSIONS and prefix == epic and language:
+                packs.setdefault(language, os.path.join(directory, name))
+    return packs
+
+
+def iter_bank_file(path: str, digest=None) -> Iterable[Dict]:
+    """Stream entries from a JSONL (one per line) or YAML (one per document) file"""
+    if path.endswith(".jsonl"):
+        with open(path, "rb") as f:
+            for line_no, line in enumerate(f, 1):
+                if digest is not None:
+                    digest.update(line)
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"{path}:{line_no}: {e}") from None
+    else:
+        if yaml is None:
+            raise ValueError(f"{path}: PyYAML is required for YAML question banks")
+        with open(path, "rb") as f:
+            if digest is not None:
+                digest.update(f.read())
+                f.seek(0)
+            for document in yaml.safe_load_all(f):
+                if isinstance(document, list):
+                    yield from document
+                elif document is not None:
+                    yield document
+
+
+def read_bank_file(path: str) -> Tuple[List[Dict], str]:
+    """All entries of a bank file and a hash of its contents"""
+    digest = hashlib.sha256()
+    entries = list(iter_bank_file(path, digest))
+    return entries, digest.hexdigest()[:12]
+
+
+def iter_split_bank(epic: str, directory: str = QUESTION_BANK_DIR) -> Iterable[Dict]:
+    """Full questions of an epic stored as a core file plus language packs"""
+    text = {language: {entry["id"]: entry for entry in iter_bank_file(path)}
+            for language, path in pack_files(epic, directory).items()}
+    for core in iter_bank_file(bank_file(epic, directory)):
+        question = dict(core)
+        for field in ("question", "options", "explanation"):
+            if not isinstance(question.get(field), dict):
+                question[field] = {language: entries[core["id"]][field]
+                                   for language, entries in text.items() if core.get("id") in entries}
+        yield question
+
+
+def export_bank_file(questions: Iterable[Dict], path: str):
+    """Write entries as JSONL, one per line"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for question in questions:
+            f.write(json.dumps(question, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp_path, path)
+
+
+def export_split_bank(bank: "EpicBank", directory: str = QUESTION_BANK_DIR) -> List[str]:
+    """Write a bank as <epic>.jsonl (core) plus one <epic>.<language>.jsonl pack per language"""
+    store = bank.questions
+    paths = [os.path.join(directory, f"{bank.epic}.jsonl")]
+    export_bank_file(bank.core_entries(), paths[0])
+
+    for language in store.languages:
+        view = bank.view(language)
+        pack = ({"id": question["id"], "question": question["question"][language],
+                 "options": question["options"][language], "explanation": question["explanation"][language]}
+                for question in (view[position] for position in range(len(view))))
+        paths.append(os.path.join(directory, f"{bank.epic}.{language}.jsonl"))
+        export_bank_file(pack, paths[-1])
+    return paths
+
+
+def write_source_stamp(directory: str = QUESTION_BANK_DIR):
+    """Record which fast_questions.py the bank files in `directory` were exported from"""
+    with open(os.path.join(directory, SOURCE_STAMP_FILE), "w", encoding="utf-8") as f:
+        json.dump({"source": source_hash()}, f)
+
+
+def exported_source(directory: str = QUESTION_BANK_DIR) -> Optional[str]:
+    """Source hash the bank files were exported from, None if unknown"""
+    try:
+        with open(os.path.join(directory, SOURCE_STAMP_FILE), "r", encoding="utf-8") as f:
+            return json.load(f).get("source")
+    except (OSError, ValueError):
+        return None
+
+
+class QuestionBankLoader:
+    """Loads epics on first use and reloads bank files when they change
+
+    Sources, in order: question_banks/<epic>.jsonl|yaml (plus its
+    language packs), the compiled artifact, fast_questions.py.
+    """
+
+    def __init__(self, path: str = ARTIFACT_FILE, directory: str = QUESTION_BANK_DIR,
+                 reload_interval: Optional[float] = None, archive_dir: Optional[str] = None):
+        self.path = path
+        self.directory = directory
+        self.archive_dir = archive_dir or os.path.join(directory, "versions")
+        if reload_interval is None:
+            reload_interval = float(os.environ.get("EPIC_QUIZ_BANK_RELOAD", "2.0"))
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._header = None
+        self._header_checked = False
+        self._stamp_checked = False
+        self._epics: Dict[str, EpicBank] = {}
+        self._sources: Dict[str, Optional[Tuple]] = {}
+        self._checked_at: Dict[str, float] = {}
+        # Every loaded version stays reachable while a session still uses it
+        self._versions = weakref.WeakValueDictionary()
+        # Banks held for running quizzes: owner -> (banks, pinned at)
+        self._pins: Dict[str, Tuple[tuple, float]] = {}
+
+    def _get_header(self) -> Optional[Dict]:
+        if not self._header_checked:
+            self._header_checked = True
+            header = None
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    line = f.readline()
+                header = json.loads(line)
+                header["_data_start"] = len(line)
+                # A stale artifact (source edited after the build) is ignored
+                current_source = source_hash()
+                if header.get("format") != ARTIFACT_FORMAT or (
+                        current_source is not None and header.get("source") != current_source):
+                    header = None
+            self._header = header
+        return self._header
+
+    def epics(self) -> List[str]:
+        header = self._get_header()
+        epics = list(header["epics"]) if header is not None else list(_source_builders())
+        if os.path.isdir(self.directory):
+            for name in sorted(os.listdir(self.directory)):
+                epic, extension = os.path.splitext(name)
+                if extension in BANK_FILE_EXTENSIONS and "." not in epic and epic not in epics:
+                    epics.append(epic)
+        return epics
+
+    def version(self) -> Optional[str]:
+        header = self._get_header()
+        return header["version"] if header is not None else None
+
+    def _file_source(self, epic: str) -> Optional[Tuple]:
+        """(path, mtime, size) of the bank file and each language pack"""
+        path = bank_file(epic, self.directory)
+        if path is None:
+            return None
+        signature = []
+        for file_path in [path] + sorted(pack_files(epic, self.directory).values()):
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                return None
+            signature.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self, epic: str) -> EpicBank:
+        """Current bank of one epic; bank files are re-checked every reload_interval seconds"""
+        now = time.monotonic()
+        with self._lock:
+            bank = self._epics.get(epic)
+            if bank is not None and now - self._checked_at.get(epic, 0.0) < self.reload_interval:
+                return bank
+            self._checked_at[epic] = now
+            source = self._file_source(epic)
+            if bank is not None and source == self._sources.get(epic):
+                return bank
+
+        # Parse outside the lock so other sessions keep using the current bank
+        try:
+            new_bank = self._read_epic(epic, source)
+        except (OSError, ValueError) as e:
+            if bank is None:
+                raise
+            print(f"⚠️  Keeping question bank {bank.version}: {e}")
+            return bank
+
+        with self._lock:
+            self._epics[epic] = new_bank
+            self._sources[epic] = source
+            self._versions[new_bank.version] = new_bank
+        self._archive(new_bank)
+        return new_bank
+
+    def _archive_path(self, version: str) -> str:
+        return os.path.join(self.archive_dir, version + ".jsonl")
+
+    def _archive(self, bank: EpicBank):
+        """Keep the bank's core so quizzes drawn from it can be replayed later"""
+        path = self._archive_path(bank.version)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(self.archive_dir, exist_ok=True)
+            export_bank_file(bank.core_entries(), path)
+        except OSError as e:
+            print(f"⚠️  Could not archive question bank {bank.version}: {e}")
+
+    def pin(self, owner: str, banks: Iterable):
+        """Keep banks loaded for a running quiz until unpin(owner)
+
+        Quizzes abandoned without unpinning release their banks after PIN_TTL.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for key, (_, pinned_at) in list(self._pins.items()):
+                if now - pinned_at > PIN_TTL:
+                    del self._pins[key]
+            self._pins[owner] = (tuple(banks), now)
+
+    def unpin(self, owner: str):
+        with self._lock:
+            self._pins.pop(owner, None)
+
+    def is_archived(self, version: str) -> bool:
+        """Whether a bank version's core is kept in the archive"""
+        return os.path.exists(self._archive_path(version))
+
+    def get_version(self, version: str) -> Optional[EpicBank]:
+        """A bank by version: the live one, or its archived core (IDs only, no text)"""
+        bank = self._versions.get(version)
+        if bank is not None:
+            return bank
+        epic = version.rpartition("-")[0]
+        if epic in self.epics():
+            bank = self.load(epic)
+            if bank.version == version:
+                return bank
+        path = self._archive_path(version)
+        if not os.path.exists(path):
+            return None
+        bank = EpicBank(epic, list(iter_bank_file(path)), version, pack_sources={})
+        with self._lock:
+            return self._versions.setdefault(version, bank)
+
+    def _read_epic(self, epic: str, source: Optional[Tuple]) -> EpicBank:
+        # The version covers only the core file: it decides which questions
+        # exist and how they are drawn, while packs only change wording
+        if source is not None:
+            self._check_source_stamp()
+            path = source[0][0]
+            digest = hashlib.sha256()
+            core = list(iter_bank_file(path, digest))
+            version = f"{epic}-{digest.hexdigest()[:12]}"
+            packs = pack_files(epic, self.directory)
+            if packs:
+                pack_sources = {language: (lambda pack_path=pack_path: iter_bank_file(pack_path))
+                                for language, pack_path in packs.items()}
+                return EpicBank(epic, core, version, pack_sources=pack_sources)
+            # Bilingual bank file: keep only the core, re-read text per language
+            return EpicBank(epic, core, version, reread=lambda: iter_bank_file(path))
+
+        header = self._get_header()
+        if header is not None and epic in header["epics"]:
+            section = header["epics"][epic]
+            version = f"{epic}-{section['sha256'][:12]}"
+            return EpicBank(epic, self._read_section(section), version,
+                            reread=lambda: self._read_section(section))
+
+        # No bank file or (fresh) artifact: build from the Python source
+        build = _source_builders()[epic]
+        return EpicBank(epic, build(), f"{epic}-src{source_hash()}", reread=build)
+
+    def _check_source_stamp(self):
+        """Warn once when fast_questions.py changed after the bank files were exported"""
+        if self._stamp_checked:
+            return
+        self._stamp_checked = True
+        exported, current = exported_source(self.directory), source_hash()
+        if current is not None and exported != current:
+            print(f"⚠️  {self.directory} was not exported from the current fast_questions.py, "
+                  f"whose edits are not used; run python build_question_bank.py to regenerate it")
+
+    def _read_section(self, section: Dict) -> List[Dict]:
+        with open(self.path, "rb") as f:
+            f.seek(self._get_header()["_data_start"] + section["offset"])
+            return json.loads(f.read(section["length"]))
+
+
+_loader: Optional[QuestionBankLoader] = None
+_loader_lock = threading.Lock()
+
+
+def get_question_bank_loader() -> QuestionBankLoader:
+    """Process-wide loader shared by all sessions"""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = QuestionBankLoader()
+        return _loader
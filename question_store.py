@@ -0,0 +1,302 @@
+# Compact in-memory question store
+#
+# A bank of dict-of-dict questions repeats the same strings (character names
+# appear as options in hundreds of questions) and pays Python object overhead
+# for every dict, list and str. The store is split into:
+#   - a language-neutral core: question IDs (bytes array with a sorted copy
+#     for lookups), correct index, difficulty code and topic tags, as NumPy
+#     columns
+#   - one LanguagePack per language, loaded the first time that language is
+#     shown: every distinct text once in a UTF-8 blob with an offsets array,
+#     plus code columns for question text, options (flattened with
+#     per-question offsets) and explanations
+# A question is materialized as the usual dict only when it is displayed,
+# and only with the languages asked for.
+
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DIFFICULTY_NAMES = ("easy", "medium", "hard")
+
+# Pack used for questions missing from another language's pack
+DEFAULT_LANGUAGE = "english"
+
+
+class _StringTableBuilder:
+    """Interns strings into codes while a store is being built"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def code(self, text) -> int:
+        text = "" if text is None else str(text)
+        code = self.codes.get(text)
+        if code is None:
+            code = len(self.strings)
+            self.codes[text] = code
+            self.strings.append(text)
+        return code
+
+    def freeze(self) -> Tuple[bytes, np.ndarray]:
+        encoded = [text.encode("utf-8") for text in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+        np.cumsum([len(data) for data in encoded], out=offsets[1:])
+        return b"".join(encoded), offsets
+
+
+def _offsets(counts: List[int]) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.uint32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _in_language(value, language: str):
+    # Combined entries hold {"english": ..., "telugu": ...}; pack entries hold the text itself
+    return value.get(language) if isinstance(value, dict) else value
+
+
+class LanguagePack:
+    """Question, option and explanation text of one language"""
+
+    def __init__(self, language: str, size: int, position: Callable[[str], Optional[int]],
+                 entries: Iterable[Dict]):
+        self.language = language
+        table = _StringTableBuilder()
+        text = np.zeros(size, dtype=np.uint32)
+        explanation = np.zeros(size, dtype=np.uint32)
+        present = np.zeros(size, dtype=bool)
+        options_by_position: Dict[int, List[int]] = {}
+
+        for entry in entries:
+            index = position(entry["id"])
+            if index is None or present[index]:
+                continue
+            question_text = _in_language(entry.get("question"), language)
+            if question_text is None:
+                continue  # Not translated into this language
+            present[index] = True
+            text[index] = table.code(question_text)
+            explanation[index] = table.code(_in_language(entry.get("explanation") or {}, language))
+            options = _in_language(entry.get("options") or {}, language) or []
+            options_by_position[index] = [table.code(option) for option in options]
+
+        counts = [len(options_by_position.get(index, ())) for index in range(size)]
+        self._option_offsets = _offsets(counts)
+        self._options = np.fromiter((code for index in range(size) for code in options_by_position.get(index, ())),
+                                    dtype=np.uint32, count=int(self._option_offsets[-1]))
+        self._text = text
+        self._explanation = explanation
+        self.present = present
+        self._blob, self._string_offsets = table.freeze()
+
+    def string(self, code: int) -> str:
+        start, end = self._string_offsets[code], self._string_offsets[code + 1]
+        return self._blob[start:end].decode("utf-8")
+
+    def question(self, position: int) -> str:
+        return self.string(self._text[position])
+
+    def options(self, position: int) -> List[str]:
+        codes = self._options[self._option_offsets[position]:self._option_offsets[position + 1]]
+        return [self.string(code) for code in codes]
+
+    def explanation(self, position: int) -> str:
+        return self.string(self._explanation[position])
+
+    def nbytes(self) -> int:
+        arrays = (self._text, self._explanation, self.present, self._options, self._option_offsets, self._string_offsets)
+        return len(self._blob) + sum(array.nbytes for array in arrays)
+
+
+class QuestionStore:
+    """Read-only, array-backed question bank with lazily loaded language packs
+
+    `questions` provides the core fields (id, correct, difficulty, tags).
+    `pack_sources` maps each language to a callable returning the entries
+    of its pack; entries may be pack lines ({"id", "question", "options",
+    "explanation"} holding one language's text) or full bilingual questions.
+    Without `pack_sources`, the languages of the first question are used and
+    `reread` is called to read their text when a pack is first needed.
+    """
+
+    def __init__(self, questions: Iterable[Dict],
+                 pack_sources: Optional[Dict[str, Callable[[], Iterable[Dict]]]] = None,
+                 reread: Optional[Callable[[], Iterable[Dict]]] = None):
+        ids: List[str] = []
+        seen_ids = set()
+        correct: List[int] = []
+        difficulty: List[int] = []
+        tag_codes: List[int] = []
+        tag_counts: List[int] = []
+        tag_index: Dict[str, int] = {}
+        extra_difficulties: List[str] = []
+        languages: Optional[Tuple[str, ...]] = None
+
+        for question in questions:
+            qid = question["id"]
+            if qid in seen_ids:
+                continue  # Same content, already stored
+            seen_ids.add(qid)
+            if languages is None and isinstance(question.get("question"), dict):
+                languages = tuple(question["question"])
+
+            ids.append(qid)
+            correct.append(question["correct"])
+            level = question.get("difficulty", "medium")
+            if level in DIFFICULTY_NAMES:
+                difficulty.append(DIFFICULTY_NAMES.index(level))
+            else:
+                if level not in extra_difficulties:
+                    extra_difficulties.append(level)
+                difficulty.append(len(DIFFICULTY_NAMES) + extra_difficulties.index(level))
+            tags = question.get("tags") or ()
+            for tag in tags:
+                tag_codes.append(tag_index.setdefault(tag, len(tag_index)))
+            tag_counts.append(len(tags))
+
+        self.difficulty_names: Tuple[str, ...] = DIFFICULTY_NAMES + tuple(extra_difficulties)
+        self.tag_names: Tuple[str, ...] = tuple(tag_index)
+
+        self.ids = np.array([qid.encode("utf-8") for qid in ids], dtype=bytes)
+        self._id_order = np.argsort(self.ids, kind="stable")
+        self._sorted_ids = self.ids[self._id_order]
+        self.correct = np.array(correct, dtype=np.int8)
+        self.difficulty = np.array(difficulty, dtype=np.uint8)
+        self._tags = np.array(tag_codes, dtype=np.uint16)
+        self._tag_offsets = _offsets(tag_counts)
+
+        if pack_sources is None:
+            pack_sources = {language: reread for language in languages or ()} if reread else {}
+        self._pack_sources = dict(pack_sources)
+        self._packs: Dict[str, LanguagePack] = {}
+        self._pack_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def languages(self) -> Tuple[str, ...]:
+        return tuple(self._pack_sources)
+
+    # Core columns
+    def id_at(self, position: int) -> str:
+        return self.ids[position].decode("utf-8")
+
+    def difficulty_at(self, position: int) -> str:
+        return self.difficulty_names[self.difficulty[position]]
+
+    def tags_at(self, position: int) -> List[str]:
+        codes = self._tags[self._tag_offsets[position]:self._tag_offsets[position + 1]]
+        return [self.tag_names[code] for code in codes]
+
+    def position(self, qid: str) -> Optional[int]:
+        """Position of a question ID, or None if the store doesn't have it"""
+        key = qid.encode("utf-8")
+        if not len(self) or len(key) > self.ids.itemsize:
+            return None
+        index = int(np.searchsorted(self._sorted_ids, key))
+        if index < len(self._sorted_ids) and self._sorted_ids[index] == key:
+            return int(self._id_order[index])
+        return None
+
+    def positions(self, qids: Iterable[str]) -> np.ndarray:
+        """Positions of the given IDs that are in the store, looked up in one batch"""
+        keys = [key for key in (qid.encode("utf-8") for qid in qids) if len(key) <= self.ids.itemsize]
+        if not keys or not len(self):
+            return np.empty(0, dtype=np.int64)
+        keys = np.array(keys, dtype=self.ids.dtype)
+        index = np.minimum(np.searchsorted(self._sorted_ids, keys), len(self._sorted_ids) - 1)
+        return self._id_order[index[self._sorted_ids[index] == keys]]
+
+    def positions_by_difficulty(self) -> Dict[str, np.ndarray]:
+        return {name: np.flatnonzero(self.difficulty == code)
+                for code, name in enumerate(self.difficulty_names)
+                if np.any(self.difficulty == code)}
+
+    def positions_by_cell(self) -> Dict[Tuple[str, Tuple[str, ...]], List[int]]:
+        """Positions grouped by (difficulty, tags), the buckets quiz_selection.compose_quiz draws from"""
+        if not len(self._tags):
+            return {(name, ()): positions.tolist() for name, positions in self.positions_by_difficulty().items()}
+        cells: Dict[Tuple[str, Tuple[str, ...]], List[int]] = {}
+        offsets = self._tag_offsets.tolist()
+        tags = self._tags.tolist()
+        for position, code in enumerate(self.difficulty.tolist()):
+            key = (self.difficulty_names[code],
+                   tuple(self.tag_names[tag] for tag in tags[offsets[position]:offsets[position + 1]]))
+            cells.setdefault(key, []).append(position)
+        return cells
+
+    # Language packs
+    def pack(self, language: str) -> LanguagePack:
+        """The language's pack, read on first use"""
+        with self._pack_lock:
+            pack = self._packs.get(language)
+            if pack is None:
+                source = self._pack_sources.get(language)
+                if source is None:
+                    raise KeyError(f"No '{language}' language pack")
+                pack = LanguagePack(language, len(self), self.position, source())
+                self._packs[language] = pack
+            return pack
+
+    def loaded_languages(self) -> Tuple[str, ...]:
+        return tuple(self._packs)
+
+    def _pack_for(self, position: int, language: str) -> LanguagePack:
+        pack = self.pack(language)
+        if not pack.present[position] and language != DEFAULT_LANGUAGE and DEFAULT_LANGUAGE in self._pack_sources:
+            return self.pack(DEFAULT_LANGUAGE)
+        return pack
+
+    # Materialization
+    def get(self, position: int, languages: Optional[Sequence[str]] = None) -> Dict:
+        """The question at `position` in the usual dict layout, with the given languages (default: all)"""
+        packs = {language: self._pack_for(position, language) for language in (languages or self.languages)}
+        return {
+            "id": self.id_at(position),
+            "question": {language: pack.question(position) for language, pack in packs.items()},
+            "options": {language: pack.options(position) for language, pack in packs.items()},
+            "correct": int(self.correct[position]),
+            "difficulty": self.difficulty_at(position),
+            "tags": self.tags_at(position),
+            "explanation": {language: pack.explanation(position) for language, pack in packs.items()},
+        }
+
+    def __getitem__(self, position: int) -> Dict:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        return self.get(position)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.get(position)
+
+    def view(self, language: str) -> "QuestionView":
+        return QuestionView(self, language)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the core arrays and the loaded packs"""
+        arrays = (self.ids, self._id_order, self._sorted_ids, self.correct, self.difficulty,
+                  self._tags, self._tag_offsets)
+        return sum(array.nbytes for array in arrays) + sum(pack.nbytes() for pack in self._packs.values())
+
+
+class QuestionView:
+    """Sequence of questions materialized in one language"""
+
+    def __init__(self, store: QuestionStore, language: str):
+        self.store = store
+        self.language = language
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def __getitem__(self, position: int) -> Dict:
+        if not 0 <= position < len(self.store):
+            raise IndexError(position)
+        return self.store.get(position, (self.language,))
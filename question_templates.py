@@ -0,0 +1,470 @@
+# Template-generated questions
+#
+# A small fact table per epic (who was whose father, mother, wife or
+# charioteer, who wielded which bow, who ruled which kingdom, who killed
+# whom) and bilingual question templates over those relations. Each fact is
+# asked both ways ("Who was Abhimanyu's father?" / "Whose father was
+# Arjuna?"), and each of those gives up to VARIANTS questions that differ in
+# their distractors (other entities of the answer's kind that aren't a
+# correct answer) and in the answer's slot.
+#
+# Questions are addressed by position and built on demand: a TemplatePool
+# only keeps the per-prompt metadata, so a pool of thousands of questions
+# is never held in memory. Positions are grouped by (difficulty, relation)
+# for compose_quiz, and a quiz gets at most one question per prompt.
+#
+# A question's ID is "<prompt key>.<variant>": the key hashes the template
+# and the fact, not the options. History excludes by prompt text, so a seen
+# question's other variants (and prompts with the same text) are excluded
+# too.
+#
+# The "facts" quiz format (quiz_selection.QUIZ_FORMATS) draws from the
+# pools instead of the question banks. A pool's version hashes its fact
+# table and templates, so seeded fact quizzes replay like bank quizzes.
+
+import bisect
+import hashlib
+import math
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from question_store import DEFAULT_LANGUAGE, DIFFICULTY_NAMES, QuestionView
+
+# Questions per prompt (distractor sets x answer slots)
+VARIANTS = 24
+NUM_OPTIONS = 4
+
+# relation -> (question, inverse question, explanation), each (english, telugu).
+# {s}/{o} are the fact's subject and object; _gen/_acc are Telugu case forms.
+RELATIONS: Dict[str, Tuple[Tuple[str, str], Tuple[str, str], Tuple[str, str]]] = {
+    "father": (("Who was {s}'s father?", "{s_gen} తండ్రి ఎవరు?"),
+               ("Whose father was {o}?", "{o} ఎవరి తండ్రి?"),
+               ("{o} was {s}'s father.", "{s_gen} తండ్రి {o}.")),
+    "mother": (("Who was {s}'s mother?", "{s_gen} తల్లి ఎవరు?"),
+               ("Whose mother was {o}?", "{o} ఎవరి తల్లి?"),
+               ("{o} was {s}'s mother.", "{s_gen} తల్లి {o}.")),
+    "wife": (("Who was {s}'s wife?", "{s_gen} భార్య ఎవరు?"),
+             ("Who was {o}'s husband?", "{o_gen} భర్త ఎవరు?"),
+             ("{o} was {s}'s wife.", "{s_gen} భార్య {o}.")),
+    "charioteer": (("Who was {s}'s charioteer?", "{s_gen} సారథి ఎవరు?"),
+                   ("Whose charioteer was {o}?", "{o} ఎవరి సారథి?"),
+                   ("{o} was {s}'s charioteer.", "{s_gen} సారథి {o}.")),
+    "bow": (("What was the name of {s}'s bow?", "{s_gen} విల్లు పేరు ఏమిటి?"),
+            ("Whose bow was {o}?", "{o} ఎవరి విల్లు?"),
+            ("{s}'s bow was {o}.", "{s_gen} విల్లు {o}.")),
+    "ruled": (("Which kingdom did {s} rule?", "{s} ఏ రాజ్యాన్ని పాలించారు?"),
+              ("Who ruled {o}?", "{o} రాజ్యాన్ని ఎవరు పాలించారు?"),
+              ("{s} ruled {o}.", "{s} {o} రాజ్యాన్ని పాలించారు.")),
+    "killed_by": (("Who killed {s}?", "{s_acc} ఎవరు చంపారు?"),
+                  ("Whom did {o} kill?", "{o} ఎవరిని చంపారు?"),
+                  ("{o} killed {s}.", "{s_acc} {o} చంపారు.")),
+}
+
+# Entities by kind (english -> telugu); distractors come from the answer's kind
+MAHABHARATA_ENTITIES = {
+    "man": {
+        "Arjuna": "అర్జునుడు", "Bhima": "భీముడు", "Yudhishthira": "యుధిష్ఠిరుడు", "Nakula": "నకులుడు",
+        "Sahadeva": "సహదేవుడు", "Karna": "కర్ణుడు", "Duryodhana": "దుర్యోధనుడు", "Dushasana": "దుఃశాసనుడు",
+        "Dhritarashtra": "ధృతరాష్ట్రుడు", "Pandu": "పాండు", "Vichitravirya": "విచిత్రవీర్యుడు",
+        "Bhishma": "భీష్ముడు", "Shantanu": "శంతనుడు", "Drona": "ద్రోణాచార్యుడు", "Ashwatthama": "అశ్వత్థామ",
+        "Abhimanyu": "అభిమన్యుడు", "Parikshit": "పరీక్షిత్తు", "Ghatotkacha": "ఘటోత్కచుడు",
+        "Krishna": "కృష్ణుడు", "Balarama": "బలరాముడు", "Vasudeva": "వసుదేవుడు", "Vidura": "విదురుడు",
+        "Vyasa": "వ్యాసుడు", "Drupada": "ద్రుపదుడు", "Dhrishtadyumna": "ధృష్టద్యుమ్నుడు", "Shakuni": "శకుని",
+        "Surya": "సూర్యుడు", "Adhiratha": "అధిరథుడు", "Shalya": "శల్యుడు", "Sanjaya": "సంజయుడు",
+        "Virata": "విరాటుడు", "Jarasandha": "జరాసంధుడు", "Shishupala": "శిశుపాలుడు", "Kamsa": "కంసుడు",
+        "Jayadratha": "జయద్రథుడు", "Kichaka": "కీచకుడు", "Bakasura": "బకాసురుడు", "Shiva": "శివుడు",
+    },
+    "woman": {
+        "Kunti": "కుంతి", "Madri": "మాద్రి", "Gandhari": "గాంధారి", "Draupadi": "ద్రౌపది",
+        "Subhadra": "సుభద్ర", "Satyavati": "సత్యవతి", "Ganga": "గంగ", "Uttara": "ఉత్తర",
+        "Hidimbi": "హిడింబి", "Devaki": "దేవకి", "Rohini": "రోహిణి", "Ulupi": "ఉలూపి",
+        "Chitrangada": "చిత్రాంగద", "Rukmini": "రుక్మిణి", "Ambika": "అంబిక", "Ambalika": "అంబాలిక",
+    },
+    "bow": {
+        "Gandiva": "గాండీవం", "Pinaka": "పినాకం", "Sharanga": "శారంగం", "Kodanda": "కోదండం", "Vijaya": "విజయం",
+    },
+    "kingdom": {
+        "Hastinapura": "హస్తినాపురం", "Indraprastha": "ఇంద్రప్రస్థం", "Panchala": "పాంచాల", "Matsya": "మత్స్య",
+        "Magadha": "మగధ", "Anga": "అంగ", "Madra": "మద్ర", "Chedi": "చేది", "Mathura": "మథుర",
+        "Sindhu": "సింధు", "Dwarka": "ద్వారక", "Gandhara": "గాంధార",
+    },
+}
+
+# (relation, subject, object, difficulty); a subject may have several objects
+MAHABHARATA_FACTS = [
+    ("father", "Arjuna", "Pandu", "easy"), ("father", "Yudhishthira", "Pandu", "easy"),
+    ("father", "Bhima", "Pandu", "easy"), ("father", "Nakula", "Pandu", "medium"),
+    ("father", "Sahadeva", "Pandu", "medium"), ("father", "Duryodhana", "Dhritarashtra", "easy"),
+    ("father", "Dushasana", "Dhritarashtra", "medium"), ("father", "Abhimanyu", "Arjuna", "easy"),
+    ("father", "Bhishma", "Shantanu", "easy"), ("father", "Vichitravirya", "Shantanu", "hard"),
+    ("father", "Karna", "Surya", "medium"), ("father", "Karna", "Adhiratha", "medium"),
+    ("father", "Ghatotkacha", "Bhima", "medium"), ("father", "Ashwatthama", "Drona", "medium"),
+    ("father", "Draupadi", "Drupada", "medium"), ("father", "Dhrishtadyumna", "Drupada", "hard"),
+    ("father", "Parikshit", "Abhimanyu", "medium"), ("father", "Krishna", "Vasudeva", "medium"),
+    ("father", "Balarama", "Vasudeva", "hard"), ("father", "Dhritarashtra", "Vyasa", "hard"),
+    ("father", "Dhritarashtra", "Vichitravirya", "hard"), ("father", "Pandu", "Vyasa", "hard"),
+    ("father", "Pandu", "Vichitravirya", "hard"), ("father", "Vidura", "Vyasa", "hard"),
+    ("mother", "Arjuna", "Kunti", "easy"), ("mother", "Yudhishthira", "Kunti", "easy"),
+    ("mother", "Bhima", "Kunti", "easy"), ("mother", "Karna", "Kunti", "medium"),
+    ("mother", "Nakula", "Madri", "medium"), ("mother", "Sahadeva", "Madri", "medium"),
+    ("mother", "Duryodhana", "Gandhari", "easy"), ("mother", "Dushasana", "Gandhari", "medium"),
+    ("mother", "Abhimanyu", "Subhadra", "medium"), ("mother", "Bhishma", "Ganga", "easy"),
+    ("mother", "Ghatotkacha", "Hidimbi", "medium"), ("mother", "Parikshit", "Uttara", "hard"),
+    ("mother", "Krishna", "Devaki", "medium"), ("mother", "Balarama", "Rohini", "hard"),
+    ("mother", "Balarama", "Devaki", "hard"), ("mother", "Vyasa", "Satyavati", "hard"),
+    ("mother", "Vichitravirya", "Satyavati", "hard"), ("mother", "Dhritarashtra", "Ambika", "hard"),
+    ("mother", "Pandu", "Ambalika", "hard"),
+    ("wife", "Arjuna", "Draupadi", "easy"), ("wife", "Arjuna", "Subhadra", "medium"),
+    ("wife", "Arjuna", "Ulupi", "hard"), ("wife", "Arjuna", "Chitrangada", "hard"),
+    ("wife", "Yudhishthira", "Draupadi", "easy"), ("wife", "Bhima", "Draupadi", "medium"),
+    ("wife", "Bhima", "Hidimbi", "medium"), ("wife", "Nakula", "Draupadi", "medium"),
+    ("wife", "Sahadeva", "Draupadi", "medium"), ("wife", "Pandu", "Kunti", "easy"),
+    ("wife", "Pandu", "Madri", "medium"), ("wife", "Dhritarashtra", "Gandhari", "easy"),
+    ("wife", "Shantanu", "Ganga", "medium"), ("wife", "Shantanu", "Satyavati", "medium"),
+    ("wife", "Krishna", "Rukmini", "medium"), ("wife", "Abhimanyu", "Uttara", "medium"),
+    ("wife", "Vasudeva", "Devaki", "medium"), ("wife", "Vasudeva", "Rohini", "hard"),
+    ("wife", "Vichitravirya", "Ambika", "hard"), ("wife", "Vichitravirya", "Ambalika", "hard"),
+    ("charioteer", "Arjuna", "Krishna", "easy"), ("charioteer", "Karna", "Shalya", "medium"),
+    ("charioteer", "Dhritarashtra", "Sanjaya", "medium"),
+    ("bow", "Arjuna", "Gandiva", "easy"), ("bow", "Shiva", "Pinaka", "medium"),
+    ("bow", "Krishna", "Sharanga", "hard"),
+    ("ruled", "Dhritarashtra", "Hastinapura", "easy"), ("ruled", "Pandu", "Hastinapura", "medium"),
+    ("ruled", "Shantanu", "Hastinapura", "medium"), ("ruled", "Vichitravirya", "Hastinapura", "hard"),
+    ("ruled", "Parikshit", "Hastinapura", "hard"), ("ruled", "Duryodhana", "Hastinapura", "hard"),
+    ("ruled", "Yudhishthira", "Indraprastha", "medium"), ("ruled", "Yudhishthira", "Hastinapura", "medium"),
+    ("ruled", "Drupada", "Panchala", "easy"), ("ruled", "Virata", "Matsya", "medium"),
+    ("ruled", "Jarasandha", "Magadha", "medium"), ("ruled", "Karna", "Anga", "easy"),
+    ("ruled", "Shalya", "Madra", "medium"), ("ruled", "Shishupala", "Chedi", "medium"),
+    ("ruled", "Kamsa", "Mathura", "easy"), ("ruled", "Jayadratha", "Sindhu", "hard"),
+    ("killed_by", "Karna", "Arjuna", "easy"), ("killed_by", "Jayadratha", "Arjuna", "medium"),
+    ("killed_by", "Bhishma", "Arjuna", "hard"), ("killed_by", "Duryodhana", "Bhima", "easy"),
+    ("killed_by", "Dushasana", "Bhima", "medium"), ("killed_by", "Jarasandha", "Bhima", "medium"),
+    ("killed_by", "Kichaka", "Bhima", "medium"), ("killed_by", "Bakasura", "Bhima", "medium"),
+    ("killed_by", "Shishupala", "Krishna", "medium"), ("killed_by", "Kamsa", "Krishna", "easy"),
+    ("killed_by", "Drona", "Dhrishtadyumna", "medium"), ("killed_by", "Shakuni", "Sahadeva", "hard"),
+    ("killed_by", "Dhrishtadyumna", "Ashwatthama", "hard"), ("killed_by", "Shalya", "Yudhishthira", "hard"),
+]
+
+RAMAYANA_ENTITIES = {
+    "man": {
+        "Rama": "రాముడు", "Lakshmana": "లక్ష్మణుడు", "Bharata": "భరతుడు", "Shatrughna": "శత్రుఘ్నుడు",
+        "Dasharatha": "దశరథుడు", "Janaka": "జనకుడు", "Ravana": "రావణుడు", "Kumbhakarna": "కుంభకర్ణుడు",
+        "Vibhishana": "విభీషణుడు", "Indrajit": "ఇంద్రజిత్తు", "Akshayakumara": "అక్షయకుమారుడు",
+        "Hanuman": "హనుమాన్", "Sugriva": "సుగ్రీవుడు", "Vali": "వాలి", "Angada": "అంగదుడు",
+        "Jambavan": "జాంబవంతుడు", "Jatayu": "జటాయువు", "Lava": "లవుడు", "Kusha": "కుశుడు",
+        "Vishwamitra": "విశ్వామిత్రుడు", "Vasishtha": "వశిష్ఠుడు", "Gautama": "గౌతముడు",
+        "Maricha": "మారీచుడు", "Khara": "ఖరుడు", "Kesari": "కేసరి", "Vayu": "వాయుదేవుడు",
+        "Surya": "సూర్యుడు", "Indra": "ఇంద్రుడు", "Shiva": "శివుడు", "Guha": "గుహుడు",
+        "Sumantra": "సుమంత్రుడు", "Matali": "మాతలి",
+    },
+    "woman": {
+        "Sita": "సీత", "Kausalya": "కౌసల్య", "Kaikeyi": "కైకేయి", "Sumitra": "సుమిత్ర", "Urmila": "ఊర్మిళ",
+        "Mandavi": "మాండవి", "Shrutakirti": "శ్రుతకీర్తి", "Mandodari": "మండోదరి", "Shurpanakha": "శూర్పణఖ",
+        "Tara": "తార", "Ahalya": "అహల్య", "Manthara": "మంథర", "Tataka": "తాటక", "Anjana": "అంజన",
+        "Shabari": "శబరి",
+    },
+    "bow": {
+        "Kodanda": "కోదండం", "Pinaka": "పినాకం", "Sharanga": "శారంగం", "Gandiva": "గాండీవం", "Vijaya": "విజయం",
+    },
+    "kingdom": {
+        "Ayodhya": "అయోధ్య", "Mithila": "మిథిల", "Lanka": "లంక", "Kishkindha": "కిష్కింధ",
+        "Shringaverapura": "శృంగిబేరపురం", "Kekaya": "కేకయ", "Hastinapura": "హస్తినాపురం",
+        "Magadha": "మగధ", "Dwarka": "ద్వారక",
+    },
+}
+
+RAMAYANA_FACTS = [
+    ("father", "Rama", "Dasharatha", "easy"), ("father", "Lakshmana", "Dasharatha", "easy"),
+    ("father", "Bharata", "Dasharatha", "easy"), ("father", "Shatrughna", "Dasharatha", "medium"),
+    ("father", "Sita", "Janaka", "easy"), ("father", "Urmila", "Janaka", "medium"),
+    ("father", "Indrajit", "Ravana", "medium"), ("father", "Akshayakumara", "Ravana", "hard"),
+    ("father", "Angada", "Vali", "medium"), ("father", "Hanuman", "Kesari", "medium"),
+    ("father", "Hanuman", "Vayu", "medium"), ("father", "Sugriva", "Surya", "hard"),
+    ("father", "Vali", "Indra", "hard"), ("father", "Lava", "Rama", "medium"),
+    ("father", "Kusha", "Rama", "medium"),
+    ("mother", "Rama", "Kausalya", "easy"), ("mother", "Bharata", "Kaikeyi", "easy"),
+    ("mother", "Lakshmana", "Sumitra", "easy"), ("mother", "Shatrughna", "Sumitra", "medium"),
+    ("mother", "Hanuman", "Anjana", "medium"), ("mother", "Lava", "Sita", "medium"),
+    ("mother", "Kusha", "Sita", "medium"), ("mother", "Indrajit", "Mandodari", "medium"),
+    ("mother", "Akshayakumara", "Mandodari", "hard"), ("mother", "Angada", "Tara", "hard"),
+    ("wife", "Rama", "Sita", "easy"), ("wife", "Lakshmana", "Urmila", "medium"),
+    ("wife", "Bharata", "Mandavi", "hard"), ("wife", "Shatrughna", "Shrutakirti", "hard"),
+    ("wife", "Ravana", "Mandodari", "easy"), ("wife", "Dasharatha", "Kausalya", "easy"),
+    ("wife", "Dasharatha", "Kaikeyi", "easy"), ("wife", "Dasharatha", "Sumitra", "medium"),
+    ("wife", "Vali", "Tara", "medium"), ("wife", "Sugriva", "Tara", "hard"),
+    ("wife", "Gautama", "Ahalya", "medium"), ("wife", "Kesari", "Anjana", "medium"),
+    ("charioteer", "Rama", "Matali", "hard"), ("charioteer", "Rama", "Sumantra", "hard"),
+    ("charioteer", "Indra", "Matali", "medium"), ("charioteer", "Dasharatha", "Sumantra", "medium"),
+    ("bow", "Rama", "Kodanda", "easy"), ("bow", "Shiva", "Pinaka", "medium"),
+    ("ruled", "Dasharatha", "Ayodhya", "easy"), ("ruled", "Rama", "Ayodhya", "easy"),
+    ("ruled", "Bharata", "Ayodhya", "hard"), ("ruled", "Kusha", "Ayodhya", "hard"),
+    ("ruled", "Janaka", "Mithila", "easy"), ("ruled", "Ravana", "Lanka", "easy"),
+    ("ruled", "Vibhishana", "Lanka", "medium"), ("ruled", "Sugriva", "Kishkindha", "easy"),
+    ("ruled", "Vali", "Kishkindha", "medium"), ("ruled", "Guha", "Shringaverapura", "hard"),
+    ("killed_by", "Ravana", "Rama", "easy"), ("killed_by", "Vali", "Rama", "easy"),
+    ("killed_by", "Kumbhakarna", "Rama", "medium"), ("killed_by", "Tataka", "Rama", "medium"),
+    ("killed_by", "Maricha", "Rama", "medium"), ("killed_by", "Khara", "Rama", "hard"),
+    ("killed_by", "Indrajit", "Lakshmana", "medium"), ("killed_by", "Akshayakumara", "Hanuman", "hard"),
+    ("killed_by", "Jatayu", "Ravana", "medium"),
+]
+
+FACT_TABLES = {
+    "mahabharata": (MAHABHARATA_ENTITIES, MAHABHARATA_FACTS),
+    "ramayana": (RAMAYANA_ENTITIES, RAMAYANA_FACTS),
+}
+
+
+def _telugu_genitive(name: str) -> str:
+    # అర్జునుడు -> అర్జునుని; names not ending in -ుడు keep their form (సీత తండ్రి)
+    return name[:-3] + "ుని" if name.endswith("ుడు") else name
+
+
+def _telugu_accusative(name: str) -> str:
+    # కర్ణుడు -> కర్ణుడిని, వాలి -> వాలిని, సీత -> సీతను
+    if name.endswith("ుడు"):
+        return name[:-1] + "ిని"
+    return name + ("ని" if name.endswith(("ి", "ీ")) else "ను")
+
+
+def _combination(rank: int, n: int, k: int) -> List[int]:
+    """The rank-th k-combination of range(n) in lexicographic order"""
+    picked = []
+    start = 0
+    for remaining in range(k, 0, -1):
+        for i in range(start, n):
+            count = math.comb(n - i - 1, remaining - 1)
+            if rank < count:
+                picked.append(i)
+                start = i + 1
+                break
+            rank -= count
+    return picked
+
+
+def _harder(difficulty: str) -> str:
+    return DIFFICULTY_NAMES[min(DIFFICULTY_NAMES.index(difficulty) + 1, len(DIFFICULTY_NAMES) - 1)]
+
+
+class _Prompt:
+    """One question text with one correct answer; its variants differ in distractors and answer slot"""
+
+    __slots__ = ("relation", "inverse", "subject", "object", "answer", "difficulty",
+                 "candidates", "combinations", "variants", "base", "stride")
+
+    def __init__(self, relation, inverse, subject, obj, difficulty, candidates, variants):
+        self.relation = relation
+        self.inverse = inverse
+        self.subject = subject
+        self.object = obj
+        self.answer = subject if inverse else obj
+        self.difficulty = difficulty
+        self.candidates = candidates
+        self.combinations = combinations = math.comb(len(candidates), NUM_OPTIONS - 1)
+        self.variants = min(variants, combinations * NUM_OPTIONS)
+        # Variant v uses distractor set (base + (v // NUM_OPTIONS) * stride) mod combinations;
+        # a stride coprime with the count keeps the sets distinct and spread out
+        self.base = zlib.crc32(f"{relation}:{inverse}:{subject}:{obj}".encode("utf-8")) % combinations
+        stride = max(1, int(combinations * 0.618))
+        while math.gcd(stride, combinations) != 1:
+            stride += 1
+        self.stride = stride
+
+    def options(self, variant: int) -> Tuple[List[str], int]:
+        rank = (self.base + (variant // NUM_OPTIONS) * self.stride) % self.combinations
+        options = [self.candidates[i] for i in _combination(rank, len(self.candidates), NUM_OPTIONS - 1)]
+        correct = variant % NUM_OPTIONS
+        options.insert(correct, self.answer)
+        return options, correct
+
+
+class TemplatePool:
+    """All template questions of one epic, generated by position on demand
+
+    Exposes the parts of EpicBank the quiz uses (view, cells, positions),
+    so it can stand in for a bank without materializing its questions.
+    """
+
+    def __init__(self, epic: str, variants: int = VARIANTS):
+        if epic not in FACT_TABLES:
+            raise KeyError(f"No fact table for '{epic}'")
+        entities, facts = FACT_TABLES[epic]
+        self.epic = epic
+        self.version = f"{epic}-tpl{_table_hash(epic, variants)}"
+        self._telugu: Dict[str, str] = {}
+        kinds: Dict[str, str] = {}
+        for kind, names in entities.items():
+            for english, telugu in names.items():
+                if english in kinds:
+                    raise ValueError(f"{epic}: entity '{english}' listed twice")
+                kinds[english] = kind
+                self._telugu[english] = telugu
+
+        objects_of: Dict[Tuple[str, str], set] = {}
+        subjects_of: Dict[Tuple[str, str], set] = {}
+        for relation, subject, obj, _ in facts:
+            for name in (subject, obj):
+                if name not in kinds:
+                    raise ValueError(f"{epic}: unknown entity '{name}' in {relation} fact")
+            objects_of.setdefault((relation, subject), set()).add(obj)
+            subjects_of.setdefault((relation, obj), set()).add(subject)
+
+        prompts: List[_Prompt] = []
+        for relation, subject, obj, difficulty in facts:
+            for inverse in (False, True):
+                answer, shown = (subject, obj) if inverse else (obj, subject)
+                # Any correct answer to the same question can't be a distractor
+                correct = subjects_of[(relation, obj)] if inverse else objects_of[(relation, subject)]
+                candidates = tuple(name for name in entities[kinds[answer]]
+                                   if name not in correct and name != shown)
+                if len(candidates) < NUM_OPTIONS - 1:
+                    raise ValueError(f"{epic}: not enough {kinds[answer]} distractors for {relation} {subject}/{obj}")
+                prompts.append(_Prompt(relation, inverse, subject, obj,
+                                       _harder(difficulty) if inverse else difficulty, candidates, variants))
+
+        # Positions run through the easy prompts, then medium, then hard
+        prompts.sort(key=lambda prompt: DIFFICULTY_NAMES.index(prompt.difficulty))
+        self._prompts = prompts
+        self._keys = [_prompt_key(prompt) for prompt in prompts]
+        self._key_index = {key: index for index, key in enumerate(self._keys)}
+        self._starts: List[int] = []
+        total = 0
+        for prompt in prompts:
+            self._starts.append(total)
+            total += prompt.variants
+        self._size = total
+        # Same question text (e.g. both "Whose father was Pandu?" facts) counts as one prompt per quiz
+        self._group_ids: Dict[Tuple, int] = {}
+        self._groups = [self._group_ids.setdefault((p.relation, p.inverse, p.object if p.inverse else p.subject),
+                                                   len(self._group_ids))
+                        for p in prompts]
+        self._cells: Optional[Dict[Tuple[str, Tuple[str, ...]], List[int]]] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _locate(self, position: int) -> Tuple[int, int]:
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+        index = bisect.bisect_right(self._starts, position) - 1
+        return index, position - self._starts[index]
+
+    def group(self, position: int) -> int:
+        """Prompt group of a position; a quiz takes at most one question per group"""
+        return self._groups[self._locate(position)[0]]
+
+    def difficulty_at(self, position: int) -> str:
+        return self._prompts[self._locate(position)[0]].difficulty
+
+    def get(self, position: int, languages: Optional[Sequence[str]] = None) -> Dict:
+        """The question at `position` in the usual bank layout"""
+        index, variant = self._locate(position)
+        prompt = self._prompts[index]
+        options, correct = prompt.options(variant)
+        telugu_subject, telugu_object = self._telugu[prompt.subject], self._telugu[prompt.object]
+        names = {
+            "english": {"s": prompt.subject, "o": prompt.object},
+            "telugu": {"s": telugu_subject, "o": telugu_object,
+                       "s_gen": _telugu_genitive(telugu_subject), "o_gen": _telugu_genitive(telugu_object),
+                       "s_acc": _telugu_accusative(telugu_subject), "o_acc": _telugu_accusative(telugu_object)},
+        }
+        question_template, inverse_template, explanation_template = RELATIONS[prompt.relation]
+        template = inverse_template if prompt.inverse else question_template
+        option_names = {"english": options, "telugu": [self._telugu[name] for name in options]}
+        texts = {language: template[column].format(**names[language])
+                 for column, language in enumerate(("english", "telugu"))}
+        explanations = {language: explanation_template[column].format(**names[language])
+                        for column, language in enumerate(("english", "telugu"))}
+        languages = languages or ("english", "telugu")
+
+        def in_languages(values: Dict) -> Dict:
+            return {language: values.get(language, values[DEFAULT_LANGUAGE]) for language in languages}
+
+        return {
+            "id": f"{self._keys[index]}.{variant}",
+            "question": in_languages(texts),
+            "options": in_languages(option_names),
+            "correct": correct,
+            "difficulty": prompt.difficulty,
+            "tags": [prompt.relation],
+            "explanation": in_languages(explanations),
+        }
+
+    def id_at(self, position: int) -> str:
+        index, variant = self._locate(position)
+        return f"{self._keys[index]}.{variant}"
+
+    def __getitem__(self, position: int) -> Dict:
+        if position < 0:
+            position += self._size
+        return self.get(position)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for position in range(self._size):
+            yield self.get(position)
+
+    def iter_questions(self) -> Iterator[Dict]:
+        """Every question, one variant of each prompt at a time, so any prefix covers the facts evenly"""
+        for variant in range(max((prompt.variants for prompt in self._prompts), default=0)):
+            for start, prompt in zip(self._starts, self._prompts):
+                if variant < prompt.variants:
+                    yield self.get(start + variant)
+
+    # Bank interface used by get_random_questions
+    def view(self, language: str) -> QuestionView:
+        return QuestionView(self, language)
+
+    @property
+    def cells(self) -> Dict[Tuple[str, Tuple[str, ...]], List[int]]:
+        # Positions by (difficulty, relation tag), for compose_quiz
+        if self._cells is None:
+            self._cells = {}
+            for start, prompt in zip(self._starts, self._prompts):
+                self._cells.setdefault((prompt.difficulty, (prompt.relation,)), []).extend(
+                    range(start, start + prompt.variants))
+        return self._cells
+
+    def positions(self, qids: Iterable[str]) -> "_SeenPositions":
+        return _SeenPositions(self, frozenset(qids))
+
+    def position(self, qid: str) -> Optional[int]:
+        key, _, variant = qid.partition(".")
+        index = self._key_index.get(key)
+        if index is None or not variant.isdigit() or int(variant) >= self._prompts[index].variants:
+            return None
+        return self._starts[index] + int(variant)
+
+    def prompt_group(self, qid: str) -> Optional[int]:
+        """Prompt group of a question ID, any variant; None if it isn't from this pool"""
+        index = self._key_index.get(qid.partition(".")[0])
+        return None if index is None else self._groups[index]
+
+
+class _SeenPositions:
+    """Positions whose prompt text was asked by any of `qids`, whatever the variant"""
+
+    __slots__ = ("pool", "groups")
+
+    def __init__(self, pool: TemplatePool, qids: frozenset):
+        self.pool = pool
+        self.groups = {pool.prompt_group(qid) for qid in qids} - {None}
+
+    def __contains__(self, position: int) -> bool:
+        return bool(self.groups) and self.pool.group(position) in self.groups
+
+
+def _prompt_key(prompt: "_Prompt") -> str:
+    """Stable key of a prompt: its template (relation, direction) and fact"""
+    content = f"{prompt.relation}|{int(prompt.inverse)}|{prompt.subject}|{prompt.object}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+def _table_hash(epic: str, variants: int) -> str:
+    content = repr((FACT_TABLES[epic], RELATIONS, variants, NUM_OPTIONS))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def template_pool(epic: str) -> TemplatePool:
+    """Process-wide pool of one epic, shared by all sessions"""
+    return TemplatePool(epic)
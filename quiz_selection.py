@@ -0,0 +1,307 @@
+# Quiz question selection
+#
+# compose_quiz() draws a quiz of any size with quota weights over
+# difficulty, epic and topic tag from one or more banks. Each bank keeps its
+# positions pre-bucketed by (difficulty, tags), and every slot picks the
+# bucket that serves the most unmet quotas. Buckets are drawn with a partial
+# Fisher-Yates shuffle that records only the swapped slots, so the cost
+# grows with the quiz size and the number of buckets, not the banks (a few
+# milliseconds per quiz, see benchmarks/bench_composer.py). Previously seen
+# questions are passed in as a set of bank positions (or any container
+# answering `position in exclude`). Buckets may be ranges, so a generated
+# pool (question_templates.TemplatePool) is drawn without listing it.
+#
+# A format with "source": "templates" draws from the generated
+# question_templates pools instead of the question banks.
+#
+# A quiz drawn with a seed is fully determined by (bank version, seed,
+# excluded question IDs, format), so a score record can store those instead
+# of the drawn IDs and replay_quiz() can rebuild the quiz exactly. Records
+# also store draw_version(), and replay_quiz() refuses a record drawn by
+# another version of the draw; save_score keeps questions_used as well
+# whenever replay_guaranteed() can't promise the replay.
+
+import hashlib
+import json
+import random
+import secrets
+from collections.abc import Container
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+# Target questions per difficulty for a standard quiz (6 easy, 8 medium, 6 hard)
+DIFFICULTY_TARGETS: Tuple[Tuple[str, int], ...] = (("easy", 6), ("medium", 8), ("hard", 6))
+
+# Quiz formats: size and quota weights per dimension ("difficulty", "epic",
+# "tag"), scaled to the size. Values without a weight only fill what the
+# quotas leave open. Stored by name with seeded scores, so a format must not
+# change once used; add a new one instead.
+QUIZ_FORMATS: Dict[str, Dict] = {
+    "standard": {"size": 20, "quotas": {"difficulty": dict(DIFFICULTY_TARGETS)}},
+    "sprint": {"size": 5, "quotas": {"difficulty": dict(DIFFICULTY_TARGETS)}},
+    "exam": {"size": 50, "quotas": {"difficulty": dict(DIFFICULTY_TARGETS),
+                                    "epic": {"mahabharata": 1, "ramayana": 1}}},
+    "facts": {"size": 20, "source": "templates",
+              "quotas": {"difficulty": dict(DIFFICULTY_TARGETS),
+                         "tag": {"father": 1, "mother": 1, "wife": 1, "ruled": 1, "killed_by": 1}}},
+}
+
+# Version of the draw itself: bump it whenever compose_quiz or _BucketDraw
+# changes which questions a seed picks
+DRAW_ALGORITHM = 1
+
+# Quiz types drawn from several epics; any other quiz type is one epic's bank
+QUIZ_EPICS: Dict[str, Tuple[str, ...]] = {"exam": ("mahabharata", "ramayana")}
+
+
+def history_key(quiz_type: str, quiz_format: Optional[str] = None) -> str:
+    """Key a quiz's question history is kept under
+
+    Generated questions (a "templates" format) are kept apart from bank
+    questions, so they don't use up the bank history's cap.
+    """
+    if QUIZ_FORMATS.get(quiz_format or "standard", {}).get("source") == "templates":
+        return f"{quiz_type}:{quiz_format}"
+    return quiz_type
+
+
+def history_quiz_types(quiz_type: str) -> Tuple[str, ...]:
+    """Quiz types whose questions count as seen for a quiz: its own and every one sharing an epic
+
+    So the exam avoids what the single-epic quizzes showed, and they avoid
+    what the exam showed.
+    """
+    epics = set(QUIZ_EPICS.get(quiz_type, (quiz_type,)))
+    related = [epic for epic in sorted(epics) if epic != quiz_type]
+    related += [name for name, drawn in QUIZ_EPICS.items() if name != quiz_type and epics & set(drawn)]
+    return (quiz_type, *related)
+
+
+class _BucketDraw:
+    """Lazy random permutation of one bucket, consumed one item at a time"""
+
+    __slots__ = ("bucket", "drawn", "swaps")
+
+    def __init__(self, bucket: Sequence[int]):
+        self.bucket = bucket
+        self.drawn = 0
+        # Slots moved by the shuffle; untouched slot i still holds bucket[i]
+        self.swaps: Dict[int, int] = {}
+
+    def remaining(self) -> int:
+        return len(self.bucket) - self.drawn
+
+    def next(self, rng) -> int:
+        i = self.drawn
+        j = rng.randrange(i, len(self.bucket))
+        swaps = self.swaps
+        picked = swaps.get(j, j)
+        swaps[j] = swaps.get(i, i)
+        self.drawn = i + 1
+        return self.bucket[picked]
+
+
+def scale_quotas(weights: Dict[str, float], size: int) -> Dict[str, int]:
+    """Split `size` by weight (largest remainder; ties go to the earlier value)"""
+    total = sum(weights.values())
+    if size <= 0 or total <= 0:
+        return {value: 0 for value in weights}
+    exact = {value: size * weight / total for value, weight in weights.items()}
+    counts = {value: int(share) for value, share in exact.items()}
+    leftover = size - sum(counts.values())
+    for value in sorted(exact, key=lambda value: counts[value] - exact[value])[:leftover]:
+        counts[value] += 1
+    return counts
+
+
+class _Cell:
+    """One (epic, difficulty, tags) bucket of a bank during a compose"""
+
+    __slots__ = ("epic", "draw", "excluded", "group")
+
+    def __init__(self, epic: str, bucket: Sequence[int], excluded: Container,
+                 group: Optional[Callable[[int], Hashable]]):
+        self.epic = epic
+        self.draw = _BucketDraw(bucket)
+        self.excluded = excluded
+        self.group = group
+
+
+def compose_quiz(banks: Dict[str, object], size: int, quotas: Dict[str, Dict[str, float]],
+                 exclude_ids: Iterable[str] = (), rng: Optional[random.Random] = None
+                 ) -> Tuple[List[Tuple[str, int]], int]:
+    """Pick `size` (epic, position) pairs from `banks` (epic -> EpicBank or TemplatePool)
+
+    `quotas` maps a dimension to value weights, e.g. {"difficulty": {"easy": 3,
+    "hard": 1}, "epic": {...}, "tag": {...}}; a question with several tags
+    counts for each. Each slot goes to a bucket serving the most dimensions
+    with unmet quotas, preferring the quota closest to running out of
+    questions (random among equals, weighted by bucket size). When buckets
+    run short the quotas are met as far as possible, the rest is filled
+    from any bucket, and previously seen questions are reused last.
+    Returns the picks in random order and how many were previously seen.
+    """
+    rng = rng or random
+    exclude_ids = list(exclude_ids)
+    # Unmet quota and undrawn questions per (dimension, value)
+    deficit = {(dimension, value): count
+               for dimension, weights in quotas.items()
+               for value, count in scale_quotas(weights, size).items()}
+    supply = dict.fromkeys(deficit, 0)
+
+    # Buckets counting towards the same quotas are interchangeable for scoring
+    classes: Dict[Tuple[Tuple[str, str], ...], List[_Cell]] = {}
+    for epic, bank in banks.items():
+        excluded = bank.positions(exclude_ids)
+        group = getattr(bank, "group", None)
+        for (difficulty, tags), bucket in bank.cells.items():
+            if not len(bucket):
+                continue
+            values = [("epic", epic), ("difficulty", difficulty)] + [("tag", tag) for tag in tags]
+            values = tuple(sorted(key for key in values if key in deficit))
+            for key in values:
+                supply[key] += len(bucket)
+            classes.setdefault(values, []).append(_Cell(epic, bucket, excluded, group))
+    remaining = {values: sum(cell.draw.remaining() for cell in cells) for values, cells in classes.items()}
+
+    selected: List[Tuple[str, int]] = []
+    seen: List[Tuple[str, int]] = []  # Excluded (or same-group) questions passed over
+    groups_taken = set()
+
+    def take(values: Tuple[Tuple[str, str], ...], cell: _Cell) -> Optional[int]:
+        """Next unseen position of the cell, or None once it has none left"""
+        while cell.draw.remaining():
+            position = cell.draw.next(rng)
+            remaining[values] -= 1
+            for key in values:
+                supply[key] -= 1
+            if position in cell.excluded:
+                seen.append((cell.epic, position))
+                continue
+            if cell.group is not None:
+                group_key = (cell.epic, cell.group(position))
+                if group_key in groups_taken:
+                    seen.append((cell.epic, position))
+                    continue
+                groups_taken.add(group_key)
+            return position
+        return None
+
+    while len(selected) < size and classes:
+        # Score: dimensions served, then how close the tightest served quota is to running out
+        best: List[Tuple[Tuple[str, str], ...]] = []
+        best_score = None
+        for values in classes:
+            dimensions, tightest, last = 0, None, None
+            for key in values:  # Sorted, so each dimension's values are adjacent
+                need = deficit[key]
+                if need > 0:
+                    if key[0] != last:
+                        dimensions, last = dimensions + 1, key[0]
+                    gap = need - supply[key]
+                    if tightest is None or gap > tightest:
+                        tightest = gap
+            score = (dimensions, 0 if tightest is None else tightest)
+            if best_score is None or score > best_score:
+                best, best_score = [values], score
+            elif score == best_score:
+                best.append(values)
+        values = rng.choices(best, [remaining[v] for v in best])[0]
+        cells = classes[values]
+        cell = rng.choices(cells, [c.draw.remaining() for c in cells])[0] if len(cells) > 1 else cells[0]
+
+        position = take(values, cell)
+        if position is not None:
+            selected.append((cell.epic, position))
+            for key in values:
+                if deficit[key] > 0:
+                    deficit[key] -= 1
+        if not cell.draw.remaining():
+            cells.remove(cell)
+            if not cells:
+                del classes[values]
+
+    # Not enough unseen questions: reuse previously seen ones
+    reused = 0
+    if len(selected) < size and seen:
+        reused = min(size - len(selected), len(seen))
+        selected.extend(rng.sample(seen, reused))
+
+    rng.shuffle(selected)
+    return selected, reused
+
+
+def draw_format(banks: Dict[str, object], quiz_format: str, exclude_ids: Iterable[str] = (),
+                seed: Optional[int] = None) -> Tuple[List[Tuple[str, int]], int]:
+    """compose_quiz() with a named QUIZ_FORMATS entry; seeded draws are reproducible"""
+    spec = QUIZ_FORMATS[quiz_format]
+    rng = random.Random(seed) if seed is not None else None
+    return compose_quiz(banks, spec["size"], spec["quotas"], exclude_ids, rng)
+
+
+def new_quiz_seed() -> int:
+    return secrets.randbits(32)
+
+
+def exclusion_hash(qids: Iterable[str]) -> str:
+    """Order-independent hash of the question IDs a quiz was drawn without"""
+    return hashlib.sha1("\n".join(sorted(set(qids))).encode("utf-8")).hexdigest()[:12]
+
+
+def draw_version(quiz_format: str) -> str:
+    """Version of the draw algorithm and of the format's spec, stored with seeded scores"""
+    spec = json.dumps(QUIZ_FORMATS[quiz_format], sort_keys=True)
+    return f"{DRAW_ALGORITHM}-{hashlib.sha256(spec.encode('utf-8')).hexdigest()[:8]}"
+
+
+def load_sources(epics: Iterable[str], quiz_format: str = "standard") -> Dict[str, object]:
+    """Current question source of each epic for a format: its EpicBank, or its TemplatePool"""
+    if QUIZ_FORMATS[quiz_format].get("source") == "templates":
+        from question_templates import template_pool
+        return {epic: template_pool(epic) for epic in epics}
+    from question_bank import get_question_bank_loader
+    loader = get_question_bank_loader()
+    return {epic: loader.load(epic) for epic in epics}
+
+
+def load_version(version: str):
+    """A bank (or template pool) by version; None if that version is gone"""
+    epic, _, digest = version.rpartition("-")
+    if digest.startswith("tpl"):
+        from question_templates import FACT_TABLES, template_pool
+        pool = template_pool(epic) if epic in FACT_TABLES else None
+        return pool if pool is not None and pool.version == version else None
+    from question_bank import get_question_bank_loader
+    return get_question_bank_loader().get_version(version)
+
+
+def replay_quiz(record: Dict, exclude_ids: Iterable[str]) -> Optional[List[str]]:
+    """Question IDs of a seeded score record, or None if it can't be replayed
+
+    That is when a bank version is gone, or the record was drawn by another
+    version of the draw (algorithm or format spec).
+    """
+    quiz_format = record.get("quiz_format")
+    if quiz_format not in QUIZ_FORMATS or record.get("draw_version") != draw_version(quiz_format):
+        return None
+    # Multi-epic quizzes store their bank versions joined by "+", in draw order
+    banks = {}
+    for version in record["bank_version"].split("+"):
+        bank = load_version(version)
+        if bank is None:
+            return None
+        banks[bank.epic] = bank
+    picks, _ = draw_format(banks, quiz_format, exclude_ids, record["quiz_seed"])
+    return [banks[epic].id_at(position) for epic, position in picks]
+
+
+def replay_guaranteed(record: Dict, exclude_ids: Iterable[str], questions_used: List[str]) -> bool:
+    """Whether a seeded record will still replay to questions_used later
+
+    The draw must replay now, and every bank version must be archived:
+    template pools and unarchived banks can change with the code or files.
+    """
+    from question_bank import get_question_bank_loader
+    loader = get_question_bank_loader()
+    if not all(loader.is_archived(version) for version in record["bank_version"].split("+")):
+        return False
+    return replay_quiz(record, exclude_ids) == list(questions_used)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Script to replay a user's quiz attempts, for support and debugging
+
+Seeded attempts are rebuilt from their seed, bank version and exclusion
+hash, in the order they were drawn; older attempts show their stored
+question IDs.
+
+Usage: python replay_attempts.py <username> [quiz_type]
+"""
+
+import sys
+
+from question_bank import get_question_bank_loader
+from question_templates import template_pool
+from quiz_selection import QUIZ_EPICS, replay_quiz
+from score_indexes import AttemptIndex
+from storage import get_storage, username_key
+
+def describe(qid, banks):
+    # IDs are content hashes, so the current banks (and template pools) have the text of any question they still contain
+    for bank in banks:
+        position = bank.position(qid)
+        if position is not None:
+            return f"{qid}  {bank.view('english')[position]['question']['english']}"
+    return f"{qid}  (no longer in the bank)"
+
+def main():
+    """Print every attempt of a user with the questions it used"""
+    if len(sys.argv) < 2:
+        print("Usage: python replay_attempts.py <username> [quiz_type]")
+        return 1
+    username = sys.argv[1]
+    loader = get_question_bank_loader()
+    quiz_types = sys.argv[2:] or loader.epics() + list(QUIZ_EPICS)
+
+    # All of the user's attempts are replayed in storage order, so each one
+    # sees the history it was drawn against: quiz types sharing an epic
+    # share their history (the exam and the single-epic quizzes)
+    key = username_key(username)
+    records = [record for record in get_storage().iter_scores() if username_key(record["name"]) == key]
+    found = False
+    for quiz_type in quiz_types:
+        attempts = AttemptIndex(replay_quiz)
+        epics = QUIZ_EPICS.get(quiz_type, (quiz_type,))
+        banks = [loader.load(epic) for epic in epics] + [template_pool(epic) for epic in epics]
+        for record in records:
+            questions = attempts.add(record)
+            if record["quiz_type"] != quiz_type:
+                continue
+            found = True
+            print(f"\n📝 {quiz_type} {record.get('timestamp')}: {record['score']}/{record['total']}")
+            if record.get("quiz_seed") is not None:
+                print(f"   🎲 seed {record['quiz_seed']} on {record['bank_version']} "
+                      f"(exclusions {record['exclusion_hash']}, format {record.get('quiz_format', 'standard')}, "
+                      f"draw {record.get('draw_version', '-')})")
+            if not questions:
+                print("   ⚠️  Questions unknown (history cleared or bank version not archived)")
+                continue
+            for number, qid in enumerate(questions, 1):
+                print(f"   {number:2}. {describe(qid, banks)}")
+
+    if not found:
+        print(f"❌ No attempts found for {username}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,7 @@ Script to reset the app by clearing all data files
 
 import os
 import json
+import shutil
 
 def reset_app_data():
     """Reset all app data files"""
@@ -13,13 +14,21 @@ def reset_app_data():
     # Files to reset
     files_to_reset = [
         "quiz_scores.json",
-        "user_profiles.json"
+        "quiz_scores.jsonl",
+        "user_profiles.json",
+        "epic_quiz.db",
+        "epic_quiz.db-wal",
+        "epic_quiz.db-shm"
     ]
     
     for file_path in files_to_reset:
         if os.path.exists(file_path):
             try:
-                if file_path.endswith('.json'):
+                if file_path.endswith('.jsonl'):
+                    # Empty score log
+                    open(file_path, 'w', encoding='utf-8').close()
+                    print(f"✅ Reset: {file_path}")
+                elif file_path.endswith('.json'):
                     # Reset JSON files to empty structures
                     if 'scores' in file_path:
                         with open(file_path, 'w', encoding='utf-8') as f:
@@ -34,6 +43,12 @@ def reset_app_data():
             except Exception as e:
                 print(f"⚠️  Could not reset {file_path}: {e}")
     
+    # Sharded profiles and the derived columnar score store
+    for dir_path in ["user_profiles", "score_columns"]:
+        if os.path.isdir(dir_path):
+            shutil.rmtree(dir_path, ignore_errors=True)
+            print(f"✅ Removed: {dir_path}")
+    
     print("🎉 App data reset complete!")
     print("💡 Now restart the app with: python run_enhanced.py")
 
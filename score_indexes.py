@@ -0,0 +1,397 @@
+# In-memory indexes over quiz scores
+#
+# The indexes are built lazily from storage the first time they are needed
+# and then kept up to date by the write paths (save_score and the admin
+# deletions), so read paths never have to scan every score again.
+
+import bisect
+import collections
+import datetime
+import hashlib
+import heapq
+import itertools
+import math
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+from quiz_selection import exclusion_hash, history_key, history_quiz_types, replay_quiz
+from storage import get_storage, username_key
+
+
+class AttemptIndex:
+    """Per-user attempts for each quiz type, kept in timestamp order
+
+    Attempts are kept under their history_key (quiz type, or quiz type and
+    format for generated questions), which get_seen_questions takes too.
+
+    Seeded records carry questions_used only when their replay isn't
+    guaranteed; otherwise `replay(record, exclude_ids)` rebuilds their
+    question IDs. Records arrive in storage order, so the
+    questions the user had seen before an attempt are exactly the ones
+    its quiz was drawn without (checked against the stored exclusion hash).
+    """
+
+    def __init__(self, replay: Optional[Callable[[Dict, List[str]], Optional[List[str]]]] = None):
+        self.replay = replay
+        # username key -> quiz type -> [(timestamp, seq, questions_used)]
+        self._attempts: Dict[str, Dict[str, List[Tuple[str, int, tuple]]]] = {}
+        # username key -> quiz type -> every question id the user has seen
+        self._seen: Dict[str, Dict[str, set]] = {}
+        # Tie-breaker so equal timestamps never compare the question tuples
+        self._seq = itertools.count()
+
+    def clear(self):
+        self._attempts.clear()
+        self._seen.clear()
+
+    def _replay(self, record: Dict) -> List[str]:
+        if self.replay is None or record.get("quiz_seed") is None:
+            return []
+        exclude = self.get_seen_questions(record.get("name", ""),
+                                          history_key(record.get("quiz_type"), record.get("quiz_format")))
+        if exclusion_hash(exclude) != record.get("exclusion_hash"):
+            return []  # History changed (cleared or removed attempts): can't rebuild this quiz
+        return self.replay(record, exclude) or []
+
+    def add(self, record: Dict) -> tuple:
+        """Index an attempt; returns the question IDs recorded for it"""
+        key = username_key(record.get("name", ""))
+        quiz_type = history_key(record.get("quiz_type"), record.get("quiz_format"))
+        questions_used = record.get("questions_used")
+        if not isinstance(questions_used, list):
+            questions_used = self._replay(record)
+
+        attempts = self._attempts.setdefault(key, {}).setdefault(quiz_type, [])
+        entry = (record.get("timestamp") or "", next(self._seq), tuple(questions_used))
+        if not attempts or entry >= attempts[-1]:
+            attempts.append(entry)  # the usual case: newest attempt
+        else:
+            bisect.insort(attempts, entry)
+        self._seen.setdefault(key, {}).setdefault(quiz_type, set()).update(questions_used)
+        return entry[2]
+
+    def remove_user(self, name: str):
+        key = username_key(name)
+        self._attempts.pop(key, None)
+        self._seen.pop(key, None)
+
+    def clear_history(self, name: str):
+        """Forget the questions a user has seen but keep the attempts"""
+        key = username_key(name)
+        for quiz_type, attempts in self._attempts.get(key, {}).items():
+            attempts[:] = [(timestamp, seq, ()) for timestamp, seq, _ in attempts]
+        self._seen.pop(key, None)
+
+    def get_seen_questions(self, name: str, quiz_type: str, max_questions: int = 100,
+                           recent_attempts: int = 5) -> List[str]:
+        """Question ids to avoid for a user's next quiz
+
+        Everything the user has seen in quiz types sharing an epic with
+        quiz_type (history_quiz_types), or only the questions of their last
+        few attempts there once that would exceed max_questions.
+        """
+        key = username_key(name)
+        user_seen = self._seen.get(key, {})
+        quiz_types = [related for related in history_quiz_types(quiz_type) if user_seen.get(related)]
+        seen = set().union(*(user_seen[related] for related in quiz_types))
+        if not seen:
+            return []
+        if len(seen) <= max_questions:
+            return list(seen)
+
+        recent = set()
+        attempts = list(heapq.merge(*(self._attempts[key][related] for related in quiz_types)))
+        for _, _, questions_used in attempts[-recent_attempts:]:
+            recent.update(questions_used)
+        return list(recent)
+
+
+class BestScoreTable:
+    """Best attempt per (player, quiz type, quiz format), kept sorted for top-K reads
+
+    Formats rank separately, so a 5-question sprint doesn't outrank full
+    quizzes; records from before quiz formats count as "standard".
+
+    Entries are ordered by (percentage, timestamp) ascending in a SortedList,
+    so the best scores sit at the end, and a new personal best or a removal
+    costs O(log n) instead of shifting a Python list.
+    """
+
+    LEADERBOARD_FIELDS = ("name", "quiz_type", "quiz_format", "score", "total", "percentage", "language", "timestamp")
+
+    def __init__(self):
+        self._ranked = SortedList()
+        # (name, quiz_type, quiz_format) -> its entry in _ranked
+        self._best: Dict[Tuple[str, str, str], Tuple[float, str, int, Dict]] = {}
+        # username key -> (name, quiz_type, quiz_format) keys, for admin removals
+        self._by_user: Dict[str, set] = {}
+        self._seq = itertools.count()
+
+    def clear(self):
+        self._ranked.clear()
+        self._best.clear()
+        self._by_user.clear()
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def _remove_entry(self, entry):
+        self._ranked.remove(entry)
+
+    def add(self, record: Dict):
+        quiz_format = record.get("quiz_format") or "standard"
+        pair = (record.get("name", ""), record.get("quiz_type"), quiz_format)
+        percentage = record.get("percentage", 0)
+        current = self._best.get(pair)
+        # Strictly better only, so the earliest best attempt is kept
+        if current is not None and percentage <= current[0]:
+            return
+
+        if current is not None:
+            self._remove_entry(current)
+        row = {field: record.get(field) for field in self.LEADERBOARD_FIELDS}
+        row["quiz_format"] = quiz_format
+        entry = (percentage, record.get("timestamp") or "", next(self._seq), row)
+        self._ranked.add(entry)
+        self._best[pair] = entry
+        self._by_user.setdefault(username_key(pair[0]), set()).add(pair)
+
+    def remove_user(self, name: str):
+        for pair in self._by_user.pop(username_key(name), ()):
+            self._remove_entry(self._best.pop(pair))
+
+    def top(self, limit: int) -> List[Dict]:
+        """Best rows, highest percentage (then most recent) first"""
+        if limit <= 0:
+            return []
+        return [entry[3] for entry in self._ranked.islice(-limit, reverse=True)]
+
+
+class HyperLogLog:
+    """Fixed-size distinct-count sketch (about 3% error with 1024 registers)"""
+
+    def __init__(self, precision: int = 10):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value: str):
+        digest = int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+        register = digest >> (64 - self.precision)
+        remaining = digest & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+        if rank > self.registers[register]:
+            self.registers[register] = rank
+
+    def merge(self, other: "HyperLogLog"):
+        self.registers = bytearray(max(a, b) for a, b in zip(self.registers, other.registers))
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # small-range correction
+        return int(round(estimate))
+
+
+class AnalyticsAggregates:
+    """Admin dashboard counters maintained on every score write"""
+
+    SCORE_BUCKETS = ("0-20%", "21-40%", "41-60%", "61-80%", "81-100%")
+    RECENT_LIMIT = 10
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.total_attempts = 0
+        self.percentage_sum = 0.0
+        self.quiz_type_counts: Dict[str, int] = {}
+        self.bucket_counts = [0] * len(self.SCORE_BUCKETS)
+        # Per-user contributions, so an admin removal can be subtracted
+        self._per_user: Dict[str, Dict] = {}
+        # Day (YYYY-MM-DD) -> distinct user sketch
+        self.daily_users: Dict[str, HyperLogLog] = {}
+        self.sketches_stale = False
+        self.recent = collections.deque(maxlen=self.RECENT_LIMIT)
+
+    @staticmethod
+    def bucket_for(percentage: float) -> int:
+        if percentage <= 20:
+            return 0
+        elif percentage <= 40:
+            return 1
+        elif percentage <= 60:
+            return 2
+        elif percentage <= 80:
+            return 3
+        return 4
+
+    def add(self, record: Dict):
+        key = username_key(record.get("name", ""))
+        quiz_type = record.get("quiz_type", "Unknown")
+        percentage = record.get("percentage", 0)
+        bucket = self.bucket_for(percentage)
+
+        self.total_attempts += 1
+        self.percentage_sum += percentage
+        self.quiz_type_counts[quiz_type] = self.quiz_type_counts.get(quiz_type, 0) + 1
+        self.bucket_counts[bucket] += 1
+
+        user = self._per_user.setdefault(key, {"attempts": 0, "percentage_sum": 0.0,
+                                               "quiz_types": {}, "buckets": [0] * len(self.SCORE_BUCKETS)})
+        user["attempts"] += 1
+        user["percentage_sum"] += percentage
+        user["quiz_types"][quiz_type] = user["quiz_types"].get(quiz_type, 0) + 1
+        user["buckets"][bucket] += 1
+
+        day = (record.get("timestamp") or "")[:10]
+        if day:
+            self.daily_users.setdefault(day, HyperLogLog()).add(key)
+
+        recent_row = {field: record.get(field) for field in BestScoreTable.LEADERBOARD_FIELDS}
+        if not self.recent or (recent_row["timestamp"] or "") >= (self.recent[-1]["timestamp"] or ""):
+            self.recent.append(recent_row)
+        else:
+            ordered = sorted(list(self.recent) + [recent_row], key=lambda row: row["timestamp"] or "")
+            self.recent = collections.deque(ordered[-self.RECENT_LIMIT:], maxlen=self.RECENT_LIMIT)
+
+    def remove_user(self, name: str):
+        key = username_key(name)
+        user = self._per_user.pop(key, None)
+        if user is None:
+            return
+        self.total_attempts -= user["attempts"]
+        self.percentage_sum -= user["percentage_sum"]
+        for quiz_type, count in user["quiz_types"].items():
+            self.quiz_type_counts[quiz_type] -= count
+            if not self.quiz_type_counts[quiz_type]:
+                del self.quiz_type_counts[quiz_type]
+        for bucket, count in enumerate(user["buckets"]):
+            self.bucket_counts[bucket] -= count
+        self.recent = collections.deque(
+            (row for row in self.recent if username_key(row["name"] or "") != key), maxlen=self.RECENT_LIMIT
+        )
+        # Sketches can't forget a member; they are rebuilt on next read
+        self.sketches_stale = True
+
+    def average_percentage(self) -> float:
+        return self.percentage_sum / self.total_attempts if self.total_attempts else 0.0
+
+    def score_distribution(self) -> Dict[str, int]:
+        return dict(zip(self.SCORE_BUCKETS, self.bucket_counts))
+
+    def active_users(self, days: int = 30, today: Optional[datetime.date] = None) -> int:
+        """Estimated distinct users over the last `days` days"""
+        today = today or datetime.date.today()
+        merged = HyperLogLog()
+        for offset in range(days):
+            sketch = self.daily_users.get((today - datetime.timedelta(days=offset)).isoformat())
+            if sketch is not None:
+                merged.merge(sketch)
+        return merged.count()
+
+
+class ScoreIndexes:
+    """Holder that builds every score index lazily from one storage scan"""
+
+    def __init__(self, source: Callable[[], Iterable[Dict]],
+                 replay: Optional[Callable[[Dict, List[str]], Optional[List[str]]]] = None):
+        self._source = source
+        self._lock = threading.RLock()
+        self._built = False
+        self.attempts = AttemptIndex(replay)
+        self.leaderboard = BestScoreTable()
+        self.analytics = AnalyticsAggregates()
+
+    def _indexes(self) -> Iterator:
+        yield self.attempts
+        yield self.leaderboard
+        yield self.analytics
+
+    def _ensure_built(self):
+        if self._built and self.analytics.sketches_stale:
+            # Only the analytics sketches need a rescan after a removal
+            self.analytics.clear()
+            for record in self._source():
+                self.analytics.add(record)
+        if self._built:
+            return
+        for index in self._indexes():
+            index.clear()
+        for record in self._source():
+            for index in self._indexes():
+                index.add(record)
+        self._built = True
+
+    def invalidate(self):
+        """Rebuild from storage on next use"""
+        with self._lock:
+            self._built = False
+
+    # Write paths
+    def add_score(self, record: Dict):
+        with self._lock:
+            if self._built:
+                for index in self._indexes():
+                    index.add(record)
+
+    def remove_user(self, name: str):
+        with self._lock:
+            if self._built:
+                for index in self._indexes():
+                    index.remove_user(name)
+
+    def clear_history(self, name: str):
+        with self._lock:
+            if self._built:
+                self.attempts.clear_history(name)
+
+    def clear(self):
+        with self._lock:
+            for index in self._indexes():
+                index.clear()
+            self._built = True
+
+    # Read paths
+    def get_seen_questions(self, name: str, quiz_type: str, max_questions: int = 100,
+                           recent_attempts: int = 5) -> List[str]:
+        with self._lock:
+            self._ensure_built()
+            return self.attempts.get_seen_questions(name, quiz_type, max_questions, recent_attempts)
+
+    def get_leaderboard(self, limit: int = 20) -> List[Dict]:
+        """Best attempt per player and quiz type, best first"""
+        with self._lock:
+            self._ensure_built()
+            return self.leaderboard.top(limit)
+
+    def get_analytics_summary(self, active_days: int = 30) -> Dict:
+        """Snapshot of the admin dashboard figures"""
+        with self._lock:
+            self._ensure_built()
+            analytics = self.analytics
+            return {
+                "total_attempts": analytics.total_attempts,
+                "average_percentage": analytics.average_percentage(),
+                "quiz_type_counts": dict(analytics.quiz_type_counts),
+                "score_distribution": analytics.score_distribution(),
+                "active_users": analytics.active_users(active_days),
+                "active_days": active_days,
+                "recent": list(reversed(analytics.recent))
+            }
+
+
+_score_indexes: Optional[ScoreIndexes] = None
+_score_indexes_lock = threading.Lock()
+
+
+def get_score_indexes() -> ScoreIndexes:
+    """Process-wide score indexes shared by all sessions"""
+    global _score_indexes
+    with _score_indexes_lock:
+        if _score_indexes is None:
+            _score_indexes = ScoreIndexes(lambda: get_storage().iter_scores(), replay_quiz)
+        return _score_indexes
@@ -0,0 +1,275 @@
+# Append-only score log - one JSON record per line
+#
+# Saving a score is a single buffered append instead of rewriting the whole
+# quiz_scores.json array. Records carrying an attempt_id are appended once:
+# the IDs already in the log are kept in a set, read on the first append
+# that needs it. Deletions are written as tombstone records and a
+# background compaction step drops the dead records later. A line torn by a
+# crash mid-append is skipped when reading and dropped by compaction.
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, Optional
+
+SCORES_LOG_FILE = "quiz_scores.jsonl"
+LEGACY_SCORES_FILE = "quiz_scores.json"
+
+# Tombstone operations
+OP_CLEAR_ALL = "clear_all"            # drop every earlier score
+OP_DELETE_USER = "delete_user"        # drop every earlier score of one user
+OP_CLEAR_HISTORY = "clear_history"    # forget questions_used of one user
+
+# Fields recording which questions an attempt used: the ID list, or the
+# seed, bank version, exclusion hash and format a seeded quiz is replayed from
+HISTORY_FIELDS = ("questions_used", "quiz_seed", "bank_version", "exclusion_hash", "draw_version")
+
+
+def _is_tombstone(line: str) -> bool:
+    # Tombstones always start with the "_op" key, so no parsing is needed
+    return line.startswith('{"_op"')
+
+
+class ScoreLog:
+    """Newline-delimited JSON score log with tombstones and compaction"""
+
+    def __init__(self, path: str = SCORES_LOG_FILE, legacy_path: Optional[str] = LEGACY_SCORES_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._lock = threading.RLock()
+        self._compact_thread = None
+        self._tombstones_since_compact = 0
+        # attempt_id of every record appended so far; None until first needed
+        self._attempt_ids = None
+        # Whether a line torn by an earlier crash has been terminated
+        self._tail_checked = False
+        self.migrate_legacy()
+
+    # Migration
+    def migrate_legacy(self) -> bool:
+        """Convert the old JSON array file into the log (one-time)"""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return False
+        with self._lock:
+            if os.path.exists(self.path):
+                return False
+            try:
+                with open(self.legacy_path, "r", encoding="utf-8") as f:
+                    scores = json.load(f)
+            except (OSError, ValueError):
+                return False
+            if not isinstance(scores, list):
+                return False
+
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for score in scores:
+                    f.write(self._encode(score))
+            os.replace(tmp_path, self.path)
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+            return True
+
+    # Writing
+    @staticmethod
+    def _encode(record: Dict) -> str:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def append(self, record: Dict) -> bool:
+        """Append one score record; False (nothing written) if its attempt_id is already logged"""
+        line = self._encode(record)
+        attempt_id = record.get("attempt_id")
+        with self._lock:
+            if attempt_id is not None:
+                if self._attempt_ids is None:
+                    self._attempt_ids = self._scan_attempt_ids()
+                if attempt_id in self._attempt_ids:
+                    return False
+                self._attempt_ids.add(attempt_id)
+            if not self._tail_checked:
+                self._end_torn_line()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return True
+
+    def _scan_attempt_ids(self) -> set:
+        attempt_ids = set()
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in self._iter_lines(f, os.fstat(f.fileno()).st_size):
+                    if '"attempt_id"' in line:
+                        record = self._decode(line)
+                        if record is not None:
+                            attempt_ids.add(record.get("attempt_id"))
+        return attempt_ids
+
+    def _end_torn_line(self):
+        """Terminate a line torn by a crash, so the next record starts on a line of its own"""
+        self._tail_checked = True
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    def _append_tombstone(self, op: str, name: Optional[str] = None):
+        from storage import username_key  # storage imports this module
+        tombstone = {"_op": op}
+        if name is not None:
+            tombstone["name"] = username_key(name)
+        with self._lock:
+            if not self._tail_checked:
+                self._end_torn_line()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(self._encode(tombstone))
+            self._tombstones_since_compact += 1
+        self.compact_async()
+
+    def clear_all(self):
+        """Remove every score"""
+        self._append_tombstone(OP_CLEAR_ALL)
+
+    def delete_user(self, name: str):
+        """Remove all scores of a user"""
+        self._append_tombstone(OP_DELETE_USER, name)
+
+    def clear_history(self, name: str):
+        """Drop the question history (HISTORY_FIELDS) from all scores of a user"""
+        self._append_tombstone(OP_CLEAR_HISTORY, name)
+
+    # Reading
+    @staticmethod
+    def _decode(line: str) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None  # A line torn by a crash mid-append
+
+    def _iter_lines(self, f, end: int) -> Iterator[str]:
+        # Binary mode keeps byte offsets exact for the compaction cut-off
+        f.seek(0)
+        position = 0
+        for raw in f:
+            position += len(raw)
+            if position > end:
+                break
+            if raw.strip():
+                yield raw.decode("utf-8", errors="replace")
+
+    def _iter_live(self, end: Optional[int] = None) -> Iterator[Dict]:
+        """Live records up to byte offset `end` (default: the size when reading starts)
+
+        Both passes read the same open file, so a concurrent append or
+        compaction swap can't make them disagree.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            if end is None:
+                end = os.fstat(f.fileno()).st_size
+            yield from self._live_records(f, end)
+
+    def _live_records(self, f, end: int) -> Iterator[Dict]:
+        from storage import username_key  # storage imports this module
+        # Latest tombstone line per target (by username_key, as the storage
+        # indexes match names), so each record needs O(1) checks
+        last_clear_all = -1
+        deleted: Dict[str, int] = {}
+        cleared: Dict[str, int] = {}
+        for line_no, line in enumerate(self._iter_lines(f, end)):
+            if not _is_tombstone(line):
+                continue
+            record = self._decode(line)
+            if record is None:
+                continue
+            op, name = record["_op"], record.get("name")
+            if name is not None:
+                name = username_key(name)  # Older tombstones hold lower() names
+            if op == OP_CLEAR_ALL:
+                last_clear_all = line_no
+            elif op == OP_DELETE_USER:
+                deleted[name] = line_no
+            elif op == OP_CLEAR_HISTORY:
+                cleared[name] = line_no
+
+        for line_no, line in enumerate(self._iter_lines(f, end)):
+            if line_no <= last_clear_all or _is_tombstone(line):
+                continue
+            record = self._decode(line)
+            if record is None:
+                continue
+            name = username_key(record.get("name", ""))
+            if deleted.get(name, -1) > line_no:
+                continue
+            if cleared.get(name, -1) > line_no:
+                for field in HISTORY_FIELDS:
+                    record.pop(field, None)
+            yield record
+
+    def iter_scores(self) -> Iterator[Dict]:
+        """Stream live score records in insertion order"""
+        return self._iter_live()
+
+    def remap_questions_used(self, mapping: Dict[str, str]) -> int:
+        """Rewrite questions_used IDs through `mapping`; returns records changed"""
+        changed = 0
+        compact_thread = self._compact_thread
+        if compact_thread is not None:
+            compact_thread.join()  # Its file swap must not overwrite ours
+        with self._lock:
+            if not os.path.exists(self.path):
+                return 0
+            tmp_path = self.path + ".remap"
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                for record in self._iter_live():
+                    questions_used = record.get("questions_used")
+                    if questions_used and any(qid in mapping for qid in questions_used):
+                        record["questions_used"] = [mapping.get(qid, qid) for qid in questions_used]
+                        changed += 1
+                    out.write(self._encode(record))
+            os.replace(tmp_path, self.path)
+            self._tombstones_since_compact = 0
+        return changed
+
+    # Compaction
+    def compact(self):
+        """Rewrite the log without tombstones or the records they remove"""
+        # Deletions appended while a pass runs are only copied; pass again for them
+        while self._compact_once():
+            pass
+
+    def _compact_once(self) -> bool:
+        """One compaction pass; True if tombstones were appended meanwhile"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return False
+            end = os.path.getsize(self.path)
+            self._tombstones_since_compact = 0
+
+        # The bulk of the rewrite happens without holding the lock
+        tmp_path = self.path + ".compact"
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            for record in self._iter_live(end):
+                out.write(self._encode(record))
+
+        # Copy whatever was appended meanwhile, then swap files atomically
+        with self._lock:
+            with open(self.path, "rb") as src:
+                src.seek(end)
+                tail = src.read().decode("utf-8", errors="replace")
+            raced = any(_is_tombstone(line) for line in tail.splitlines())
+            if tail:
+                with open(tmp_path, "a", encoding="utf-8") as out:
+                    out.write(tail)
+            os.replace(tmp_path, self.path)
+            return raced
+
+    def compact_async(self, force: bool = False):
+        """Run compaction on a background thread when it is worthwhile"""
+        with self._lock:
+            if not force and self._tombstones_since_compact == 0:
+                return
+            if self._compact_thread is not None and self._compact_thread.is_alive():
+                return
+            self._compact_thread = threading.Thread(target=self.compact, name="score-log-compaction", daemon=True)
+            self._compact_thread.start()
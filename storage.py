@@ -0,0 +1,615 @@
+# Storage backends for user profiles and quiz scores
+#
+# The app talks to a StorageBackend instead of reading and writing the data
+# files directly. Three implementations are available:
+#   - SQLiteStorage: one database in WAL mode, row-level writes (default)
+#   - JsonStorage:   legacy user_profiles.json + append-only score log
+#   - ShardedJsonStorage: profiles hashed into user_profiles/shard_NN.json
+# Select one with the EPIC_QUIZ_STORAGE environment variable
+# ("sqlite"/"json"/"sharded").
+
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from score_log import ScoreLog, SCORES_LOG_FILE, LEGACY_SCORES_FILE
+from write_behind import ProfileWriteBehind
+
+USERS_FILE = "user_profiles.json"
+USERS_SHARD_DIR = "user_profiles"
+DATABASE_FILE = "epic_quiz.db"
+
+
+def username_key(username: str) -> str:
+    """Case-folded form used for all username lookups"""
+    return username.casefold()
+
+
+class StorageBackend:
+    """Interface shared by all storage backends"""
+
+    # User profiles
+    def load_users(self) -> Dict[str, Dict]:
+        """Return all profiles keyed by their stored username"""
+        raise NotImplementedError
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        """Return a profile, matching the username case-insensitively"""
+        raise NotImplementedError
+
+    def create_user(self, username: str, data: Dict) -> bool:
+        """Store a new profile; False if the username is already taken"""
+        raise NotImplementedError
+
+    def save_user(self, username: str, data: Dict):
+        """Insert or replace a profile"""
+        raise NotImplementedError
+
+    def delete_user(self, username: str) -> bool:
+        """Remove a profile; False if it did not exist"""
+        raise NotImplementedError
+
+    # Quiz scores
+    def iter_scores(self) -> Iterator[Dict]:
+        """Stream every score record in insertion order"""
+        raise NotImplementedError
+
+    def add_score(self, record: Dict) -> bool:
+        """Store a score; False if a record with its attempt_id is already stored"""
+        raise NotImplementedError
+
+    def get_user_scores(self, name: str, quiz_type: str) -> List[Dict]:
+        """All scores of one user for one quiz type"""
+        raise NotImplementedError
+
+    def clear_user_history(self, name: str):
+        """Forget which questions a user has already seen"""
+        raise NotImplementedError
+
+    def delete_user_scores(self, name: str):
+        raise NotImplementedError
+
+    def clear_scores(self):
+        raise NotImplementedError
+
+    def remap_questions_used(self, mapping: Dict[str, str]) -> int:
+        """Replace old question IDs in questions_used; returns records changed"""
+        raise NotImplementedError
+
+    def reset(self):
+        """Remove all profiles and scores"""
+        raise NotImplementedError
+
+    def flush(self):
+        """Make sure every accepted write has reached disk"""
+        pass
+
+    def invalidate(self):
+        """Drop in-memory caches so the next read comes from disk"""
+        self.flush()
+
+
+def _flush_settings(flush_interval: Optional[float], flush_batch_size: Optional[int]) -> Tuple[float, int]:
+    if flush_interval is None:
+        flush_interval = float(os.environ.get("EPIC_QUIZ_FLUSH_INTERVAL", "2.0"))
+    if flush_batch_size is None:
+        flush_batch_size = int(os.environ.get("EPIC_QUIZ_FLUSH_BATCH", "50"))
+    return flush_interval, flush_batch_size
+
+
+class ScoreLogStorage(StorageBackend):
+    """Base of the JSON backends: scores in the append-only log, profiles
+    persisted by a write-behind thread (set up by the subclass)"""
+
+    def __init__(self, writer: ProfileWriteBehind, scores_path: str = SCORES_LOG_FILE,
+                 legacy_scores_path: Optional[str] = LEGACY_SCORES_FILE):
+        self.writer = writer
+        self.score_log = ScoreLog(scores_path, legacy_scores_path)
+        self._lock = threading.RLock()
+
+    def iter_scores(self) -> Iterator[Dict]:
+        return self.score_log.iter_scores()
+
+    def add_score(self, record: Dict) -> bool:
+        return self.score_log.append(record)
+
+    def get_user_scores(self, name: str, quiz_type: str) -> List[Dict]:
+        key = username_key(name)
+        return [s for s in self.score_log.iter_scores()
+                if username_key(s.get("name", "")) == key and s.get("quiz_type") == quiz_type]
+
+    def clear_user_history(self, name: str):
+        self.score_log.clear_history(name)
+
+    def delete_user_scores(self, name: str):
+        self.score_log.delete_user(name)
+
+    def clear_scores(self):
+        self.score_log.clear_all()
+
+    def remap_questions_used(self, mapping: Dict[str, str]) -> int:
+        return self.score_log.remap_questions_used(mapping)
+
+    def flush(self):
+        self.writer.flush()
+
+
+class JsonStorage(ScoreLogStorage):
+    """Legacy backend: user_profiles.json plus the append-only score log
+
+    Profiles are served from memory; changes are persisted by a write-behind
+    thread that batches them into atomic rewrites of user_profiles.json.
+    """
+
+    def __init__(self, users_path: str = USERS_FILE, scores_path: str = SCORES_LOG_FILE,
+                 legacy_scores_path: Optional[str] = LEGACY_SCORES_FILE,
+                 flush_interval: Optional[float] = None, flush_batch_size: Optional[int] = None):
+        super().__init__(ProfileWriteBehind(users_path, *_flush_settings(flush_interval, flush_batch_size)),
+                         scores_path, legacy_scores_path)
+        self.users_path = users_path
+        self._users: Optional[Dict[str, Dict]] = None
+        # Case-folded username -> stored username, kept in step with _users
+        self._name_index: Optional[Dict[str, str]] = None
+
+    def _read_users(self) -> Dict[str, Dict]:
+        with self._lock:
+            if self._users is None:
+                self._users = {}
+                if os.path.exists(self.users_path):
+                    with open(self.users_path, "r", encoding="utf-8") as f:
+                        self._users = json.load(f)
+                self._name_index = None
+            return self._users
+
+    def _get_name_index(self) -> Dict[str, str]:
+        with self._lock:
+            users = self._read_users()
+            if self._name_index is None:
+                self._name_index = {username_key(stored_username): stored_username for stored_username in users}
+            return self._name_index
+
+    def _find_key(self, users: Dict[str, Dict], username: str) -> Optional[str]:
+        return self._get_name_index().get(username_key(username))
+
+    def invalidate(self):
+        """Drop the in-memory profiles and index; they reload from disk on next use"""
+        self.writer.flush()
+        with self._lock:
+            self._users = None
+            self._name_index = None
+
+    def load_users(self) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self._read_users())
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        users = self._read_users()
+        stored_username = self._find_key(users, username)
+        return users[stored_username] if stored_username is not None else None
+
+    def create_user(self, username: str, data: Dict) -> bool:
+        with self._lock:
+            users = self._read_users()
+            if self._find_key(users, username) is not None:
+                return False
+            users[username] = data
+            self._get_name_index()[username_key(username)] = username
+            self.writer.put(username, data)
+            return True
+
+    def save_user(self, username: str, data: Dict):
+        with self._lock:
+            users = self._read_users()
+            if username not in users:
+                self._get_name_index()[username_key(username)] = username
+            users[username] = data
+            self.writer.put(username, data)
+
+    def delete_user(self, username: str) -> bool:
+        with self._lock:
+            users = self._read_users()
+            stored_username = self._find_key(users, username)
+            if stored_username is None:
+                return False
+            del users[stored_username]
+            del self._get_name_index()[username_key(stored_username)]
+            self.writer.delete(stored_username)
+            return True
+
+    def reset(self):
+        with self._lock:
+            for username in self._read_users():
+                self.writer.delete(username)
+            self._users = {}
+            self._name_index = {}
+        self.writer.flush()
+        self.score_log.clear_all()
+
+class ShardedJsonStorage(ScoreLogStorage):
+    """Profiles spread over N shard files by hash of the case-folded username
+
+    A profile change only rewrites its own shard, and shards are loaded on
+    first use, so single-user operations never touch the other profiles.
+    Scores use the same append-only log as JsonStorage (ScoreLogStorage).
+    """
+
+    DEFAULT_SHARD_COUNT = 64
+
+    def __init__(self, directory: str = USERS_SHARD_DIR, shard_count: Optional[int] = None,
+                 legacy_users_path: Optional[str] = USERS_FILE, scores_path: str = SCORES_LOG_FILE,
+                 legacy_scores_path: Optional[str] = LEGACY_SCORES_FILE,
+                 flush_interval: Optional[float] = None, flush_batch_size: Optional[int] = None):
+        super().__init__(ProfileWriteBehind(directory, *_flush_settings(flush_interval, flush_batch_size),
+                                            path_for=lambda username: self.shard_path(self.shard_of(username))),
+                         scores_path, legacy_scores_path)
+        self.directory = directory
+        self.legacy_users_path = legacy_users_path
+        # shard number -> {stored username: profile} / {username key: stored username}
+        self._shards: Dict[int, Dict[str, Dict]] = {}
+        self._shard_indexes: Dict[int, Dict[str, str]] = {}
+        self.shard_count = self._load_shard_count(shard_count)
+        self.migrate_legacy()
+
+    # Layout
+    def _load_shard_count(self, shard_count: Optional[int]) -> int:
+        # The shard count is fixed once written, otherwise users would move shards
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)["shard_count"]
+        shard_count = shard_count or int(os.environ.get("EPIC_QUIZ_SHARDS", self.DEFAULT_SHARD_COUNT))
+        os.makedirs(self.directory, exist_ok=True)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"shard_count": shard_count}, f)
+        return shard_count
+
+    def shard_of(self, username: str) -> int:
+        return zlib.crc32(username_key(username).encode("utf-8")) % self.shard_count
+
+    def shard_path(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard_{shard:03d}.json")
+
+    def _read_shard_file(self, shard: int) -> Dict[str, Dict]:
+        path = self.shard_path(shard)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _shard(self, shard: int) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        with self._lock:
+            if shard not in self._shards:
+                users = self._read_shard_file(shard)
+                self._shards[shard] = users
+                self._shard_indexes[shard] = {username_key(stored_username): stored_username
+                                              for stored_username in users}
+            return self._shards[shard], self._shard_indexes[shard]
+
+    # Migration
+    def migrate_legacy(self) -> bool:
+        """Split the monolithic user_profiles.json into shards (one-time)"""
+        if not self.legacy_users_path or not os.path.exists(self.legacy_users_path):
+            return False
+        with self._lock:
+            if any(os.path.exists(self.shard_path(shard)) for shard in range(self.shard_count)):
+                return False
+            with open(self.legacy_users_path, "r", encoding="utf-8") as f:
+                users = json.load(f)
+
+            shards: Dict[int, Dict[str, Dict]] = {}
+            for username, data in users.items():
+                shards.setdefault(self.shard_of(username), {})[username] = data
+            for shard, shard_users in shards.items():
+                tmp_path = self.shard_path(shard) + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(shard_users, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.shard_path(shard))
+            os.replace(self.legacy_users_path, self.legacy_users_path + ".migrated")
+            self._shards.clear()
+            self._shard_indexes.clear()
+            return True
+
+    # User profiles
+    def load_users(self) -> Dict[str, Dict]:
+        """All profiles, reading the shards in parallel"""
+        self.writer.flush()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            shard_contents = list(pool.map(self._read_shard_file, range(self.shard_count)))
+        users = {}
+        for shard_users in shard_contents:
+            users.update(shard_users)
+        return users
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        users, index = self._shard(self.shard_of(username))
+        stored_username = index.get(username_key(username))
+        return users[stored_username] if stored_username is not None else None
+
+    def create_user(self, username: str, data: Dict) -> bool:
+        with self._lock:
+            users, index = self._shard(self.shard_of(username))
+            if username_key(username) in index:
+                return False
+            users[username] = data
+            index[username_key(username)] = username
+            self.writer.put(username, data)
+            return True
+
+    def save_user(self, username: str, data: Dict):
+        with self._lock:
+            users, index = self._shard(self.shard_of(username))
+            index.setdefault(username_key(username), username)
+            users[username] = data
+            self.writer.put(username, data)
+
+    def delete_user(self, username: str) -> bool:
+        with self._lock:
+            users, index = self._shard(self.shard_of(username))
+            stored_username = index.pop(username_key(username), None)
+            if stored_username is None:
+                return False
+            del users[stored_username]
+            self.writer.delete(stored_username)
+            return True
+
+    def invalidate(self):
+        self.writer.flush()
+        with self._lock:
+            self._shards.clear()
+            self._shard_indexes.clear()
+
+    def reset(self):
+        self.writer.flush()
+        with self._lock:
+            for shard in range(self.shard_count):
+                if os.path.exists(self.shard_path(shard)):
+                    os.remove(self.shard_path(shard))
+            self._shards.clear()
+            self._shard_indexes.clear()
+        self.score_log.clear_all()
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite backend in WAL mode so concurrent sessions don't lose updates"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        username_key TEXT NOT NULL UNIQUE,
+        data TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS scores (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        name_key TEXT NOT NULL,
+        quiz_type TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        percentage REAL NOT NULL,
+        language TEXT,
+        timestamp TEXT,
+        questions_used TEXT,
+        quiz_seed INTEGER,
+        bank_version TEXT,
+        exclusion_hash TEXT,
+        quiz_format TEXT,
+        attempt_id TEXT,
+        draw_version TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_scores_user ON scores (name_key, quiz_type);
+    CREATE INDEX IF NOT EXISTS idx_scores_quiz_type ON scores (quiz_type);
+    CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores (timestamp);
+    """
+
+    SCORE_COLUMNS = ("name", "quiz_type", "score", "total", "percentage", "language", "timestamp")
+    # Seeded quiz columns; NULL when the record only lists questions_used
+    # (except quiz_format, which every attempt since quiz formats has)
+    QUIZ_COLUMNS = ("quiz_seed", "bank_version", "exclusion_hash", "quiz_format", "draw_version")
+    SELECT_SCORES = "SELECT {}, questions_used, {}, attempt_id FROM scores".format(
+        ", ".join(SCORE_COLUMNS), ", ".join(QUIZ_COLUMNS))
+    # Columns added after the first release, for ALTER TABLE on older databases
+    ADDED_COLUMNS = (("quiz_seed", "INTEGER"), ("bank_version", "TEXT"), ("exclusion_hash", "TEXT"),
+                     ("quiz_format", "TEXT"), ("attempt_id", "TEXT"), ("draw_version", "TEXT"))
+
+    def __init__(self, path: str = DATABASE_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(scores)")}
+            for column, column_type in self.ADDED_COLUMNS:
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE scores ADD COLUMN {column} {column_type}")
+            # One row per quiz attempt; rows without an attempt ID (NULL) are not constrained
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_scores_attempt ON scores (attempt_id)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit runs each session on its own thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # User profiles
+    def load_users(self) -> Dict[str, Dict]:
+        rows = self._connect().execute("SELECT username, data FROM users ORDER BY rowid")
+        return {row["username"]: json.loads(row["data"]) for row in rows}
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT data FROM users WHERE username_key = ?", (username_key(username),)
+        ).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def create_user(self, username: str, data: Dict) -> bool:
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO users (username, username_key, data) VALUES (?, ?, ?)",
+                    (username, username_key(username), json.dumps(data, ensure_ascii=False))
+                )
+            return True
+        except sqlite3.IntegrityError:
+            return False  # User already exists
+
+    def save_user(self, username: str, data: Dict):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO users (username, username_key, data) VALUES (?, ?, ?) "
+                "ON CONFLICT(username_key) DO UPDATE SET data = excluded.data",
+                (username, username_key(username), json.dumps(data, ensure_ascii=False))
+            )
+
+    def delete_user(self, username: str) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM users WHERE username_key = ?", (username_key(username),))
+        return cursor.rowcount > 0
+
+    # Quiz scores
+    @classmethod
+    def _row_to_score(cls, row: sqlite3.Row) -> Dict:
+        score = {column: row[column] for column in cls.SCORE_COLUMNS}
+        if row["questions_used"] is not None:
+            score["questions_used"] = json.loads(row["questions_used"])
+        if row["quiz_seed"] is not None:
+            score.update((column, row[column]) for column in cls.QUIZ_COLUMNS if row[column] is not None)
+        elif row["quiz_format"] is not None:
+            score["quiz_format"] = row["quiz_format"]
+        if row["attempt_id"] is not None:
+            score["attempt_id"] = row["attempt_id"]
+        return score
+
+    def iter_scores(self) -> Iterator[Dict]:
+        cursor = self._connect().execute(self.SELECT_SCORES + " ORDER BY id")
+        for row in cursor:
+            yield self._row_to_score(row)
+
+    def add_score(self, record: Dict) -> bool:
+        return self.add_scores([record]) == 1
+
+    def add_scores(self, records: List[Dict]) -> int:
+        """Insert score records; returns how many were new (attempt IDs already stored are skipped)"""
+        rows = []
+        for record in records:
+            questions_used = record.get("questions_used")
+            rows.append((
+                record["name"], username_key(record["name"]), record["quiz_type"],
+                record["score"], record["total"], record["percentage"],
+                record.get("language"), record.get("timestamp"),
+                json.dumps(questions_used) if questions_used is not None else None,
+                record.get("quiz_seed"), record.get("bank_version"), record.get("exclusion_hash"),
+                record.get("quiz_format"), record.get("attempt_id"), record.get("draw_version")
+            ))
+        with self._connect() as conn:
+            cursor = conn.executemany(
+                "INSERT INTO scores (name, name_key, quiz_type, score, total, percentage, language, timestamp, "
+                "questions_used, quiz_seed, bank_version, exclusion_hash, quiz_format, attempt_id, draw_version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                rows
+            )
+        return cursor.rowcount
+
+    def get_user_scores(self, name: str, quiz_type: str) -> List[Dict]:
+        cursor = self._connect().execute(
+            self.SELECT_SCORES + " WHERE name_key = ? AND quiz_type = ? ORDER BY id",
+            (username_key(name), quiz_type)
+        )
+        return [self._row_to_score(row) for row in cursor]
+
+    def clear_user_history(self, name: str):
+        with self._connect() as conn:
+            conn.execute("UPDATE scores SET questions_used = NULL, quiz_seed = NULL, bank_version = NULL, "
+                         "exclusion_hash = NULL, draw_version = NULL WHERE name_key = ?", (username_key(name),))
+
+    def delete_user_scores(self, name: str):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scores WHERE name_key = ?", (username_key(name),))
+
+    def clear_scores(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scores")
+
+    def remap_questions_used(self, mapping: Dict[str, str]) -> int:
+        conn = self._connect()
+        updates = []
+        for row in conn.execute("SELECT id, questions_used FROM scores WHERE questions_used IS NOT NULL"):
+            questions_used = json.loads(row["questions_used"])
+            if any(qid in mapping for qid in questions_used):
+                updates.append((json.dumps([mapping.get(qid, qid) for qid in questions_used]), row["id"]))
+        with conn:
+            conn.executemany("UPDATE scores SET questions_used = ? WHERE id = ?", updates)
+        return len(updates)
+
+    def reset(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM scores")
+            conn.execute("DELETE FROM users")
+
+
+def import_json_into_sqlite(target: SQLiteStorage, users_path: str = USERS_FILE,
+                            scores_path: str = SCORES_LOG_FILE,
+                            legacy_scores_path: Optional[str] = LEGACY_SCORES_FILE) -> Dict[str, int]:
+    """Copy profiles and scores from the JSON files into a SQLite database"""
+    source = JsonStorage(users_path, scores_path, legacy_scores_path)
+
+    users_imported = 0
+    for username, data in source.load_users().items():
+        if target.create_user(username, data):
+            users_imported += 1
+
+    scores_imported = 0
+    if target._connect().execute("SELECT 1 FROM scores LIMIT 1").fetchone():
+        # Scores have no natural key, so never import them twice
+        return {"users": users_imported, "scores": scores_imported}
+
+    batch = []
+    for record in source.iter_scores():
+        batch.append(record)
+        if len(batch) >= 1000:
+            # Rows whose attempt_id is already stored are skipped, not counted
+            scores_imported += target.add_scores(batch)
+            batch = []
+    if batch:
+        scores_imported += target.add_scores(batch)
+
+    return {"users": users_imported, "scores": scores_imported}
+
+
+def create_storage(backend: Optional[str] = None) -> StorageBackend:
+    """Build the backend named by EPIC_QUIZ_STORAGE (default: sqlite)"""
+    backend = (backend or os.environ.get("EPIC_QUIZ_STORAGE", "sqlite")).lower()
+    if backend == "json":
+        return JsonStorage()
+    if backend == "sharded":
+        return ShardedJsonStorage()
+    if backend == "sqlite":
+        db_path = os.environ.get("EPIC_QUIZ_DB", DATABASE_FILE)
+        is_new = not os.path.exists(db_path)
+        storage = SQLiteStorage(db_path)
+        if is_new and (os.path.exists(USERS_FILE) or os.path.exists(SCORES_LOG_FILE)
+                       or os.path.exists(LEGACY_SCORES_FILE)):
+            # Fresh database: bring over the data from the JSON files once
+            import_json_into_sqlite(storage)
+        return storage
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend shared by all sessions"""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = create_storage()
+        return _storage
@@ -0,0 +1,505 @@
+# Theme stylesheets
+#
+# The app's stylesheet depends only on (theme, font size, high contrast), so
+# every combination is rendered once per process and written to static/css/
+# under a content-hashed name. With Streamlit's static file serving a rerun
+# then sends just a <link> to that file, which browsers cache (the name
+# changes whenever the content does); otherwise the cached CSS is inlined.
+
+import hashlib
+import importlib.util
+import itertools
+import os
+from functools import lru_cache
+from typing import Dict, Tuple
+
+STATIC_CSS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "css")
+# URL of static/ when served by `streamlit run` with server.enableStaticServing
+STATIC_CSS_URL = "app/static/css"
+
+# Older, Tornado-based Streamlit servers send .css app files as text/plain
+# with nosniff, which browsers refuse to apply
+STATIC_CSS_SERVED = importlib.util.find_spec("streamlit.web.server.starlette") is not None
+
+FONT_SIZES = {
+    'small': {'base': '14px', 'h1': '1.8rem', 'h2': '1.5rem', 'h3': '1.3rem'},
+    'medium': {'base': '16px', 'h1': '2.2rem', 'h2': '1.8rem', 'h3': '1.5rem'},
+    'large': {'base': '18px', 'h1': '2.5rem', 'h2': '2rem', 'h3': '1.7rem'},
+    'extra-large': {'base': '20px', 'h1': '2.8rem', 'h2': '2.3rem', 'h3': '2rem'}
+}
+
+THEMES = {
+    'default': {
+        'primary': '#667eea',
+        'secondary': '#764ba2',
+        'accent': '#f093fb',
+        'background': '#ffffff',
+        'surface': '#f8f9fa',
+        'text': '#2c3e50',
+        'text_secondary': '#7f8c8d'
+    },
+    'dark': {
+        'primary': '#4a90e2',
+        'secondary': '#5a67d8',
+        'accent': '#ed64a6',
+        'background': '#1a202c',
+        'surface': '#2d3748',
+        'text': '#f7fafc',
+        'text_secondary': '#a0aec0'
+    },
+    'temple': {
+        'primary': '#d4af37',
+        'secondary': '#b8860b',
+        'accent': '#ff6b35',
+        'background': '#fdf6e3',
+        'surface': '#f4e4bc',
+        'text': '#8b4513',
+        'text_secondary': '#a0522d'
+    },
+    'forest': {
+        'primary': '#2d5016',
+        'secondary': '#3e6b1f',
+        'accent': '#7cb342',
+        'background': '#f1f8e9',
+        'surface': '#e8f5e8',
+        'text': '#1b5e20',
+        'text_secondary': '#388e3c'
+    }
+}
+
+# Layout styling shared by every theme
+BASE_CSS = """
+/* Base app styling */
+.stApp {
+    font-family: 'Source Sans Pro', sans-serif;
+}
+
+/* Keep toolbar visible but move content down 3cm */
+.main .block-container {
+    padding-top: 3cm !important;
+    max-width: 1200px;
+}
+
+/* Metric containers */
+[data-testid="metric-container"] {
+    background-color: #f8f9fa;
+    border: 1px solid #dee2e6;
+    padding: 1rem;
+    border-radius: 8px;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+}
+
+/* Button consistency */
+.stButton > button {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    border: none;
+    border-radius: 8px;
+    padding: 0.75rem 1.5rem;
+    font-weight: 600;
+    transition: all 0.3s ease;
+    width: 100%;
+}
+
+.stButton > button:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+}
+
+/* Success/Info boxes */
+.stSuccess, .stInfo, .stWarning, .stError {
+    border-radius: 8px;
+    padding: 1rem;
+}
+
+/* Form styling */
+.stForm {
+    border: 1px solid #dee2e6;
+    border-radius: 8px;
+    padding: 1.5rem;
+    background-color: #ffffff;
+    box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+}
+
+/* Radio button styling */
+.stRadio > div {
+    background-color: #f8f9fa;
+    padding: 0.5rem;
+    border-radius: 6px;
+    margin: 0.25rem 0;
+    border: 1px solid #dee2e6;
+}
+
+/* Sidebar consistency */
+.css-1d391kg {
+    background-color: #f8f9fa;
+    border-right: 1px solid #dee2e6;
+}
+
+/* Header styling */
+h1, h2, h3 {
+    color: #2c3e50;
+    font-weight: 600;
+}
+
+/* Progress bar */
+.stProgress > div > div {
+    background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
+    border-radius: 10px;
+}
+
+/* Keep Streamlit toolbar visible */
+.stApp > header {
+    display: block !important;
+}
+
+/* Ensure proper spacing from top toolbar */
+.stApp > div:first-child {
+    margin-top: 0 !important;
+}
+
+/* Compact tabs */
+.stTabs [data-baseweb="tab-list"] {
+    gap: 0;
+    margin-top: 0.5rem;
+}
+
+/* Compact form elements */
+.stTextInput > div > div > input {
+    padding: 0.5rem;
+}
+"""
+
+
+def theme_css(theme_name: str, font_size: str, accessibility_mode: bool) -> str:
+    """CSS of one theme / font size, with high contrast colors in accessibility mode"""
+    fs = FONT_SIZES[font_size]
+    theme = dict(THEMES.get(theme_name, THEMES['default']))
+    
+    # High contrast mode for accessibility
+    if accessibility_mode:
+        theme['text'] = '#000000'
+        theme['background'] = '#ffffff'
+        theme['surface'] = '#f0f0f0'
+    
+    return f"""
+/* Base styling */
+.stApp {{
+    background-color: {theme['background']};
+    color: {theme['text']};
+    font-size: {fs['base']};
+}}
+
+/* Headers */
+h1 {{ font-size: {fs['h1']} !important; color: {theme['primary']} !important; }}
+h2 {{ font-size: {fs['h2']} !important; color: {theme['secondary']} !important; }}
+h3 {{ font-size: {fs['h3']} !important; color: {theme['text']} !important; }}
+
+/* Enhanced score card */
+.score-card {{
+    background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
+    padding: 2rem;
+    border-radius: 20px;
+    color: white;
+    text-align: center;
+    box-shadow: 0 15px 35px rgba(0,0,0,0.3);
+    margin: 1.5rem 0;
+    animation: slideInUp 0.6s ease-out;
+    transform: translateY(0);
+}}
+
+.score-card h2 {{
+    margin: 0;
+    font-size: 2.8rem !important;
+    text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
+    animation: pulse 2s infinite;
+}}
+
+.score-card h3 {{
+    margin: 0.5rem 0;
+    font-size: 2.2rem !important;
+    color: #FFD700;
+    text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
+}}
+
+/* Achievement card */
+.achievement-card {{
+    background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
+    padding: 1.5rem;
+    border-radius: 15px;
+    color: white;
+    text-align: center;
+    margin: 1rem 0;
+    box-shadow: 0 10px 25px rgba(0,0,0,0.2);
+    animation: bounceIn 0.8s ease-out;
+}}
+
+/* User profile card */
+.profile-card {{
+    background: linear-gradient(135deg, {theme['surface']} 0%, {theme['background']} 100%);
+    padding: 1.5rem;
+    border-radius: 15px;
+    border: 2px solid {theme['primary']};
+    margin: 1rem 0;
+    box-shadow: 0 8px 20px rgba(0,0,0,0.1);
+}}
+
+/* XP Progress bar */
+.xp-progress {{
+    background: linear-gradient(90deg, {theme['primary']} 0%, {theme['accent']} 100%);
+    height: 20px;
+    border-radius: 10px;
+    margin: 0.5rem 0;
+    animation: progressFill 1s ease-out;
+}}
+
+/* Statistics container */
+.stats-container {{
+    background: linear-gradient(135deg, {theme['surface']} 0%, {theme['background']} 100%);
+    padding: 2rem;
+    border-radius: 20px;
+    margin: 1.5rem 0;
+    box-shadow: 0 10px 30px rgba(0,0,0,0.1);
+    border: 1px solid {theme['primary']};
+}}
+
+.stats-item {{
+    display: inline-block;
+    margin: 1rem;
+    text-align: center;
+    transition: transform 0.3s ease;
+}}
+
+.stats-item:hover {{
+    transform: scale(1.05);
+}}
+
+.stats-number {{
+    font-size: 2.5rem;
+    font-weight: bold;
+    color: {theme['primary']};
+    display: block;
+    text-shadow: 1px 1px 2px rgba(0,0,0,0.1);
+}}
+
+.stats-label {{
+    font-size: 1rem;
+    color: {theme['text_secondary']};
+    text-transform: uppercase;
+    letter-spacing: 1px;
+    margin-top: 0.5rem;
+}}
+
+/* Performance cards */
+.performance-excellent {{
+    background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
+    padding: 1.5rem;
+    border-radius: 15px;
+    color: white;
+    text-align: center;
+    margin: 1rem 0;
+    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
+    animation: slideInRight 0.6s ease-out;
+}}
+
+.performance-good {{
+    background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
+    padding: 1.5rem;
+    border-radius: 15px;
+    color: white;
+    text-align: center;
+    margin: 1rem 0;
+    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
+    animation: slideInRight 0.6s ease-out;
+}}
+
+.performance-improve {{
+    background: linear-gradient(135deg, {theme['accent']} 0%, #f5576c 100%);
+    padding: 1.5rem;
+    border-radius: 15px;
+    color: white;
+    text-align: center;
+    margin: 1rem 0;
+    box-shadow: 0 8px 25px rgba(0,0,0,0.2);
+    animation: slideInRight 0.6s ease-out;
+}}
+
+/* Buttons */
+.stButton > button {{
+    background: linear-gradient(135deg, {theme['primary']} 0%, {theme['secondary']} 100%);
+    color: white;
+    border: none;
+    border-radius: 10px;
+    padding: 0.75rem 1.5rem;
+    font-size: {fs['base']};
+    font-weight: 600;
+    transition: all 0.3s ease;
+    box-shadow: 0 4px 15px rgba(0,0,0,0.2);
+}}
+
+.stButton > button:hover {{
+    transform: translateY(-2px);
+    box-shadow: 0 6px 20px rgba(0,0,0,0.3);
+}}
+
+/* Radio buttons */
+.stRadio > div {{
+    background: {theme['surface']};
+    padding: 1rem;
+    border-radius: 10px;
+    border: 2px solid transparent;
+    transition: all 0.3s ease;
+}}
+
+.stRadio > div:hover {{
+    border-color: {theme['primary']};
+    box-shadow: 0 4px 15px rgba(0,0,0,0.1);
+}}
+
+/* Progress bar */
+.stProgress > div > div {{
+    background: linear-gradient(90deg, {theme['primary']} 0%, {theme['accent']} 100%);
+    height: 15px;
+    border-radius: 10px;
+}}
+
+/* Sidebar */
+.css-1d391kg {{
+    background: linear-gradient(180deg, {theme['surface']} 0%, {theme['background']} 100%);
+}}
+
+/* Animations */
+@keyframes slideInUp {{
+    from {{
+        opacity: 0;
+        transform: translateY(30px);
+    }}
+    to {{
+        opacity: 1;
+        transform: translateY(0);
+    }}
+}}
+
+@keyframes slideInRight {{
+    from {{
+        opacity: 0;
+        transform: translateX(30px);
+    }}
+    to {{
+        opacity: 1;
+        transform: translateX(0);
+    }}
+}}
+
+@keyframes bounceIn {{
+    0% {{
+        opacity: 0;
+        transform: scale(0.3);
+    }}
+    50% {{
+        opacity: 1;
+        transform: scale(1.05);
+    }}
+    70% {{
+        transform: scale(0.9);
+    }}
+    100% {{
+        opacity: 1;
+        transform: scale(1);
+    }}
+}}
+
+@keyframes pulse {{
+    0% {{
+        transform: scale(1);
+    }}
+    50% {{
+        transform: scale(1.05);
+    }}
+    100% {{
+        transform: scale(1);
+    }}
+}}
+
+@keyframes progressFill {{
+    from {{
+        width: 0%;
+    }}
+    to {{
+        width: 100%;
+    }}
+}}
+
+/* Mobile responsiveness */
+@media (max-width: 768px) {{
+    .score-card {{
+        padding: 1.5rem;
+        margin: 1rem 0;
+    }}
+
+    .score-card h2 {{
+        font-size: 2.2rem !important;
+    }}
+
+    .score-card h3 {{
+        font-size: 1.8rem !important;
+    }}
+
+    .stats-container {{
+        padding: 1.5rem;
+    }}
+
+    .stats-item {{
+        margin: 0.5rem;
+    }}
+
+    .stats-number {{
+        font-size: 2rem;
+    }}
+}}
+
+/* Accessibility enhancements */
+.stButton > button:focus,
+.stRadio > div:focus-within {{
+    outline: 3px solid {theme['accent']};
+    outline-offset: 2px;
+}}
+
+/* High contrast mode */
+{'.high-contrast *' if accessibility_mode else ''} {{
+    border: 1px solid #000000 !important;
+    background: #ffffff !important;
+    color: #000000 !important;
+}}
+"""
+
+
+@lru_cache(maxsize=None)
+def stylesheets() -> Dict[Tuple[str, str, bool], Tuple[str, str]]:
+    """(theme, font size, high contrast) -> (file name, CSS), written to STATIC_CSS_DIR once per process"""
+    sheets = {}
+    for key in itertools.product(THEMES, FONT_SIZES, (False, True)):
+        css = BASE_CSS + theme_css(*key)
+        name = f"theme-{hashlib.sha1(css.encode('utf-8')).hexdigest()[:12]}.css"
+        sheets[key] = (name, css)
+        path = os.path.join(STATIC_CSS_DIR, name)
+        if not os.path.exists(path):
+            try:
+                os.makedirs(STATIC_CSS_DIR, exist_ok=True)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(css)
+                os.replace(tmp_path, path)
+            except OSError:
+                pass  # Read-only checkout: stylesheet_tag inlines the CSS instead
+    return sheets
+
+
+def stylesheet_tag(theme_name: str, font_size: str, accessibility_mode: bool, static_serving: bool) -> str:
+    """Markup applying the stylesheet: a <link> to its static file, or inline CSS"""
+    key = (theme_name if theme_name in THEMES else 'default',
+           font_size if font_size in FONT_SIZES else 'medium', bool(accessibility_mode))
+    name, css = stylesheets()[key]
+    if static_serving and STATIC_CSS_SERVED and os.path.exists(os.path.join(STATIC_CSS_DIR, name)):
+        return f'<link rel="stylesheet" href="{STATIC_CSS_URL}/{name}">'
+    return f"<style>{css}</style>"
@@ -0,0 +1,134 @@
+# Compact user profile type
+#
+# Profiles are hydrated on every login and kept in st.session_state for each
+# connected user, so the type uses __slots__ (no per-instance __dict__) and
+# only copies the potentially large collections when they are first used.
+
+import datetime
+from typing import Any, Dict, List, Optional
+
+# Bump when the stored profile layout changes; from_dict upgrades old layouts
+PROFILE_SCHEMA_VERSION = 2
+
+# Only the most recent quiz_history entries are kept
+QUIZ_HISTORY_LIMIT = 50
+
+
+class UserProfile:
+    __slots__ = (
+        'username', 'created_date', 'total_quizzes', 'total_score', 'streak_days',
+        'last_quiz_date', 'xp_points', 'level', 'preferred_language',
+        '_achievements', '_quiz_history', '_raw_achievements', '_raw_quiz_history', '_extra'
+    )
+
+    username: str
+    created_date: str
+    total_quizzes: int
+    total_score: int
+    streak_days: int
+    last_quiz_date: Optional[str]
+    xp_points: int
+    level: int
+    preferred_language: str
+
+    def __init__(self, username: str):
+        self.username = username
+        self.created_date = datetime.datetime.now().isoformat()
+        self.total_quizzes = 0
+        self.total_score = 0
+        self.streak_days = 0
+        self.last_quiz_date = None
+        self.xp_points = 0
+        self.level = 1
+        self.preferred_language = 'english'
+        self._achievements: Optional[List[str]] = []
+        self._quiz_history: Optional[List[Any]] = []
+        # Stored lists not yet copied into the profile (see the properties)
+        self._raw_achievements: Optional[List[str]] = None
+        self._raw_quiz_history: Optional[List[Any]] = None
+        # Keys from newer layouts, kept so they survive a round trip
+        self._extra: Optional[Dict[str, Any]] = None
+
+    # Collections are copied from the stored data only when first touched
+    @property
+    def achievements(self) -> List[str]:
+        if self._achievements is None:
+            self._achievements = list(self._raw_achievements or [])
+            self._raw_achievements = None
+        return self._achievements
+
+    @achievements.setter
+    def achievements(self, value: List[str]):
+        self._achievements = value
+        self._raw_achievements = None
+
+    @property
+    def quiz_history(self) -> List[Any]:
+        if self._quiz_history is None:
+            self._quiz_history = list(self._raw_quiz_history or [])[-QUIZ_HISTORY_LIMIT:]
+            self._raw_quiz_history = None
+        return self._quiz_history
+
+    @quiz_history.setter
+    def quiz_history(self, value: List[Any]):
+        self._quiz_history = value
+        self._raw_quiz_history = None
+
+    def to_dict(self):
+        achievements = self._achievements if self._achievements is not None else self._raw_achievements or []
+        quiz_history = self._quiz_history if self._quiz_history is not None else self._raw_quiz_history or []
+        data = dict(self._extra) if self._extra else {}
+        data.update({
+            'username': self.username,
+            'created_date': self.created_date,
+            'total_quizzes': self.total_quizzes,
+            'total_score': self.total_score,
+            'achievements': achievements,
+            'streak_days': self.streak_days,
+            'last_quiz_date': self.last_quiz_date,
+            'xp_points': self.xp_points,
+            'level': self.level,
+            'preferred_language': self.preferred_language,
+            'quiz_history': quiz_history[-QUIZ_HISTORY_LIMIT:],
+            'schema_version': PROFILE_SCHEMA_VERSION
+        })
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        get = data.get
+        profile = cls.__new__(cls)
+        profile.username = data['username']
+        profile.created_date = get('created_date') or datetime.datetime.now().isoformat()
+        profile.total_quizzes = get('total_quizzes', 0)
+        profile.total_score = get('total_score', 0)
+        profile.streak_days = get('streak_days', 0)
+        profile.last_quiz_date = get('last_quiz_date')
+        profile.xp_points = get('xp_points', 0)
+        profile.level = get('level', 1)
+        profile.preferred_language = get('preferred_language', 'english')
+        profile._achievements = None
+        profile._quiz_history = None
+        profile._raw_achievements = get('achievements')
+        profile._raw_quiz_history = get('quiz_history')
+
+        profile._extra = None
+        if not _KNOWN_KEYS.issuperset(data):
+            profile._extra = {key: value for key, value in data.items() if key not in _KNOWN_KEYS}
+        return profile
+
+    # Pickle the stored layout, so a pickled session carries the capped history
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        restored = self.from_dict(state)
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(restored, slot))
+
+
+# Version 1 profiles had the same keys minus schema_version
+_KNOWN_KEYS = frozenset((
+    'username', 'created_date', 'total_quizzes', 'total_score', 'achievements', 'streak_days',
+    'last_quiz_date', 'xp_points', 'level', 'preferred_language', 'quiz_history', 'schema_version'
+))
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Script to validate a question bank before it is shipped
+
+Reports, in one pass over the bank:
+  - structural errors (missing fields, correct index outside the options,
+    Telugu/English option lists of different length, unknown difficulty, ...)
+  - exact duplicates (same content ID)
+  - near-duplicates: MinHash signatures over the question text in both
+    languages, with LSH banding to find candidate pairs
+
+Usage: python validate_questions.py [bank.jsonl|bank.yaml ...] [--threshold 0.8] [--strict]
+Without files the banks in question_banks/ (or, for epics without a bank
+file, the bank built from fast_questions.py) are checked. Exits with 1
+when there are structural errors or exact duplicates (and, with --strict,
+near-duplicates), so it can gate bank updates.
+"""
+
+import argparse
+import hashlib
+import itertools
+import re
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from question_bank import _source_builders, bank_file, iter_split_bank, pack_files, question_id, read_bank_file
+
+DIFFICULTIES = ("easy", "medium", "hard")
+LANGUAGES = ("english", "telugu")
+
+# MinHash / LSH parameters: 64 hashes in 16 bands of 4 rows
+NUM_HASHES = 64
+BANDS = 16
+ROWS = NUM_HASHES // BANDS
+
+
+# Findings listed per section; the rest are only counted
+MAX_LISTED = 50
+
+# Whitespace-separated words without surrounding punctuation (\w would split
+# Telugu words at their vowel signs)
+_WORD = re.compile(r"[^\s?.,!;:\"()\[\]]+")
+
+
+def structural_errors(question: Dict) -> List[str]:
+    """Problems that would break display or grading of one question"""
+    errors = []
+    for field in ("question", "options"):
+        value = question.get(field)
+        if not isinstance(value, dict):
+            errors.append(f"missing '{field}'")
+            continue
+        for lang in LANGUAGES:
+            if not value.get(lang):
+                errors.append(f"missing {field}.{lang}")
+    if errors:
+        return errors
+
+    options = question["options"]
+    english = options["english"]
+    if not isinstance(english, list) or len(english) < 2:
+        errors.append("needs at least 2 English options")
+        return errors
+    if len(options["telugu"]) != len(english):
+        errors.append(f"{len(options['telugu'])} Telugu options vs {len(english)} English")
+    if len(set(english)) != len(english):
+        errors.append("repeated English option")
+
+    correct = question.get("correct")
+    if not isinstance(correct, int) or isinstance(correct, bool):
+        errors.append(f"correct index is {correct!r}, not an integer")
+    elif not 0 <= correct < len(english):
+        errors.append(f"correct index {correct} outside {len(english)} options")
+
+    difficulty = question.get("difficulty")
+    if difficulty not in DIFFICULTIES:
+        errors.append(f"unknown difficulty {difficulty!r}")
+    return errors
+
+
+def _stable_hash(token: str) -> int:
+    # Not the builtin hash(): it is salted per process, and findings must not change between runs
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little", signed=True)
+
+
+def _shingles(question: Dict) -> List[int]:
+    """Hashed word unigrams and bigrams of the question in both languages, plus the answer"""
+    tokens = set()
+    for lang in LANGUAGES:
+        words = _WORD.findall(question["question"][lang].lower())
+        tokens.update(words)
+        tokens.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    # Same wording with a different answer is a different question
+    options = question["options"]["english"]
+    correct = question.get("correct")
+    if isinstance(correct, int) and 0 <= correct < len(options):
+        tokens.add("\0answer " + str(options[correct]).lower())
+    return [_stable_hash(token) for token in tokens]
+
+
+def minhash_signatures(shingle_sets: List[List[int]], seed: int = 1, chunk_size: int = 100000) -> np.ndarray:
+    """(questions x NUM_HASHES) MinHash signatures, computed in vectorized chunks"""
+    # Multiply-shift hashing: (a*x + b) mod 2**64, keeping the high 32 bits
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, np.iinfo(np.uint64).max, NUM_HASHES, dtype=np.uint64, endpoint=True) | np.uint64(1)
+    b = rng.integers(0, np.iinfo(np.uint64).max, NUM_HASHES, dtype=np.uint64, endpoint=True)
+
+    signatures = np.full((NUM_HASHES, len(shingle_sets)), np.iinfo(np.uint64).max, dtype=np.uint64)
+    start = 0
+    while start < len(shingle_sets):
+        # Take whole questions until the chunk holds ~chunk_size shingles
+        end, total = start, 0
+        while end < len(shingle_sets) and (total == 0 or total + len(shingle_sets[end]) <= chunk_size):
+            total += len(shingle_sets[end])
+            end += 1
+        lengths = np.fromiter((len(s) for s in shingle_sets[start:end]), dtype=np.int64, count=end - start)
+        non_empty = np.flatnonzero(lengths)
+        if total:
+            values = np.fromiter(itertools.chain.from_iterable(shingle_sets[start:end]), dtype=np.int64, count=total)
+            hashed = (a[:, None] * values.astype(np.uint64)[None, :] + b[:, None]) >> np.uint64(32)
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            signatures[:, start + non_empty] = np.minimum.reduceat(hashed, offsets[non_empty], axis=1)
+        start = end
+    return np.ascontiguousarray(signatures.T)
+
+
+def near_duplicate_pairs(signatures: np.ndarray, threshold: float,
+                         chunk_size: int = 100000) -> List[Tuple[int, int, float]]:
+    """Pairs whose estimated Jaccard similarity is at least `threshold`
+
+    Questions sharing an LSH band bucket are paired with the bucket's first
+    member, so a cluster of n similar questions yields n - 1 candidates.
+    """
+    count = len(signatures)
+    rng = np.random.default_rng(0)
+    mix = rng.integers(0, np.iinfo(np.uint64).max, ROWS, dtype=np.uint64, endpoint=True) | np.uint64(1)
+
+    candidates = []
+    for band in range(BANDS):
+        keys = (signatures[:, band * ROWS:(band + 1) * ROWS] * mix).sum(axis=1)
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.ones(count, dtype=bool)
+        starts[1:] = sorted_keys[1:] != sorted_keys[:-1]
+        # Position of each element's bucket head in `order`
+        heads = np.maximum.accumulate(np.where(starts, np.arange(count), 0))
+        members = ~starts
+        candidates.append(order[heads[members]] * count + order[members])
+    if not candidates:
+        return []
+    candidates = np.unique(np.concatenate(candidates))
+
+    pairs = []
+    for start in range(0, len(candidates), chunk_size):
+        chunk = candidates[start:start + chunk_size]
+        first, second = np.minimum(chunk // count, chunk % count), np.maximum(chunk // count, chunk % count)
+        similarity = (signatures[first] == signatures[second]).mean(axis=1)
+        keep = similarity >= threshold
+        pairs.extend(zip(first[keep].tolist(), second[keep].tolist(), similarity[keep].tolist()))
+    pairs.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return pairs
+
+
+def validate_bank(questions: List[Dict], threshold: float = 0.8) -> Dict:
+    """Validate one bank; returns the findings as plain data"""
+    errors = []
+    by_id: Dict[str, List[int]] = defaultdict(list)
+    for index, question in enumerate(questions):
+        problems = structural_errors(question)
+        if problems:
+            errors.append((index, problems))
+            continue
+        by_id[question.get("id") or question_id(question)].append(index)
+
+    exact = [indexes for indexes in by_id.values() if len(indexes) > 1]
+
+    # Near-duplicates among distinct questions only
+    representatives = [indexes[0] for indexes in by_id.values()]
+    near = []
+    if len(representatives) > 1:
+        signatures = minhash_signatures([_shingles(questions[i]) for i in representatives])
+        near = [(representatives[a], representatives[b], similarity)
+                for a, b, similarity in near_duplicate_pairs(signatures, threshold)]
+
+    return {"count": len(questions), "errors": errors, "exact_duplicates": exact, "near_duplicates": near}
+
+
+def _describe(questions: List[Dict], index: int) -> str:
+    question = questions[index]
+    text = question.get("question", {}).get("english", "?") if isinstance(question.get("question"), dict) else "?"
+    return f"#{index} [{question.get('difficulty', '?')}] {text}"
+
+
+def _print_more(findings: list):
+    if len(findings) > MAX_LISTED:
+        print(f"   ... and {len(findings) - MAX_LISTED} more")
+
+
+def print_report(name: str, questions: List[Dict], report: Dict, elapsed: float):
+    print(f"\n📚 {name}: {report['count']} questions checked in {elapsed:.2f}s")
+
+    if report["errors"]:
+        print(f"❌ {len(report['errors'])} questions with structural errors:")
+        for index, problems in report["errors"][:MAX_LISTED]:
+            print(f"   {_describe(questions, index)}: {'; '.join(problems)}")
+        _print_more(report["errors"])
+    else:
+        print("✅ No structural errors")
+
+    if report["exact_duplicates"]:
+        copies = sum(len(group) - 1 for group in report["exact_duplicates"])
+        print(f"❌ {len(report['exact_duplicates'])} duplicated questions ({copies} extra copies):")
+        for group in report["exact_duplicates"][:MAX_LISTED]:
+            difficulties = sorted({questions[i].get("difficulty", "?") for i in group})
+            note = f" (difficulties: {', '.join(difficulties)})" if len(difficulties) > 1 else ""
+            print(f"   {_describe(questions, group[0])} x{len(group)}{note}")
+        _print_more(report["exact_duplicates"])
+    else:
+        print("✅ No exact duplicates")
+
+    if report["near_duplicates"]:
+        print(f"⚠️  {len(report['near_duplicates'])} near-duplicate pairs:")
+        for first, second, similarity in report["near_duplicates"][:MAX_LISTED]:
+            print(f"   {similarity:.0%}  {_describe(questions, first)}")
+            print(f"         {_describe(questions, second)}")
+        _print_more(report["near_duplicates"])
+    else:
+        print("✅ No near-duplicates")
+
+
+def iter_banks(paths: List[str]) -> Iterable[Tuple[str, List[Dict]]]:
+    if paths:
+        for path in paths:
+            yield path, read_bank_file(path)[0]
+    else:
+        for epic, build in _source_builders().items():
+            path = bank_file(epic)
+            if path is not None and pack_files(epic):
+                yield path, list(iter_split_bank(epic))
+            elif path is not None:
+                yield path, read_bank_file(path)[0]
+            else:
+                yield epic, build()
+
+
+def main():
+    """Validate the given question bank files (default: the app's banks)"""
+    parser = argparse.ArgumentParser(description="Validate question banks")
+    parser.add_argument("paths", nargs="*", help="JSON or JSONL files with one question per entry")
+    parser.add_argument("--threshold", type=float, default=0.8, help="near-duplicate similarity (0-1)")
+    parser.add_argument("--strict", action="store_true", help="fail on near-duplicates too")
+    args = parser.parse_args()
+
+    print("🔍 Validating question banks...")
+    failed = False
+    for name, questions in iter_banks(args.paths):
+        start = time.perf_counter()
+        report = validate_bank(questions, args.threshold)
+        print_report(name, questions, report, time.perf_counter() - start)
+        failed = failed or bool(report["errors"] or report["exact_duplicates"])
+        failed = failed or (args.strict and bool(report["near_duplicates"]))
+
+    print("\n❌ Validation failed" if failed else "\n✅ Validation passed")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+# Write-behind persistence for user_profiles.json
+#
+# Profile updates are pushed onto a queue and a background thread writes them
+# out in batches. Repeated updates to the same user are merged, so a burst of
+# quiz completions becomes one or two file rewrites instead of one per user.
+
+import atexit
+import copy
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Marker for a queued deletion
+_DELETE = object()
+
+
+class ProfileWriteBehind:
+    """Background writer that coalesces profile mutations per username
+
+    With `path_for` each username is routed to its own file (e.g. a shard)
+    and only the files that have pending changes are rewritten.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 2.0, batch_size: int = 50,
+                 path_for: Optional[Callable[[str], str]] = None):
+        self.path = path
+        self.path_for = path_for
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._pending: Dict[str, object] = {}
+        self._pending_since: Optional[float] = None
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="profile-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def put(self, username: str, data: Dict):
+        """Queue a profile insert/update
+
+        A copy is queued: the caller may keep changing `data` while the
+        worker serializes it.
+        """
+        self._queue.put((username, copy.deepcopy(data)))
+
+    def delete(self, username: str):
+        """Queue a profile deletion"""
+        self._queue.put((username, _DELETE))
+
+    def flush(self):
+        """Write every queued mutation to disk before returning"""
+        done = threading.Event()
+        self._queue.put(done)
+        if self._thread.is_alive():
+            done.wait()
+        else:
+            # Interpreter shutdown: the worker is gone, write from this thread
+            self._drain()
+            self._write_pending()
+
+    # Worker
+    def _drain(self) -> list:
+        """Move everything currently queued into the pending map"""
+        waiters = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return waiters
+            self._absorb(item, waiters)
+
+    def _absorb(self, item, waiters: list):
+        if isinstance(item, threading.Event):
+            waiters.append(item)
+            return
+        username, data = item
+        # Later updates to the same user replace earlier ones
+        self._pending[username] = data
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def _run(self):
+        while True:
+            waiters = []
+            timeout = self.flush_interval
+            if self._pending_since is not None:
+                timeout = max(0.0, self._pending_since + self.flush_interval - time.monotonic())
+            try:
+                self._absorb(self._queue.get(timeout=timeout), waiters)
+            except queue.Empty:
+                pass
+            waiters.extend(self._drain())
+
+            due = self._pending_since is not None and (
+                time.monotonic() - self._pending_since >= self.flush_interval
+                or len(self._pending) >= self.batch_size
+            )
+            if due or waiters:
+                try:
+                    self._write_pending()
+                except Exception as e:
+                    # Keep the worker alive; the mutations are retried on the next flush
+                    print(f"⚠️  Could not write {self.path}: {e!r}")
+            for waiter in waiters:
+                waiter.set()
+
+    def _write_pending(self):
+        with self._write_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._pending_since = None
+
+            by_path: Dict[str, Dict[str, object]] = {}
+            for username, data in pending.items():
+                path = self.path_for(username) if self.path_for else self.path
+                by_path.setdefault(path, {})[username] = data
+
+            written = []
+            for path, mutations in by_path.items():
+                try:
+                    self._write_file(path, mutations)
+                except Exception:
+                    # Keep the unwritten mutations for the next attempt; newer ones win
+                    for done_path in written:
+                        for username in by_path[done_path]:
+                            del pending[username]
+                    pending.update(self._pending)
+                    self._pending = pending
+                    self._pending_since = time.monotonic()
+                    raise
+                written.append(path)
+
+    @staticmethod
+    def _write_file(path: str, mutations: Dict[str, object]):
+        users = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                users = json.load(f)
+        for username, data in mutations.items():
+            if data is _DELETE:
+                users.pop(username, None)
+            else:
+                users[username] = data
+
+        # Temp file + rename so readers never see a half-written file
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(users, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)